@@ -1,8 +1,9 @@
+import time
 import streamlit as st
-import pandas as pd
-import numpy as np
-import altair as alt
-from simulate_case_v2 import Params, simulate
+
+# Tiempo de arranque: el contexto del caso (texto estático) se pinta antes de
+# importar pandas/altair y de tocar el modelo; bench_startup.py lo mide.
+_T0 = time.perf_counter()
 
 st.set_page_config(page_title="Caso Escuela San Gabriel", layout="wide")
 
@@ -30,78 +31,283 @@ st.markdown("""
 st.title("📚 Caso: Escuela San Gabriel")
 st.markdown("### Simulador de Dinámica de Sistemas para Instituciones Educativas")
 
-# Inicialización de parámetros
-if "params" not in st.session_state:
-    st.session_state.params = Params()
+# ========== TABS ==========
+tab_contexto, tab_dashboard, tab_retención, tab_financiero, tab_comparar = st.tabs(
+    ["📖 Contexto del Caso", "📊 Dashboard", "🎯 Retención", "💰 Análisis Financiero", "⚖️ Comparar Escenarios"]
+)
+
+# ========== TAB: CONTEXTO ==========
+with tab_contexto:
+    st.markdown("""
+    ## 🏫 La Escuela San Gabriel
+    
+    Institución privada con 25 años de historia en un barrio residencial de clase media.
+    Reconocida por su clima familiar y buen nivel académico.
+    """)
+    
+    st.markdown('<div class="problem-box">', unsafe_allow_html=True)
+    st.markdown("""
+    ### ⚠️ El Problema
+    
+    **La inscripción para primer grado cayó un 30% este año.**
+    
+    | Año | Sala de 5 | 1° Grado | Tasa de Continuidad |
+    |-----|-----------|----------|---------------------|
+    | 2022 | 48 | 46 | 95% |
+    | 2023 | 50 | 42 | 84% |
+    | 2024 | 52 | 29 | **56%** |
+    """)
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        ### 🔍 Hallazgos Clave
+        
+        **Encuesta a familias que NO reinscribieron:**
+        - 50% eligieron colegios bilingües o con jornada extendida
+        - 28% mencionaron temor al salto pedagógico
+        - 17% problemas económicos
+        - 5% mudanza
+        
+        **Contexto externo:**
+        - Caída del 18% en natalidad (últimos 5 años)
+        - 22% de familias migraron a escuelas públicas
+        - Dos nuevas escuelas privadas con promociones
+        """)
+    
+    with col2:
+        st.markdown("""
+        ### 💡 Insights
+        
+        **Problema de retención interna:**
+        - La cantidad en jardín no bajó
+        - La pérdida ocurre en la transición jardín→primaria
+        - Sin articulación pedagógica entre niveles
+        - Comunicación deficiente con familias
+        
+        **Oportunidad:**
+        - De 29 inscriptos en 1°, 15 vienen de afuera
+        - Buena imagen externa, debilidad en retención
+        """)
+    
+    st.markdown('<div class="insight-box">', unsafe_allow_html=True)
+    st.markdown("""
+    ### 🎯 La Pregunta Central
+    
+    **¿Cómo recuperar la continuidad entre jardín y primaria sin comprometer 
+    la sustentabilidad económica de la institución?**
+    """)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# ========== CARGA DIFERIDA ==========
+# Primer pintado completo: el resto de la app necesita datos y gráficos
+st.session_state.tiempos_arranque = {"primer_pintado_ms": (time.perf_counter() - _T0) * 1000}
+
+import os
+import shutil
+import tempfile
+import weakref
+import pandas as pd
+import numpy as np
+import altair as alt
+from model import cache, export, scenarios, sweeps
+from model.cube import CuboResultados
+from model.params_array import ParamsArray
+from model.simulate import Params
+from model.version import MODEL_VERSION
+
+# ========== SIMULACIONES EN CACHÉ ==========
+# Caché compartida por todas las sesiones y procesos (memoria acotada + disco),
+# indexada por versión del modelo y hash de los parámetros.
+resultados = cache.cache_global()
 
 # ========== ESCENARIOS PREDEFINIDOS ==========
+# Definiciones en model/escenarios.json; sus resultados precalculados se cargan
+# una vez por proceso en la caché, así "Cargar" y la comparación no simulan.
+# Los artefactos se generan al desplegar (python -m model.scenarios); si
+# faltan se calculan acá en serie, sin arrancar el pool durante la carga.
+registro = scenarios.cargar_registro()
+
+
+@st.cache_resource(show_spinner="Cargando escenarios...")
+def precalentar_escenarios() -> str:
+    art = scenarios.artefacto(registro, en_paralelo=False)
+    for nombre in art.nombres:
+        resultados.guardar(registro.params(nombre), art.df(nombre))
+    return art.version
+
+
+precalentar_escenarios()
+
+# Inicialización de parámetros: el escenario por defecto, ya precalculado
+if "params" not in st.session_state:
+    st.session_state.params = registro.params(registro.defecto)
+
+
 def cargar_escenario(nombre: str):
-    p = Params()
-    
-    if nombre == "Situación Actual (2024)":
-        # Problema: baja continuidad, poca inversión en soluciones
-        p.tasa_continuidad_jardin_primaria = 0.56
-        p.nivel_articulacion = 0.3
-        p.nivel_comunicacion = 0.2
-        p.nivel_diferenciacion = 0.4
-        p.cuota_mensual = 85000.0
-        p.prop_mkt = 0.08
-        
-    elif nombre == "Escenario A: Comunicación y Articulación":
-        # Foco en retención con inversión moderada
-        p.tasa_continuidad_jardin_primaria = 0.56  # Mejorará con el tiempo
-        p.nivel_articulacion = 0.85  # Espacios de articulación, reuniones, visitas
-        p.nivel_comunicacion = 0.80  # Web renovada, redes activas, seguimiento
-        p.nivel_diferenciacion = 0.45  # Mejora leve en inglés
-        p.cuota_mensual = 87000.0  # Aumento pequeño
-        p.prop_mkt = 0.10  # Mayor inversión en comunicación
-        p.inversion_calidad_por_alumno = 10000.0
-        
-    elif nombre == "Escenario B: Diferenciación (Bilingüe)":
-        # Inversión fuerte en propuesta de valor
-        p.tasa_continuidad_jardin_primaria = 0.56
-        p.nivel_articulacion = 0.50
-        p.nivel_comunicacion = 0.60
-        p.nivel_diferenciacion = 0.90  # Programa bilingüe completo
-        p.cuota_mensual = 105000.0  # Aumento significativo
-        p.prop_mkt = 0.12
-        p.inversion_calidad_por_alumno = 15000.0
-        p.costo_docente_por_aula = 1_500_000.0  # Docentes bilingües
-        
-    elif nombre == "Escenario C: Enfoque Económico":
-        # Prioriza mantener cuota baja y eficiencia
-        p.tasa_continuidad_jardin_primaria = 0.56
-        p.nivel_articulacion = 0.60
-        p.nivel_comunicacion = 0.65
-        p.nivel_diferenciacion = 0.35
-        p.cuota_mensual = 80000.0  # Rebaja para retener familias
-        p.prop_mkt = 0.07
-        p.inversion_calidad_por_alumno = 6000.0
-        
-    elif nombre == "Escenario D: Solución Integral":
-        # Combinación equilibrada de todas las estrategias
-        p.tasa_continuidad_jardin_primaria = 0.56
-        p.nivel_articulacion = 0.90  # Máxima prioridad
-        p.nivel_comunicacion = 0.85  # Inversión sostenida
-        p.nivel_diferenciacion = 0.70  # Mejora significativa pero realista
-        p.cuota_mensual = 95000.0  # Aumento moderado
-        p.prop_mkt = 0.11
-        p.inversion_calidad_por_alumno = 12000.0
-        p.costo_docente_por_aula = 1_350_000.0
-        
-    st.session_state.params = p
+    st.session_state.params = registro.params(nombre)
+
+# ========== SECCIONES BAJO DEMANDA ==========
+def datos_sensibilidad_cuota(actuales: tuple) -> pd.DataFrame:
+    # Corridas con distintas cuotas sobre los parámetros por defecto más las
+    # variables de decisión actuales
+    cuotas_test = [75000, 80000, 85000, 90000, 95000, 100000, 110000]
+    p_tests = [Params(**dict(actuales), cuota_mensual=float(cuota)) for cuota in cuotas_test]
+    resultados_cuota = []
+    for cuota, df_test in zip(cuotas_test, resultados.simular_varios(p_tests)):
+        resultados_cuota.append({
+            'Cuota': cuota,
+            'Facturación Total': df_test['Facturacion'].sum(),
+            'Resultado Neto Total': df_test['ResultadoNeto'].sum(),
+            'Alumnos Finales': df_test['AlumnosTotales'].iloc[-1]
+        })
+    return pd.DataFrame(resultados_cuota)
+
+
+@st.fragment
+def sensibilidad_cuota(p: Params):
+    if not st.toggle("Calcular sensibilidad (7 simulaciones)", key="cargar_sensibilidad_cuota"):
+        st.caption("Activá el cálculo para ver el impacto de distintas cuotas.")
+        return
+    actuales = tuple((attr, getattr(p, attr)) for attr in [
+        'nivel_articulacion', 'nivel_comunicacion', 'nivel_diferenciacion',
+        'tasa_continuidad_jardin_primaria'])
+    with st.spinner("Simulando cuotas..."):
+        df_sensib = datos_sensibilidad_cuota(actuales)
+        
+    # Gráfico
+    chart1 = alt.Chart(df_sensib).mark_line(point=True, color='#28a745').encode(
+        x=alt.X('Cuota:Q', axis=alt.Axis(format='$,.0f'), title='Cuota Mensual'),
+        y=alt.Y('Resultado Neto Total:Q', title='Resultado Neto Acumulado ($)'),
+        tooltip=[alt.Tooltip('Cuota:Q', format='$,.0f'), 
+                alt.Tooltip('Resultado Neto Total:Q', format='$,.0f')]
+    )
+        
+    chart2 = alt.Chart(df_sensib).mark_line(point=True, color='#007bff').encode(
+        x=alt.X('Cuota:Q', axis=alt.Axis(format='$,.0f')),
+        y=alt.Y('Alumnos Finales:Q', title='Alumnos al Año 10'),
+        tooltip=[alt.Tooltip('Cuota:Q', format='$,.0f'), 
+                'Alumnos Finales:Q']
+    )
+        
+    combined = alt.layer(chart1, chart2).resolve_scale(y='independent').properties(height=300)
+    st.altair_chart(combined, use_container_width=True)
+
+
+# Exportación en segundo plano: el archivo se arma en un hilo (model/export.py)
+# y el fragmento se relanza cada medio segundo para mostrar el avance hasta
+# que aparece el botón de descarga.
+MIME_EXPORTACION = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "zip": "application/zip",
+}
+
+
+def descartar_exportacion(clave: str):
+    # Corta el trabajo anterior (si sigue corriendo) y borra su directorio
+    trabajo = st.session_state.pop(clave, None)
+    if trabajo is not None:
+        trabajo.cancelar()
+        trabajo.esperar()
+        shutil.rmtree(os.path.dirname(trabajo.path), ignore_errors=True)
+
+
+def panel_exportacion(clave: str, armar_partes, total: int):
+    # Llamar desde un fragmento; armar_partes() devuelve el iterador de partes
+    trabajo = st.session_state.get(clave)
+    if trabajo is None:
+        formatos = (["xlsx"] if export.xlsx_disponible() else []) + ["zip"]
+        col1, col2 = st.columns([1, 2])
+        formato = col1.selectbox("Formato", formatos, key=f"{clave}_formato",
+                                 format_func=lambda f: {"xlsx": "Excel (XLSX)", "zip": "CSV (ZIP)"}[f])
+        if col2.button(f"📥 Exportar {total} escenarios", key=f"{clave}_iniciar"):
+            directorio = tempfile.mkdtemp(prefix="school-sim-")
+            trabajo = export.en_segundo_plano(os.path.join(directorio, f"{clave}.{formato}"),
+                                              armar_partes(), formato, total)
+            # Si la sesión termina sin "Nueva exportación", el directorio se
+            # borra cuando se libera el trabajo (o al salir del proceso)
+            weakref.finalize(trabajo, shutil.rmtree, directorio, True)
+            st.session_state[clave] = trabajo
+            st.rerun(scope="fragment")
+        return
+    if not trabajo.listo:
+        st.progress(trabajo.fraccion, text=f"Exportando... {trabajo.hechos}/{total} escenarios")
+        st.button("Cancelar exportación", key=f"{clave}_cancelar", on_click=trabajo.cancelar)
+        time.sleep(0.5)
+        st.rerun(scope="fragment")
+    if trabajo.error is not None:
+        st.warning(f"La exportación no terminó: {trabajo.error}")
+    else:
+        with open(trabajo.path, "rb") as f:
+            st.download_button("⬇️ Descargar", f, file_name=os.path.basename(trabajo.path),
+                               mime=MIME_EXPORTACION[trabajo.path.rsplit(".", 1)[-1]], key=f"{clave}_descargar")
+    if st.button("Nueva exportación", key=f"{clave}_nueva"):
+        descartar_exportacion(clave)
+        st.rerun(scope="fragment")
+
+
+# Grilla cuota x marketing: barrido reanudable con barra de avance. El
+# avance queda guardado por bloques (una cuota por bloque), así que al cancelar
+# y volver a activar se continúa desde el último bloque terminado.
+CUOTAS_GRILLA = np.linspace(60000.0, 130000.0, 15)
+MARKETING_GRILLA = np.round(np.linspace(0.0, 0.20, 21), 2)
+
+
+def cancelar_grilla():
+    # El clic relanza el fragmento: Streamlit corta la corrida en curso en la
+    # próxima actualización de la barra y el toggle queda apagado
+    st.session_state.cargar_grilla = False
+
+
+@st.fragment
+def grilla_cuota_marketing(p: Params):
+    n = len(CUOTAS_GRILLA) * len(MARKETING_GRILLA)
+    if not st.toggle(f"Calcular grilla ({n} simulaciones)", key="cargar_grilla"):
+        st.caption("Activá el cálculo para ver el resultado neto en toda la grilla. "
+                   "Si lo cancelás, al reactivarlo continúa desde donde quedó.")
+        return
+    cuota, mkt = np.meshgrid(CUOTAS_GRILLA, MARKETING_GRILLA, indexing="ij")
+    pa = ParamsArray.desde_base(p, n, cuota_mensual=cuota.ravel(), prop_mkt=mkt.ravel())
+    directorio = os.path.join(resultados.directorio or tempfile.gettempdir(), "barridos",
+                              MODEL_VERSION, pa.huella())
+    st.button("Cancelar", on_click=cancelar_grilla, key="cancelar_grilla")
+    barra = st.progress(0.0, text="Preparando grilla...")
+
+    def avance(pr: sweeps.Progreso):
+        texto = f"{pr.hechos}/{pr.total} simulaciones"
+        if np.isfinite(pr.eta_s) and pr.hechos < pr.total:
+            texto += f" · {pr.por_segundo:.0f}/s · faltan ~{pr.eta_s:.0f} s"
+        barra.progress(pr.fraccion, text=texto)
+
+    almacen = sweeps.correr_barrido(pa, directorio, tam_bloque=len(MARKETING_GRILLA), motor="simulate",
+                                    series=["resultado_neto", "Gk"], al_progreso=avance)
+    barra.empty()
+    datos = almacen.consultar(None, ["cuota_mensual", "prop_mkt", "resultado_neto", "final:Gk"])
+    df_grilla = pd.DataFrame({
+        'Cuota': datos["cuota_mensual"],
+        'Marketing': datos["prop_mkt"],
+        'Resultado Neto Total': datos["resultado_neto"].sum(axis=1),
+        'Alumnos Finales': np.rint(datos["final:Gk"]).astype(int),
+    })
+    chart = alt.Chart(df_grilla).mark_rect().encode(
+        x=alt.X('Marketing:O', title='% Facturación en Marketing', axis=alt.Axis(format='.0%')),
+        y=alt.Y('Cuota:O', sort='descending', title='Cuota Mensual', axis=alt.Axis(format='$,.0f')),
+        color=alt.Color('Resultado Neto Total:Q', scale=alt.Scale(scheme='redyellowgreen'),
+                        title='Resultado Neto ($)'),
+        tooltip=[alt.Tooltip('Cuota:Q', format='$,.0f'), alt.Tooltip('Marketing:Q', format='.0%'),
+                 alt.Tooltip('Resultado Neto Total:Q', format='$,.0f'), 'Alumnos Finales:Q']
+    ).properties(height=420)
+    st.altair_chart(chart, use_container_width=True)
+    panel_exportacion("exportacion_grilla", lambda: export.partes_almacen(almacen), n)
+
 
 # ========== SIDEBAR: SELECTOR DE ESCENARIOS ==========
 st.sidebar.title("🎯 Escenarios")
 st.sidebar.markdown("**Selecciona un escenario para analizar:**")
 
-escenarios = [
-    "Situación Actual (2024)",
-    "Escenario A: Comunicación y Articulación",
-    "Escenario B: Diferenciación (Bilingüe)",
-    "Escenario C: Enfoque Económico",
-    "Escenario D: Solución Integral"
-]
+escenarios = registro.nombres()
 
 col1, col2 = st.sidebar.columns([3, 1])
 with col1:
@@ -176,77 +382,7 @@ with st.sidebar.expander("🎓 Parámetros Académicos"):
 
 # ========== SIMULACIÓN ==========
 p = st.session_state.params
-df, _ = simulate(p)
-
-# ========== TABS ==========
-tab_contexto, tab_dashboard, tab_retención, tab_financiero, tab_comparar = st.tabs(
-    ["📖 Contexto del Caso", "📊 Dashboard", "🎯 Retención", "💰 Análisis Financiero", "⚖️ Comparar Escenarios"]
-)
-
-# ========== TAB: CONTEXTO ==========
-with tab_contexto:
-    st.markdown("""
-    ## 🏫 La Escuela San Gabriel
-    
-    Institución privada con 25 años de historia en un barrio residencial de clase media.
-    Reconocida por su clima familiar y buen nivel académico.
-    """)
-    
-    st.markdown('<div class="problem-box">', unsafe_allow_html=True)
-    st.markdown("""
-    ### ⚠️ El Problema
-    
-    **La inscripción para primer grado cayó un 30% este año.**
-    
-    | Año | Sala de 5 | 1° Grado | Tasa de Continuidad |
-    |-----|-----------|----------|---------------------|
-    | 2022 | 48 | 46 | 95% |
-    | 2023 | 50 | 42 | 84% |
-    | 2024 | 52 | 29 | **56%** |
-    """)
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("""
-        ### 🔍 Hallazgos Clave
-        
-        **Encuesta a familias que NO reinscribieron:**
-        - 50% eligieron colegios bilingües o con jornada extendida
-        - 28% mencionaron temor al salto pedagógico
-        - 17% problemas económicos
-        - 5% mudanza
-        
-        **Contexto externo:**
-        - Caída del 18% en natalidad (últimos 5 años)
-        - 22% de familias migraron a escuelas públicas
-        - Dos nuevas escuelas privadas con promociones
-        """)
-    
-    with col2:
-        st.markdown("""
-        ### 💡 Insights
-        
-        **Problema de retención interna:**
-        - La cantidad en jardín no bajó
-        - La pérdida ocurre en la transición jardín→primaria
-        - Sin articulación pedagógica entre niveles
-        - Comunicación deficiente con familias
-        
-        **Oportunidad:**
-        - De 29 inscriptos en 1°, 15 vienen de afuera
-        - Buena imagen externa, debilidad en retención
-        """)
-    
-    st.markdown('<div class="insight-box">', unsafe_allow_html=True)
-    st.markdown("""
-    ### 🎯 La Pregunta Central
-    
-    **¿Cómo recuperar la continuidad entre jardín y primaria sin comprometer 
-    la sustentabilidad económica de la institución?**
-    """)
-    st.markdown('</div>', unsafe_allow_html=True)
+df = resultados.simular(p)
 
 # ========== TAB: DASHBOARD ==========
 with tab_dashboard:
@@ -624,48 +760,16 @@ with tab_financiero:
         """)
     
     with col2:
-        # Simulación rápida con diferentes cuotas
-        cuotas_test = [75000, 80000, 85000, 90000, 95000, 100000, 110000]
-        resultados_cuota = []
-        
-        for cuota in cuotas_test:
-            p_test = Params()
-            # Copiar parámetros actuales
-            for attr in ['nivel_articulacion', 'nivel_comunicacion', 'nivel_diferenciacion',
-                        'tasa_continuidad_jardin_primaria']:
-                setattr(p_test, attr, getattr(p, attr))
-            p_test.cuota_mensual = cuota
-            df_test, _ = simulate(p_test)
-            
-            resultados_cuota.append({
-                'Cuota': cuota,
-                'Facturación Total': df_test['Facturacion'].sum(),
-                'Resultado Neto Total': df_test['ResultadoNeto'].sum(),
-                'Alumnos Finales': df_test['AlumnosTotales'].iloc[-1]
-            })
-        
-        df_sensib = pd.DataFrame(resultados_cuota)
-        
-        # Gráfico
-        chart1 = alt.Chart(df_sensib).mark_line(point=True, color='#28a745').encode(
-            x=alt.X('Cuota:Q', axis=alt.Axis(format='$,.0f'), title='Cuota Mensual'),
-            y=alt.Y('Resultado Neto Total:Q', title='Resultado Neto Acumulado ($)'),
-            tooltip=[alt.Tooltip('Cuota:Q', format='$,.0f'), 
-                    alt.Tooltip('Resultado Neto Total:Q', format='$,.0f')]
-        )
-        
-        chart2 = alt.Chart(df_sensib).mark_line(point=True, color='#007bff').encode(
-            x=alt.X('Cuota:Q', axis=alt.Axis(format='$,.0f')),
-            y=alt.Y('Alumnos Finales:Q', title='Alumnos al Año 10'),
-            tooltip=[alt.Tooltip('Cuota:Q', format='$,.0f'), 
-                    'Alumnos Finales:Q']
-        )
-        
-        combined = alt.layer(chart1, chart2).resolve_scale(y='independent').properties(height=300)
-        st.altair_chart(combined, use_container_width=True)
+        sensibilidad_cuota(p)
+
+    # Grilla de decisiones
+    st.divider()
+    st.subheader("🗺️ Grilla: Cuota × Inversión en Marketing")
+    grilla_cuota_marketing(p)
 
 # ========== TAB: COMPARAR ESCENARIOS ==========
-with tab_comparar:
+@st.fragment
+def comparar_escenarios():
     st.header("⚖️ Comparación de Escenarios")
     
     st.markdown("""
@@ -673,66 +777,31 @@ with tab_comparar:
     el mejor balance entre matrícula, calidad y sustentabilidad financiera.
     """)
     
+    # Los escenarios pueden salir de artefactos precalculados o de la caché:
+    # el rótulo no promete simulaciones
+    if not st.toggle("Cargar comparación de escenarios", key="cargar_comparacion"):
+        st.info("Activá la comparación para ver los escenarios propuestos.")
+        return
+    
     # Simulación de todos los escenarios
     escenarios_comparar = {
-        "Situación Actual": Params(
-            tasa_continuidad_jardin_primaria=0.56,
-            nivel_articulacion=0.3,
-            nivel_comunicacion=0.2,
-            nivel_diferenciacion=0.4,
-            cuota_mensual=85000.0
-        ),
-        "Escenario A\n(Comunicación)": Params(
-            tasa_continuidad_jardin_primaria=0.56,
-            nivel_articulacion=0.85,
-            nivel_comunicacion=0.80,
-            nivel_diferenciacion=0.45,
-            cuota_mensual=87000.0,
-            prop_mkt=0.10,
-            inversion_calidad_por_alumno=10000.0
-        ),
-        "Escenario B\n(Bilingüe)": Params(
-            tasa_continuidad_jardin_primaria=0.56,
-            nivel_articulacion=0.50,
-            nivel_comunicacion=0.60,
-            nivel_diferenciacion=0.90,
-            cuota_mensual=105000.0,
-            prop_mkt=0.12,
-            inversion_calidad_por_alumno=15000.0,
-            costo_docente_por_aula=1_500_000.0
-        ),
-        "Escenario C\n(Económico)": Params(
-            tasa_continuidad_jardin_primaria=0.56,
-            nivel_articulacion=0.60,
-            nivel_comunicacion=0.65,
-            nivel_diferenciacion=0.35,
-            cuota_mensual=80000.0,
-            prop_mkt=0.07,
-            inversion_calidad_por_alumno=6000.0
-        ),
-        "Escenario D\n(Integral)": Params(
-            tasa_continuidad_jardin_primaria=0.56,
-            nivel_articulacion=0.90,
-            nivel_comunicacion=0.85,
-            nivel_diferenciacion=0.70,
-            cuota_mensual=95000.0,
-            prop_mkt=0.11,
-            inversion_calidad_por_alumno=12000.0,
-            costo_docente_por_aula=1_350_000.0
-        )
+        e.etiqueta: registro.params(e.nombre) for e in registro.escenarios.values()
     }
     
     # Simular todos los escenarios
     resultados_comparacion = {}
     
     with st.spinner("Simulando escenarios..."):
-        for nombre, params in escenarios_comparar.items():
-            df_esc, _ = simulate(params)
+        dfs = resultados.simular_varios(list(escenarios_comparar.values()))
+        for (nombre, params), df_esc in zip(escenarios_comparar.items(), dfs):
             resultados_comparacion[nombre] = {
                 'df': df_esc,
                 'params': params
             }
     
+    # Cubo escenario x año x métrica para los gráficos comparativos
+    cubo = CuboResultados.desde_dataframes({n: r['df'] for n, r in resultados_comparacion.items()})
+    
     # Tabla comparativa de resultados clave
     st.subheader("📊 Resumen Comparativo (Año 10)")
     
@@ -756,6 +825,12 @@ with tab_comparar:
     
     df_comparativo = pd.DataFrame(comparativo)
     st.dataframe(df_comparativo, use_container_width=True, hide_index=True)
+    panel_exportacion(
+        "exportacion_comparacion",
+        lambda: export.partes_dataframes(
+            {n.replace('\n', ' '): r['df'] for n, r in resultados_comparacion.items()},
+            {n.replace('\n', ' '): r['params'] for n, r in resultados_comparacion.items()}),
+        len(resultados_comparacion))
     
     st.divider()
     
@@ -765,12 +840,7 @@ with tab_comparar:
     with col1:
         st.subheader("Evolución de Matrícula por Escenario")
         
-        # Combinar datos de todos los escenarios
-        df_combined = pd.DataFrame()
-        for nombre, resultado in resultados_comparacion.items():
-            df_temp = resultado['df'][['Año', 'AlumnosTotales']].copy()
-            df_temp['Escenario'] = nombre
-            df_combined = pd.concat([df_combined, df_temp])
+        df_combined = cubo.largo(['AlumnosTotales'])
         
         chart = alt.Chart(df_combined).mark_line(point=True).encode(
             x=alt.X('Año:Q'),
@@ -784,11 +854,7 @@ with tab_comparar:
     with col2:
         st.subheader("Calidad Percibida por Escenario")
         
-        df_combined = pd.DataFrame()
-        for nombre, resultado in resultados_comparacion.items():
-            df_temp = resultado['df'][['Año', 'Calidad']].copy()
-            df_temp['Escenario'] = nombre
-            df_combined = pd.concat([df_combined, df_temp])
+        df_combined = cubo.largo(['Calidad'])
         
         chart = alt.Chart(df_combined).mark_line(point=True).encode(
             x=alt.X('Año:Q'),
@@ -804,12 +870,8 @@ with tab_comparar:
     with col1:
         st.subheader("Resultado Neto Acumulado")
         
-        df_combined = pd.DataFrame()
-        for nombre, resultado in resultados_comparacion.items():
-            df_temp = resultado['df'][['Año', 'ResultadoNeto']].copy()
-            df_temp['ResultadoNetoAcum'] = df_temp['ResultadoNeto'].cumsum()
-            df_temp['Escenario'] = nombre
-            df_combined = pd.concat([df_combined, df_temp[['Año', 'ResultadoNetoAcum', 'Escenario']]])
+        df_combined = cubo.acumulado(['ResultadoNeto']).largo().rename(
+            columns={'ResultadoNeto': 'ResultadoNetoAcum'})
         
         chart = alt.Chart(df_combined).mark_line(point=True).encode(
             x=alt.X('Año:Q'),
@@ -823,11 +885,7 @@ with tab_comparar:
     with col2:
         st.subheader("Evolución de Caja")
         
-        df_combined = pd.DataFrame()
-        for nombre, resultado in resultados_comparacion.items():
-            df_temp = resultado['df'][['Año', 'Caja']].copy()
-            df_temp['Escenario'] = nombre
-            df_combined = pd.concat([df_combined, df_temp])
+        df_combined = cubo.largo(['Caja'])
         
         chart = alt.Chart(df_combined).mark_line(point=True).encode(
             x=alt.X('Año:Q'),
@@ -853,16 +911,11 @@ with tab_comparar:
         """)
         
         # Scatter plot: Alumnos finales vs Calidad final
-        scatter_data = []
-        for nombre, resultado in resultados_comparacion.items():
-            final_esc = resultado['df'].iloc[-1]
-            scatter_data.append({
-                'Escenario': nombre,
-                'Alumnos': final_esc['AlumnosTotales'],
-                'Calidad': final_esc['Calidad']
-            })
-        
-        df_scatter = pd.DataFrame(scatter_data)
+        df_scatter = pd.DataFrame({
+            'Escenario': cubo.escenarios,
+            'Alumnos': cubo.final('AlumnosTotales'),
+            'Calidad': cubo.final('Calidad')
+        })
         
         chart = alt.Chart(df_scatter).mark_circle(size=200).encode(
             x=alt.X('Alumnos:Q', title='Alumnos Totales (Año 10)'),
@@ -886,20 +939,11 @@ with tab_comparar:
         """)
         
         # Scatter plot: Inversión total vs Resultado neto
-        scatter_data = []
-        for nombre, resultado in resultados_comparacion.items():
-            df_esc = resultado['df']
-            p_esc = resultado['params']
-            inv_total = df_esc['InversionCalidadAlumno'].sum() + df_esc['InversionInfra'].sum()
-            resultado_total = df_esc['ResultadoNeto'].sum()
-            
-            scatter_data.append({
-                'Escenario': nombre,
-                'Inversión Total': inv_total,
-                'Resultado Neto Acumulado': resultado_total
-            })
-        
-        df_scatter = pd.DataFrame(scatter_data)
+        df_scatter = pd.DataFrame({
+            'Escenario': cubo.escenarios,
+            'Inversión Total': cubo.total('InversionCalidadAlumno') + cubo.total('InversionInfra'),
+            'Resultado Neto Acumulado': cubo.total('ResultadoNeto')
+        })
         
         chart = alt.Chart(df_scatter).mark_circle(size=200).encode(
             x=alt.X('Inversión Total:Q', title='Inversión Total en Calidad e Infra ($)'),
@@ -939,6 +983,10 @@ with tab_comparar:
     """)
     st.markdown('</div>', unsafe_allow_html=True)
 
+
+with tab_comparar:
+    comparar_escenarios()
+
 # ========== FOOTER ==========
 st.divider()
 st.markdown("""
@@ -949,3 +997,5 @@ st.markdown("""
     </small>
 </div>
 """, unsafe_allow_html=True)
+
+st.session_state.tiempos_arranque["completo_ms"] = (time.perf_counter() - _T0) * 1000
@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Benchmark de arranque de la app. Cada muestra corre en un proceso nuevo
+# (imports en frío):
+#   - importación de cada módulo pesado por separado;
+#   - corrida completa del script con streamlit.testing (AppTest), que informa
+#     el tiempo hasta el primer pintado (contexto del caso) y hasta el final.
+# Con --max-primer-pintado-ms sale con código 1 si la mediana lo supera.
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(RAIZ, "app_case (1).py")
+MODULOS = ("streamlit", "numpy", "pandas", "altair", "model.core", "model.simulate", "model.cache", "model.scenarios")
+
+
+def _python(codigo: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=RAIZ + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True,
+                            cwd=RAIZ, env=env)
+    if salida.returncode != 0:
+        return {"error": salida.stderr.strip().splitlines()[-1] if salida.stderr.strip() else "falló"}
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def medir_import(modulo: str) -> dict:
+    return _python(
+        "import json, time\n"
+        "t = time.perf_counter()\n"
+        f"import {modulo}\n"
+        "print(json.dumps({'ms': (time.perf_counter() - t) * 1000}))\n")
+
+
+def medir_app(timeout: float) -> dict:
+    return _python(
+        "import json, time\n"
+        "t = time.perf_counter()\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        f"at = AppTest.from_file({APP!r}, default_timeout={timeout})\n"
+        "t_app = time.perf_counter()\n"
+        "at.run()\n"
+        "fin = time.perf_counter()\n"
+        "tiempos = dict(at.session_state['tiempos_arranque'])\n"
+        "tiempos['import_streamlit_ms'] = (t_app - t) * 1000\n"
+        "tiempos['corrida_ms'] = (fin - t_app) * 1000\n"
+        "tiempos['excepciones'] = [str(e.value) for e in at.exception]\n"
+        "print(json.dumps(tiempos))\n")
+
+
+def _mediana(xs):
+    xs = sorted(xs)
+    n = len(xs)
+    return xs[n // 2] if n % 2 else 0.5 * (xs[n // 2 - 1] + xs[n // 2])
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark de arranque de la app")
+    ap.add_argument("--repeticiones", type=int, default=3)
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--max-primer-pintado-ms", type=float, default=None)
+    ap.add_argument("--json", action="store_true", help="salida en JSON")
+    args = ap.parse_args(argv)
+
+    informe = {"imports_ms": {}, "app": []}
+    for modulo in MODULOS:
+        muestras = [medir_import(modulo) for _ in range(args.repeticiones)]
+        ok = [m["ms"] for m in muestras if "ms" in m]
+        informe["imports_ms"][modulo] = _mediana(ok) if ok else muestras[0].get("error")
+
+    t = time.perf_counter()
+    for _ in range(args.repeticiones):
+        informe["app"].append(medir_app(args.timeout))
+    informe["total_s"] = time.perf_counter() - t
+
+    corridas = [a for a in informe["app"] if "primer_pintado_ms" in a]
+    if corridas:
+        informe["primer_pintado_ms"] = _mediana([a["primer_pintado_ms"] for a in corridas])
+        informe["completo_ms"] = _mediana([a["completo_ms"] for a in corridas])
+
+    if args.json:
+        print(json.dumps(informe, indent=2, default=str))
+    else:
+        for modulo, ms in informe["imports_ms"].items():
+            print(f"import {modulo:<18} {ms:>9.1f} ms" if isinstance(ms, float) else f"import {modulo:<18} {ms}")
+        if corridas:
+            print(f"primer pintado (mediana)   {informe['primer_pintado_ms']:>9.1f} ms")
+            print(f"script completo (mediana)  {informe['completo_ms']:>9.1f} ms")
+        else:
+            print("app: " + "; ".join(str(a.get("error", a)) for a in informe["app"]))
+
+    limite = args.max_primer_pintado_ms
+    if limite is not None:
+        if not corridas:
+            return 1
+        if informe["primer_pintado_ms"] > limite:
+            print(f"REGRESIÓN: primer pintado {informe['primer_pintado_ms']:.1f} ms > {limite:.1f} ms")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+import argparse
+import json
+import sys
+import time
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+from model.params_array import IDENTIFICADORES, ParamsArray
+
+# Línea de comandos para correr el modelo sin la app (cron, servidores):
+#
+#   python -m model run escenarios.json [--motor escalar|lote|paralelo] [--csv salida.csv]
+#   python -m model sweep grilla.yaml --almacen DIR [--motor lote|simulate] [--tipos compacta]
+#   python -m model mc escenarios.json --replicas 1000 [--csv resumen.csv | --tensor DIR]
+#   python -m model jsonl pedidos.jsonl [-o respuestas.jsonl]   ("-" = stdin/stdout)
+#   python -m model export ENTRADA salida.xlsx|salida.zip [--motor lote|simulate] [--filtro ...]
+#       (ENTRADA: registro, grilla, CSV o el directorio de un almacén de barrido)
+#   python -m model calibrar observaciones.csv [--parametros ...] [--csv estimaciones.csv]
+#       (una fila por escuela y año: escuela, anio y una columna por observable)
+#   python -m model serve [--puerto 8150]    (servicio HTTP, ver model/server.py)
+#   python -m model bench [-n 200] [--fast-forward 200]
+#
+# Entradas:
+#   - registro de escenarios JSON/YAML (el formato de model/escenarios.json);
+#   - grilla JSON/YAML: {"modelo": "v1", "base": {...}, "ejes": {"cuota_mensual":
+#     [80000, 90000] o {"desde": .., "hasta": .., "pasos": ..}, ...}};
+#   - CSV con una fila por escenario y una columna por parámetro (los que faltan
+#     toman el valor por defecto); una columna "nombre" opcional los identifica.
+
+MODELOS = {"v1": Params, "v2": ParamsV2}
+
+
+def _leer_definicion(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml  # dependencia opcional, sólo para archivos YAML
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def _eje(v: Any) -> np.ndarray:
+    if isinstance(v, dict):
+        return np.linspace(float(v["desde"]), float(v["hasta"]), int(v["pasos"]))
+    return np.asarray(v)
+
+
+def cargar_entrada(path: str, modelo: Optional[str] = None) -> Tuple[List[str], ParamsArray]:
+    # (nombres, parámetros) de un registro, una grilla o un CSV
+    if path.endswith(".csv"):
+        import pandas as pd
+        df = pd.read_csv(path, float_precision="round_trip")
+        clase = MODELOS[modelo or "v1"]
+        col = next((c for c in IDENTIFICADORES if c in df.columns), None)
+        nombres = df[col].astype(str).tolist() if col else [str(i) for i in range(len(df))]
+        return nombres, ParamsArray.desde_dataframe(df, clase)
+    datos = _leer_definicion(path)
+    if "ejes" in datos:
+        clase = MODELOS[modelo or datos.get("modelo", "v1")]
+        pa = ParamsArray.grilla(clase(**datos.get("base", {})),
+                                **{k: _eje(v) for k, v in datos["ejes"].items()})
+        return [str(i) for i in range(len(pa))], pa
+    from model.scenarios import cargar_registro
+    reg = cargar_registro(path)
+    if modelo and modelo != reg.modelo:
+        raise ValueError(f"{path} es un registro del modelo {reg.modelo}, no {modelo}")
+    return reg.nombres(), ParamsArray.desde_params([reg.params(n) for n in reg.nombres()])
+
+
+def _dataframes(pa: ParamsArray, motor: str) -> List[Any]:
+    if motor == "lote":
+        from model import batch
+        return [df for df, _ in batch.simulate_batch(pa)]
+    if motor == "paralelo":
+        from model import parallel
+        return parallel.simular_concurrente(pa.a_lista())
+    from model import parallel
+    return [parallel.simular_df(p) for p in pa]
+
+
+def _avance(pr) -> None:
+    ritmo = f" ({pr.por_segundo:.0f}/s" if pr.por_segundo else ""
+    if ritmo:
+        ritmo += f", faltan ~{pr.eta_s:.0f} s)" if pr.hechos < pr.total else ")"
+    print(f"\r{pr.hechos}/{pr.total} escenarios{ritmo}", end="", file=sys.stderr, flush=True)
+
+
+def _tipos(nombre: Optional[str]):
+    from model import precision
+    return {None: None, "compacta": precision.COMPACTA,
+            "fraccional": precision.COMPACTA_FRACCIONAL}[nombre]
+
+
+# ---------- Subcomandos ----------
+
+def cmd_run(args) -> int:
+    nombres, pa = cargar_entrada(args.entrada, args.modelo)
+    if args.almacen:
+        from model import sweeps
+        motor = "lote" if args.motor == "lote" else "simulate"
+        sweeps.correr_barrido(pa, args.almacen, args.tam_bloque, motor, tipos=_tipos(args.tipos),
+                              al_progreso=None if args.silencioso else _avance)
+        print(file=sys.stderr)
+        return 0
+    import pandas as pd
+    dfs = _dataframes(pa, args.motor)
+    salida = pd.concat([df.assign(Escenario=n) for n, df in zip(nombres, dfs)], ignore_index=True)
+    if args.csv:
+        salida.to_csv(args.csv, index=False)
+    else:
+        ultimo = salida.groupby("Escenario", sort=False).tail(1).set_index("Escenario")
+        print(ultimo.to_string())
+    return 0
+
+
+def cmd_sweep(args) -> int:
+    from model import sweeps
+    _, pa = cargar_entrada(args.entrada, args.modelo)
+    almacen = sweeps.correr_barrido(pa, args.almacen, args.tam_bloque, args.motor,
+                                    series=args.series, tipos=_tipos(args.tipos),
+                                    al_progreso=None if args.silencioso else _avance)
+    print(file=sys.stderr)
+    if args.csv:
+        almacen.a_dataframe(args.filtro, pa.variables + [c for c in almacen.columnas
+                                                         if c.startswith("final:")]).to_csv(args.csv)
+    elif args.filtro:
+        print(f"{almacen.contar(args.filtro)} de {len(almacen)} escenarios cumplen {args.filtro!r}")
+    return 0
+
+
+def cmd_mc(args) -> int:
+    nombres, pa = cargar_entrada(args.entrada, "v1")
+    if args.tensor:
+        from model import tensors
+        tensors.llenar(pa, args.tensor, n_reps=args.replicas, seed=args.seed or 0, tipos=_tipos(args.tipos))
+        return 0
+    import pandas as pd
+    from model import montecarlo
+    filas = []
+    for nombre, par in zip(nombres, pa):
+        mc = montecarlo.simulate_mc(par, args.replicas, args.seed)
+        for serie in args.series:
+            v = mc["Gk"].sum(axis=-1) if serie == "alumnos" else mc[serie]
+            p10, p50, p90 = np.percentile(v, [10, 50, 90], axis=0)
+            for anio in range(v.shape[1]):
+                filas.append({"Escenario": nombre, "Serie": serie, "Año": anio, "media": v[:, anio].mean(),
+                              "p10": p10[anio], "p50": p50[anio], "p90": p90[anio]})
+    resumen = pd.DataFrame(filas)
+    if args.csv:
+        resumen.to_csv(args.csv, index=False)
+    else:
+        print(resumen[resumen["Año"] == resumen["Año"].max()].to_string(index=False))
+    return 0
+
+
+def cmd_jsonl(args) -> int:
+    from model import jsonl
+    entrada = sys.stdin if args.entrada == "-" else open(args.entrada, encoding="utf-8")
+    salida = sys.stdout if args.salida == "-" else open(args.salida, "w", encoding="utf-8")
+    try:
+        proc = jsonl.procesar(entrada, salida, args.tam_lote, motor_defecto=args.motor)
+    finally:
+        for f in (entrada, salida):
+            if f not in (sys.stdin, sys.stdout):
+                f.close()
+    print(f"{proc.procesados} respuestas en {proc.lotes} lotes, {proc.errores} errores", file=sys.stderr)
+    return 1 if proc.errores else 0
+
+
+def cmd_export(args) -> int:
+    import os
+    from model import export
+    if args.salida.lower().endswith(".xlsx") and not export.xlsx_disponible():
+        print("exportar a XLSX requiere xlsxwriter u openpyxl; usar un .zip", file=sys.stderr)
+        return 2
+    if os.path.isdir(args.entrada):
+        from model.store import AlmacenResultados
+        almacen = AlmacenResultados(args.entrada)
+        partes = export.partes_almacen(almacen, args.filtro)
+        total = almacen.contar(args.filtro)
+    else:
+        nombres, pa = cargar_entrada(args.entrada, args.modelo)
+        partes = export.partes_params(pa, nombres, args.motor)
+        total = len(pa)
+    avance = None if args.silencioso else (
+        lambda h, t: print(f"\r{h}/{t} escenarios", end="", file=sys.stderr, flush=True))
+    export.exportar(args.salida, partes, total=total, al_progreso=avance)
+    if avance is not None:
+        print(file=sys.stderr)
+    return 0
+
+
+def cmd_calibrar(args) -> int:
+    import pandas as pd
+    from model import calibration
+    obs = calibration.observaciones_desde_dataframe(pd.read_csv(args.observaciones))
+    t = time.perf_counter()
+    resultados = calibration.calibrar_lote(obs, args.parametros or calibration.PARAMETROS_DEFECTO)
+    print(f"{len(resultados)} escuelas en {time.perf_counter() - t:.1f} s", file=sys.stderr)
+    tabla = pd.concat([r.tabla().assign(escuela=r.nombre, sse=r.sse, convergio=r.convergio,
+                                        motivo=r.motivo)
+                       for r in resultados], ignore_index=True)
+    if args.csv:
+        tabla.to_csv(args.csv, index=False)
+    else:
+        print(tabla.to_string(index=False))
+    return 0
+
+
+def cmd_serve(args) -> int:
+    import asyncio
+    from model import server
+    print(f"escuchando en http://{args.host}:{args.puerto}", file=sys.stderr)
+    try:
+        asyncio.run(server.servir(args.host, args.puerto, ventana_ms=args.ventana_ms,
+                                  objetivo_p99_ms=args.objetivo_p99_ms))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_bench(args) -> int:
+    from dataclasses import replace
+    from model import batch, parallel
+    clase = MODELOS[args.modelo or "v1"]
+    base = clase()
+    lista = [replace(base, cuota_mensual=base.cuota_mensual * (0.8 + 0.4 * i / max(1, args.n - 1)))
+             for i in range(args.n)]
+    pa = ParamsArray.desde_params(lista)
+    tiempos = {}
+    t = time.perf_counter()
+    for p in lista:
+        parallel.simular_arrays(p)
+    tiempos["escalar"] = time.perf_counter() - t
+    t = time.perf_counter()
+    batch.correr_lote(pa)
+    tiempos["lote"] = time.perf_counter() - t
+    parallel.pool().submit(int, 0).result()  # arranque del pool fuera de la medición
+    t = time.perf_counter()
+    with parallel.simular_compartido(lista):
+        pass
+    tiempos["paralelo"] = time.perf_counter() - t
+    for motor, dt in tiempos.items():
+        print(f"{motor:<9} {dt * 1000:9.1f} ms  {args.n / dt:10.0f} escenarios/s")
+    if args.fast_forward:
+        _bench_fast_forward(args.fast_forward)
+    return 0
+
+
+def _bench_fast_forward(anios: int, repeticiones: int = 10):
+    # Avance año a año contra fast-forward en un horizonte largo, con la
+    # demanda estable (calidad saturada, el régimen que se puede saltar) y
+    # con el caso base (declive: calidad interior, casi todo paso a paso)
+    from model import dynamics, fastforward
+    for nombre, par in (("estable", Params(years=anios, tasa_descenso_demanda=0.0)),
+                        ("base", Params(years=anios))):
+        t = time.perf_counter()
+        for _ in range(repeticiones):
+            dynamics.correr(par)
+        paso = (time.perf_counter() - t) / repeticiones
+        t = time.perf_counter()
+        for _ in range(repeticiones):
+            _, stats = fastforward.correr_fast_forward(par)
+        salto = (time.perf_counter() - t) / repeticiones
+        print(f"ff {nombre:<7} {anios} años: año a año {paso * 1000:7.1f} ms, fast-forward {salto * 1000:7.1f} ms "
+              f"({stats['pasos']} pasos, {stats['anios_saltados']} años saltados)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m model", description="Simulaciones sin la app")
+    ap.add_argument("--workers", type=int, default=None, help="procesos del pool (por defecto, CPUs)")
+    sub = ap.add_subparsers(dest="comando", required=True)
+
+    r = sub.add_parser("run", help="corre escenarios y escribe sus series")
+    r.add_argument("entrada")
+    r.add_argument("--modelo", choices=sorted(MODELOS))
+    r.add_argument("--motor", choices=("escalar", "lote", "paralelo"), default="escalar",
+                   help="lote = motor vectorizado de campo medio")
+    r.add_argument("--csv", help="CSV largo (una fila por escenario y año)")
+    r.add_argument("--almacen", help="directorio del almacén columnar en lugar de CSV")
+    r.add_argument("--tam-bloque", type=int, default=10000)
+    r.add_argument("--tipos", choices=("compacta", "fraccional"))
+    r.add_argument("--silencioso", action="store_true")
+    r.set_defaults(fn=cmd_run)
+
+    s = sub.add_parser("sweep", help="barrido reanudable hacia el almacén columnar")
+    s.add_argument("entrada")
+    s.add_argument("--almacen", required=True)
+    s.add_argument("--modelo", choices=sorted(MODELOS))
+    s.add_argument("--motor", choices=("lote", "simulate"), default="lote")
+    s.add_argument("--tam-bloque", type=int, default=10000)
+    s.add_argument("--series", nargs="+", help="series a guardar (por defecto todas)")
+    s.add_argument("--tipos", choices=("compacta", "fraccional"))
+    s.add_argument("--filtro", help='p. ej. "min:Caja > 0 and final:calidad > 0.7"')
+    s.add_argument("--csv", help="exporta parámetros variables y valores finales (con --filtro, sólo esos)")
+    s.add_argument("--silencioso", action="store_true")
+    s.set_defaults(fn=cmd_sweep)
+
+    m = sub.add_parser("mc", help="réplicas Monte Carlo (modelo v1)")
+    m.add_argument("entrada")
+    m.add_argument("--replicas", type=int, default=1000)
+    m.add_argument("--seed", type=int, default=None, help="por defecto, random_seed de cada escenario")
+    m.add_argument("--series", nargs="+", default=["alumnos", "Caja", "calidad"])
+    m.add_argument("--csv", help="resumen media/p10/p50/p90 por escenario, serie y año")
+    m.add_argument("--tensor", help="directorio para el tensor completo memory-mapped")
+    m.add_argument("--tipos", choices=("compacta", "fraccional"))
+    m.set_defaults(fn=cmd_mc)
+
+    j = sub.add_parser("jsonl", help="procesa pedidos JSONL en micro-lotes (una respuesta por línea)")
+    j.add_argument("entrada", help='archivo de pedidos o "-" para stdin')
+    j.add_argument("-o", "--salida", default="-", help='archivo de respuestas (por defecto stdout)')
+    j.add_argument("--motor", choices=("lote", "simulate"), default="lote", help="motor si el pedido no lo indica")
+    j.add_argument("--tam-lote", type=int, default=256)
+    j.set_defaults(fn=cmd_jsonl)
+
+    x = sub.add_parser("export", help="exporta parámetros, series y KPIs a XLSX o ZIP de CSVs")
+    x.add_argument("entrada")
+    x.add_argument("salida", help="archivo .xlsx o .zip")
+    x.add_argument("--modelo", choices=sorted(MODELOS))
+    x.add_argument("--motor", choices=("lote", "simulate"), default="lote")
+    x.add_argument("--filtro", help="sólo para almacenes, p. ej. \"min:Caja > 0\"")
+    x.add_argument("--silencioso", action="store_true")
+    x.set_defaults(fn=cmd_export)
+
+    c = sub.add_parser("calibrar", help="ajusta parámetros de retención y demanda a datos observados")
+    c.add_argument("observaciones", help="CSV con escuela, anio y una columna por observable")
+    c.add_argument("--parametros", nargs="+", help="por defecto, calibration.PARAMETROS_DEFECTO")
+    c.add_argument("--csv", help="estimaciones con errores estándar e intervalos del 95%%")
+    c.set_defaults(fn=cmd_calibrar)
+
+    v = sub.add_parser("serve", help="servicio HTTP local con micro-lotes y caché")
+    v.add_argument("--host", default="127.0.0.1")
+    v.add_argument("--puerto", type=int, default=8150)
+    v.add_argument("--ventana-ms", type=float, default=5.0)
+    v.add_argument("--objetivo-p99-ms", type=float, default=250.0)
+    v.set_defaults(fn=cmd_serve)
+
+    b = sub.add_parser("bench", help="compara los motores escalar, lote y paralelo")
+    b.add_argument("-n", type=int, default=200)
+    b.add_argument("--modelo", choices=sorted(MODELOS))
+    b.add_argument("--fast-forward", type=int, metavar="ANIOS",
+                   help="compara además el fast-forward con el avance año a año (v1) a ese horizonte")
+    b.set_defaults(fn=cmd_bench)
+
+    args = ap.parse_args(argv)
+    if args.workers:
+        from model import parallel
+        parallel.pool(args.workers)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import numpy as np
+from dataclasses import asdict
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from model import dynamics, dynamics_v2
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+from model.params_array import ParamsArray
+from model.precision import PoliticaTipos, aplicar
+
+# Motor por lotes: N escenarios avanzan juntos año a año, con los parámetros
+# como columnas (N,). v1 corre con bajas esperadas (campo medio); v2 es
+# determinístico. Todas las series salen con forma (N, T+1, ...). La entrada
+# nativa es un ParamsArray; las listas de Params se convierten al entrar.
+
+HORIZONTE = {Params: "years", ParamsV2: "anios"}
+
+Lote = Union[ParamsArray, Sequence[Any]]
+
+
+def como_array(params: Lote) -> ParamsArray:
+    return params if isinstance(params, ParamsArray) else ParamsArray.desde_params(params)
+
+
+def columnas(params: Lote) -> SimpleNamespace:
+    # Un array (N,) por campo que varía; el horizonte tiene que ser común al lote
+    pa = como_array(params)
+    horizonte = HORIZONTE[pa.clase]
+    if not pa.es_constante(horizonte):
+        raise ValueError(f"todos los escenarios del lote deben tener el mismo {horizonte}")
+    return pa.espacio_nombres()
+
+
+def _escenario_primero(series: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    return {k: np.moveaxis(v, 0, 1) for k, v in series.items()}
+
+
+def correr_lote(params: Lote, tipos: Optional[PoliticaTipos] = None) -> Dict[str, np.ndarray]:
+    # tipos: política de almacenamiento de las series (ver model/precision.py)
+    pa = como_array(params)
+    cols = columnas(pa)
+    n = len(pa)
+    if pa.clase is ParamsV2:
+        return aplicar(_escenario_primero(dynamics_v2.correr(cols, shape=(n,))), tipos)
+    return aplicar(_escenario_primero(dynamics.correr(cols, shape=(n,))), tipos)
+
+
+def serie_escenario(series: Dict[str, np.ndarray], i: int) -> Dict[str, np.ndarray]:
+    return {k: v[i] for k, v in series.items()}
+
+
+def simulate_batch(params: Lote) -> List[Tuple[Any, Dict[str, Any]]]:
+    # Misma salida que simulate() por escenario (v1 en modo mean_field)
+    from model.frames import armar_dataframe, armar_dataframe_v2
+    pa = como_array(params)
+    series = correr_lote(pa)
+    v2 = pa.clase is ParamsV2
+    salida = []
+    for i, par in enumerate(pa):
+        s = serie_escenario(series, i)
+        if v2:
+            salida.append((armar_dataframe_v2(par, s), {"G": s["G"], "Div": s["Div"], "params": asdict(par)}))
+        else:
+            salida.append((armar_dataframe(par, s), {"params": asdict(par), "mean_field": True}))
+    return salida
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from model import parallel
+from model.version import MODEL_VERSION
+
+# Caché de resultados compartido por todo el proceso (todas las sesiones de la
+# app) con dos niveles: LRU en memoria con presupuesto de bytes y un directorio
+# en disco con los arrays comprimidos, visible para todos los procesos. La
+# clave combina la versión del modelo con el hash de los parámetros.
+#
+# Los DataFrames devueltos se comparten entre llamadas: no modificarlos.
+
+DIRECTORIO_DEFECTO = os.environ.get(
+    "SCHOOL_SIM_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "school-sim"))
+BYTES_MEMORIA_DEFECTO = 256 * 2**20
+
+
+def clave_params(par: Any) -> str:
+    datos = json.dumps([type(par).__module__, type(par).__name__, asdict(par)],
+                       sort_keys=True, default=float)
+    return hashlib.sha256(datos.encode()).hexdigest()
+
+
+def _bytes_df(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _guardar_df(path: str, df: pd.DataFrame):
+    # Escritura atómica: otro proceso nunca ve un archivo a medio escribir
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(
+                f, columnas=np.array(json.dumps(list(df.columns))),
+                **{f"c{i}": df[c].to_numpy() for i, c in enumerate(df.columns)})
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _cargar_df(path: str) -> pd.DataFrame:
+    with np.load(path) as z:
+        columnas = json.loads(str(z["columnas"]))
+        return pd.DataFrame({c: z[f"c{i}"] for i, c in enumerate(columnas)})
+
+
+class CacheResultados:
+    def __init__(self, directorio: Optional[str] = DIRECTORIO_DEFECTO,
+                 max_bytes: int = BYTES_MEMORIA_DEFECTO, version: str = MODEL_VERSION):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.version = version
+        self._memoria: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._tamanios = {}
+        self.bytes = 0
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+    def _path(self, clave: str) -> Optional[str]:
+        if self.directorio is None:
+            return None
+        return os.path.join(self.directorio, self.version, clave[:2], clave + ".npz")
+
+    def _recordar(self, clave: str, df: pd.DataFrame):
+        # Inserta en el nivel de memoria y desaloja los menos usados
+        tam = _bytes_df(df)
+        if tam > self.max_bytes:
+            return
+        if clave in self._memoria:
+            self.bytes -= self._tamanios[clave]
+        self._memoria[clave] = df
+        self._memoria.move_to_end(clave)
+        self._tamanios[clave] = tam
+        self.bytes += tam
+        while self.bytes > self.max_bytes:
+            viejo, _ = self._memoria.popitem(last=False)
+            self.bytes -= self._tamanios.pop(viejo)
+
+    def obtener(self, par: Any) -> Optional[pd.DataFrame]:
+        clave = clave_params(par)
+        with self._lock:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                self.aciertos_memoria += 1
+                return self._memoria[clave]
+        path = self._path(clave)
+        if path is not None and os.path.exists(path):
+            try:
+                df = _cargar_df(path)
+            except (OSError, ValueError, KeyError):
+                return None  # archivo dañado: se recalcula y se sobrescribe
+            with self._lock:
+                self.aciertos_disco += 1
+                self._recordar(clave, df)
+            return df
+        return None
+
+    def guardar(self, par: Any, df: pd.DataFrame):
+        clave = clave_params(par)
+        with self._lock:
+            self._recordar(clave, df)
+        path = self._path(clave)
+        if path is not None:
+            _guardar_df(path, df)
+
+    def obtener_o_calcular(self, par: Any, fn: Callable[[Any], pd.DataFrame]) -> pd.DataFrame:
+        df = self.obtener(par)
+        if df is None:
+            with self._lock:
+                self.fallos += 1
+            df = fn(par)
+            self.guardar(par, df)
+        return df
+
+    def simular(self, par: Any) -> pd.DataFrame:
+        return self.obtener_o_calcular(par, parallel.simular_df)
+
+    def simular_varios(self, params_list: Sequence[Any]) -> List[pd.DataFrame]:
+        # Lo que falta en la caché se corre en paralelo en el pool compartido
+        resultados = [self.obtener(p) for p in params_list]
+        faltan = [i for i, df in enumerate(resultados) if df is None]
+        if faltan:
+            with self._lock:
+                self.fallos += len(faltan)
+            nuevos = parallel.simular_concurrente([params_list[i] for i in faltan])
+            for i, df in zip(faltan, nuevos):
+                self.guardar(params_list[i], df)
+                resultados[i] = df
+        return resultados
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "version": self.version,
+                "entradas_memoria": len(self._memoria),
+                "bytes_memoria": self.bytes,
+                "max_bytes": self.max_bytes,
+                "aciertos_memoria": self.aciertos_memoria,
+                "aciertos_disco": self.aciertos_disco,
+                "fallos": self.fallos,
+            }
+
+
+_global: Optional[CacheResultados] = None
+_lock_global = threading.Lock()
+
+
+def cache_global() -> CacheResultados:
+    # Una instancia por proceso, compartida por todas las sesiones
+    global _global
+    with _lock_global:
+        if _global is None:
+            _global = CacheResultados()
+        return _global
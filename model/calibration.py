@@ -0,0 +1,305 @@
+import math
+from dataclasses import dataclass, field, replace
+from statistics import NormalDist
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model import batch
+from model.core import Params
+from model.params_array import ParamsArray
+
+# Calibración del modelo v1 (campo medio) contra series observadas de una o
+# muchas escuelas. Minimiza el error cuadrático ponderado con Levenberg-
+# Marquardt acotado; todas las escuelas avanzan juntas y cada iteración es
+# una sola llamada al motor por lotes con cada escuela y sus perturbaciones
+# por diferencias finitas (S x (P+1) escenarios). La incertidumbre sale de la
+# aproximación de Gauss-Newton en el óptimo: cov = s² (JᵀJ)⁻¹ con
+# s² = SSE / (n - p).
+#
+# Cada observable es una serie por año del modelo (el año 0 es la situación
+# inicial de base); NaN marca los años sin dato. Un parámetro que no mueve
+# ningún observable queda sin identificar: su error estándar es inf.
+
+# Parámetros ajustables y sus cotas
+LIMITES = {
+    "tasa_continuidad_jardin_primaria": (0.0, 1.0),
+    "tasa_bajas_imprevistas": (0.0, 0.5),
+    "tasa_bajas_max_por_calidad": (0.0, 1.0),
+    "tasa_descenso_demanda": (-0.5, 0.5),
+    "alpha_candidatos_q": (0.0, 5.0),
+    "qref_candidatos": (0.0, 1.0),
+    "k_bajas_precio": (0.0, 2.0),
+    "calidad_base": (0.0, 1.0),
+    "politica_seleccion": (0.0, 1.0),
+    "k_saturacion": (0.0, 10.0),
+    "candidatos_inicial": (0.0, 10000.0),
+}
+
+PARAMETROS_DEFECTO = (
+    "tasa_continuidad_jardin_primaria", "tasa_bajas_imprevistas",
+    "tasa_descenso_demanda", "alpha_candidatos_q",
+)
+
+
+def _continuidad(s: Dict[str, np.ndarray]) -> np.ndarray:
+    # Fracción de egresados de sala de 5 que pasan a 1° grado; el año 0 no
+    # tiene egresados
+    sala5 = s["Gk"][..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c = np.where(sala5 > 0, 1.0 - s["bajas_no_continuidad"] / sala5, np.nan)
+    c[..., 0] = np.nan
+    return c
+
+
+# Observables derivados; cualquier otra serie anual del motor por lotes
+# (admitidos, Demanda, calidad, bajas_totales, ...) se usa por su nombre
+OBSERVABLES = {
+    "sala5": lambda s: s["Gk"][..., 0],
+    "primer_grado": lambda s: s["Gk"][..., 1],
+    "alumnos": lambda s: s["Gk"].sum(axis=-1),
+    "continuidad": _continuidad,
+}
+
+# Caso San Gabriel: sala de 5 vs 1° grado. La tabla del caso da la
+# continuidad de cada año; se la alinea con los años 1..3 del modelo. Sala de
+# 5 y 1° grado quedan sólo como referencia: en valores absolutos dependen del
+# tamaño inicial de la escuela, que el caso no trae, y la continuidad ya
+# resume su cociente. Con esa única serie el único parámetro identificable es
+# la tasa de continuidad (PARAMETROS_CASO).
+CASO_SAN_GABRIEL = {
+    "anios": (2022, 2023, 2024),
+    "sala5": (48, 50, 52),
+    "primer_grado": (46, 42, 29),
+    "continuidad": (0.95, 0.84, 0.56),
+}
+PARAMETROS_CASO = ("tasa_continuidad_jardin_primaria",)
+
+
+def observable(series: Dict[str, np.ndarray], nombre: str) -> np.ndarray:
+    if nombre in OBSERVABLES:
+        return OBSERVABLES[nombre](series)
+    return series[nombre]
+
+
+@dataclass
+class Observaciones:
+    series: Mapping[str, Sequence[float]]  # observable -> valor por año del modelo (NaN = sin dato)
+    base: Params = field(default_factory=Params)  # lo que se sabe de la escuela
+    # observable -> escalar o array por año; por defecto 1 / escala² con la
+    # escala media de lo observado (error relativo, comparable entre series)
+    pesos: Mapping[str, Any] = field(default_factory=dict)
+    nombre: str = ""
+
+    @property
+    def anios(self) -> int:
+        return max(len(v) for v in self.series.values())
+
+
+def observaciones_caso() -> Observaciones:
+    c = CASO_SAN_GABRIEL["continuidad"]
+    return Observaciones({"continuidad": [math.nan, *c]}, nombre="San Gabriel")
+
+
+def observaciones_desde_dataframe(df: Any, col_escuela: str = "escuela", col_anio: str = "anio",
+                                  bases: Optional[Mapping[str, Params]] = None) -> List[Observaciones]:
+    # Tabla ancha: una fila por escuela y año, una columna por observable. El
+    # primer año de cada escuela es el año 0 del modelo
+    observables = [c for c in df.columns if c not in (col_escuela, col_anio)]
+    salida = []
+    for escuela, g in df.groupby(col_escuela, sort=False):
+        anios = g[col_anio].to_numpy()
+        k = (anios - anios.min()).astype(int)
+        series = {}
+        for o in observables:
+            v = np.full(k.max() + 1, np.nan)
+            v[k] = g[o].to_numpy(dtype=float)
+            series[o] = v
+        base = (bases or {}).get(escuela, Params())
+        salida.append(Observaciones(series, base, nombre=str(escuela)))
+    return salida
+
+
+@dataclass
+class Calibracion:
+    nombre: str
+    parametros: List[str]
+    valores: np.ndarray
+    error_estandar: np.ndarray  # inf si el parámetro no está identificado
+    covarianza: np.ndarray
+    sse: float  # error cuadrático ponderado en el óptimo
+    n_obs: int
+    iteraciones: int
+    motivo: str  # "convergio", "sin_mejora" (ningún paso reduce el error) o "max_iter"
+    en_limite: np.ndarray  # el óptimo quedó sobre una cota (el error estándar es aproximado)
+    params: Params
+    ajuste: Dict[str, np.ndarray]  # observable -> serie del modelo calibrado
+
+    @property
+    def convergio(self) -> bool:
+        return self.motivo == "convergio"
+
+    @property
+    def correlacion(self) -> np.ndarray:
+        d = np.sqrt(np.diag(self.covarianza))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.covarianza / np.outer(d, d)
+
+    def intervalo(self, nivel: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+        z = NormalDist().inv_cdf(0.5 + nivel / 2)
+        return self.valores - z * self.error_estandar, self.valores + z * self.error_estandar
+
+    def tabla(self, nivel: float = 0.95):
+        import pandas as pd
+        lo, hi = self.intervalo(nivel)
+        return pd.DataFrame({
+            "parametro": self.parametros,
+            "valor": self.valores,
+            "error_estandar": self.error_estandar,
+            "ic_inf": lo,
+            "ic_sup": hi,
+            "en_limite": self.en_limite,
+        })
+
+
+class _Problema:
+    # Observaciones de todas las escuelas como matrices (S, M) sobre un
+    # horizonte común
+    def __init__(self, observaciones: Sequence[Observaciones], parametros: Sequence[str]):
+        desconocidos = [p for p in parametros if p not in LIMITES]
+        if desconocidos:
+            raise ValueError(f"parámetros no calibrables: {desconocidos} (ver calibration.LIMITES)")
+        self.parametros = list(parametros)
+        self.lo = np.array([LIMITES[p][0] for p in parametros])
+        self.hi = np.array([LIMITES[p][1] for p in parametros])
+        anios = max(o.anios for o in observaciones)
+        self.bases = ParamsArray.desde_params([replace(o.base, years=anios - 1) for o in observaciones])
+        self.nombres = sorted({n for o in observaciones for n in o.series})
+        S, T = len(observaciones), anios
+        self.y = np.full((S, len(self.nombres), T), np.nan)
+        raiz_w = np.zeros_like(self.y)
+        for i, o in enumerate(observaciones):
+            for j, n in enumerate(self.nombres):
+                if n not in o.series:
+                    continue
+                v = np.asarray(o.series[n], dtype=float)
+                self.y[i, j, :len(v)] = v
+                escala = np.nanmean(np.abs(v)) if np.isfinite(v).any() else 1.0
+                w = o.pesos.get(n, 1.0 / max(escala, 1e-12) ** 2)
+                raiz_w[i, j, :len(v)] = np.sqrt(np.broadcast_to(np.asarray(w, dtype=float), v.shape))
+        self.raiz_w = np.where(np.isfinite(self.y), raiz_w, 0.0).reshape(S, -1)
+        self.y = np.nan_to_num(self.y).reshape(S, -1)
+        self.n_obs = (self.raiz_w > 0).sum(axis=1)
+
+    def series(self, escuelas: np.ndarray, theta: np.ndarray) -> Dict[str, np.ndarray]:
+        lote = self.bases[escuelas].reemplazar(**{p: theta[:, j] for j, p in enumerate(self.parametros)})
+        return batch.correr_lote(lote)
+
+    def residuos(self, escuelas: np.ndarray, theta: np.ndarray) -> np.ndarray:
+        # (R, M): sqrt(w) * (modelo - observado); 0 donde no hay dato
+        s = self.series(escuelas, theta)
+        modelo = np.stack([observable(s, n) for n in self.nombres], axis=1).reshape(len(escuelas), -1)
+        w = self.raiz_w[escuelas]
+        return np.where(w > 0, w * (np.nan_to_num(modelo) - self.y[escuelas]), 0.0)
+
+    def jacobiano(self, escuelas: np.ndarray, theta: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Residuos (S, M) y jacobiano (S, M, P) en una sola corrida por lotes
+        S, P = theta.shape
+        h = 1e-4 * (self.hi - self.lo)
+        h = np.where(theta + h > self.hi, -h, h)  # sobre la cota superior, hacia adentro
+        filas = np.repeat(theta[:, None, :], P + 1, axis=1)
+        filas[:, 1:, :] += np.eye(P) * h[:, None, :]
+        r = self.residuos(np.repeat(escuelas, P + 1), filas.reshape(-1, P)).reshape(S, P + 1, -1)
+        J = (r[:, 1:, :] - r[:, :1, :]) / h[:, :, None]
+        return r[:, 0, :], np.swapaxes(J, 1, 2)
+
+
+def calibrar_lote(observaciones: Sequence[Observaciones], parametros: Sequence[str] = PARAMETROS_DEFECTO,
+                  iniciales: Optional[np.ndarray] = None, max_iter: int = 100,
+                  tol: float = 1e-10) -> List[Calibracion]:
+    # iniciales: (S, P); por defecto los valores de la base de cada escuela
+    prob = _Problema(observaciones, parametros)
+    S, P = len(observaciones), len(prob.parametros)
+    todas = np.arange(S)
+    theta = (np.asarray(iniciales, dtype=float).reshape(S, P) if iniciales is not None else
+             np.column_stack([prob.bases.columna(p) for p in prob.parametros]).astype(float))
+    theta = np.clip(theta, prob.lo, prob.hi)
+    lam = np.full(S, 1e-3)
+    activas = np.ones(S, dtype=bool)
+    motivo = np.full(S, "max_iter", dtype=object)
+    iteraciones = np.zeros(S, dtype=int)
+    r, J = prob.jacobiano(todas, theta)
+    sse = (r ** 2).sum(axis=1)
+    for _ in range(max_iter):
+        idx = np.flatnonzero(activas)
+        if not idx.size:
+            break
+        iteraciones[idx] += 1
+        # Paso de Levenberg-Marquardt con escala de Marquardt, proyectado a las cotas
+        A = np.einsum("smp,smq->spq", J[idx], J[idx])
+        g = np.einsum("smp,sm->sp", J[idx], r[idx])
+        # Parámetros sobre una cota que el gradiente empuja hacia afuera quedan
+        # fijos en este paso (si no, la proyección hace zigzag contra la cota)
+        fijos = ((theta[idx] <= prob.lo) & (g > 0)) | ((theta[idx] >= prob.hi) & (g < 0))
+        libres = ~fijos
+        A = A * (libres[:, :, None] & libres[:, None, :]) + fijos[:, :, None] * np.eye(P)
+        g = np.where(fijos, 0.0, g)
+        diag = np.einsum("spp->sp", A)
+        # (el término mínimo mantiene resoluble el sistema con parámetros sin efecto)
+        amortiguado = A + (lam[idx, None] * diag + 1e-9 * diag.max(axis=1, keepdims=True) + 1e-300)[..., None] * np.eye(P)
+        paso = -np.linalg.solve(amortiguado, g[..., None])[..., 0]
+        nuevo = np.clip(theta[idx] + paso, prob.lo, prob.hi)
+        sse_nuevo = (prob.residuos(idx, nuevo) ** 2).sum(axis=1)
+        mejora = sse_nuevo < sse[idx]
+        acepta = idx[mejora]
+        lam[acepta] *= 0.3
+        lam[idx[~mejora]] *= 10.0
+        movido = np.abs(nuevo[mejora] - theta[acepta]).max(axis=1, initial=0.0) if acepta.size else np.zeros(0)
+        converge = np.zeros(S, dtype=bool)
+        # (el error ponderado es relativo: por debajo de tol el ajuste ya es exacto)
+        converge[acepta] = ((sse[acepta] - sse_nuevo[mejora] <= tol * (sse[acepta] + tol))
+                            | (sse_nuevo[mejora] <= tol)
+                            | (movido <= 1e-10 * (prob.hi - prob.lo).max()))
+        theta[acepta] = nuevo[mejora]
+        sse[acepta] = sse_nuevo[mejora]
+        # lam enorme sin haber convergido: ya no hay paso que mejore (no es
+        # un óptimo garantizado, p. ej. un jacobiano por diferencias malo)
+        estancada = activas & ~converge & (lam >= 1e10)
+        motivo[converge] = "convergio"
+        motivo[estancada] = "sin_mejora"
+        activas &= ~converge & ~estancada
+        if acepta.size:
+            r[acepta], J[acepta] = prob.jacobiano(acepta, theta[acepta])
+
+    # Incertidumbre de Gauss-Newton en el óptimo
+    resultados = []
+    s_ajuste = prob.series(todas, theta)
+    for i, o in enumerate(observaciones):
+        A = J[i].T @ J[i]
+        identificado = np.abs(J[i]).sum(axis=0) > 0
+        p_ef = int(identificado.sum())
+        n = int(prob.n_obs[i])
+        s2 = sse[i] / (n - p_ef) if n > p_ef else math.nan
+        cov = np.full((P, P), math.nan)
+        if p_ef:
+            sub = np.ix_(identificado, identificado)
+            cov[sub] = s2 * np.linalg.pinv(A[sub])
+        ee = np.where(identificado, np.sqrt(np.abs(np.diag(cov))), math.inf)
+        en_limite = (theta[i] <= prob.lo + 1e-9) | (theta[i] >= prob.hi - 1e-9)
+        resultados.append(Calibracion(
+            nombre=o.nombre or str(i), parametros=list(prob.parametros), valores=theta[i].copy(),
+            error_estandar=ee, covarianza=cov, sse=float(sse[i]), n_obs=n, iteraciones=int(iteraciones[i]),
+            motivo=str(motivo[i]), en_limite=en_limite,
+            params=replace(o.base, **{p: float(theta[i, j]) for j, p in enumerate(prob.parametros)}),
+            ajuste={n_: observable(s_ajuste, n_)[i] for n_ in prob.nombres}))
+    return resultados
+
+
+def calibrar(observaciones: Observaciones, parametros: Sequence[str] = PARAMETROS_DEFECTO,
+             iniciales: Optional[Sequence[float]] = None, max_iter: int = 100) -> Calibracion:
+    ini = None if iniciales is None else np.asarray(iniciales, dtype=float)[None, :]
+    return calibrar_lote([observaciones], parametros, ini, max_iter)[0]
+
+
+def calibrar_caso(parametros: Sequence[str] = PARAMETROS_CASO, max_iter: int = 100) -> Calibracion:
+    return calibrar(observaciones_caso(), parametros, max_iter=max_iter)
@@ -0,0 +1,276 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from model import batch
+from model.params_array import ParamsArray
+from model.precision import PoliticaTipos
+from model.store import AlmacenResultados, nombre_bloque
+
+# Barridos repartidos entre varias máquinas. Un coordinador parte un
+# ParamsArray en unidades de trabajo (rangos de filas) y escucha por TCP; los
+# workers (uno o más por host) piden una unidad, la corren con el motor por
+# lotes y devuelven las series, que el coordinador escribe en el almacén
+# columnar como un bloque por unidad. Si un worker se cae (se corta su
+# conexión) o se pasa del plazo, sus unidades vuelven a la cola. Las unidades
+# que ya están en el almacén no se repiten, así que un barrido cortado se
+# retoma relanzando el coordinador sobre el mismo directorio.
+#
+# cluster.json identifica el barrido (huella de los parámetros, tamaño de
+# unidad, series y tipos): relanzar con otro ParamsArray sobre el mismo
+# directorio es un error, no una reanudación.
+#
+# Los mensajes viajan con multiprocessing.connection (pickle autenticado con
+# una clave compartida): quien conoce la clave puede ejecutar código en el
+# coordinador y en los workers. No hay clave por defecto (clave= o
+# SCHOOL_SIM_CLAVE) y el coordinador escucha sólo en 127.0.0.1 salvo que se
+# pida otra dirección; usar sólo dentro de una red de confianza.
+
+PUERTO_DEFECTO = 6150
+DESCRIPTOR = "cluster.json"
+
+
+def _clave(clave: Optional[bytes]) -> bytes:
+    clave = clave or os.environ.get("SCHOOL_SIM_CLAVE", "").encode()
+    if not clave:
+        raise ValueError("falta la clave compartida: pasar clave= o definir SCHOOL_SIM_CLAVE")
+    return clave
+
+
+def _descriptor(pa: ParamsArray, tam_unidad: int, series, tipos) -> dict:
+    return {"huella": pa.huella(), "n": len(pa), "tam_unidad": tam_unidad,
+            "series": list(series) if series is not None else None,
+            "tipos": None if tipos is None else [tipos.personas, tipos.dinero, tipos.ratios]}
+
+
+def _verificar_descriptor(almacen: AlmacenResultados, desc: dict):
+    path = os.path.join(almacen.directorio, DESCRIPTOR)
+    if os.path.exists(path):
+        with open(path) as f:
+            previo = json.load(f)
+        if previo != desc:
+            raise ValueError(f"{almacen.directorio} tiene otro barrido (huella {previo.get('huella')}); "
+                             "usar otro directorio o borrarlo")
+        return
+    if almacen.bloques:
+        raise ValueError(f"{almacen.directorio} ya tiene bloques de otro origen")
+    os.makedirs(almacen.directorio, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(desc, f, indent=1)
+
+
+class Coordinador:
+    def __init__(self, pa: ParamsArray, almacen: AlmacenResultados, tam_unidad: int = 20000,
+                 direccion: Tuple[str, int] = ("127.0.0.1", PUERTO_DEFECTO), clave: Optional[bytes] = None,
+                 series: Optional[Sequence[str]] = None, tipos: Optional[PoliticaTipos] = None,
+                 plazo_unidad: float = 600.0):
+        clave = _clave(clave)
+        _verificar_descriptor(almacen, _descriptor(pa, tam_unidad, series, tipos))
+        self.pa = pa
+        self.almacen = almacen
+        self.series = list(series) if series is not None else None
+        self.tipos = tipos
+        self.plazo_unidad = plazo_unidad
+        self.unidades = [(i, min(i + tam_unidad, len(pa))) for i in range(0, len(pa), tam_unidad)]
+        hechas = set(almacen.bloques)
+        self.completas = {k for k in range(len(self.unidades)) if nombre_bloque(k) in hechas}
+        self.pendientes = deque(k for k in range(len(self.unidades)) if k not in self.completas)
+        self.asignadas: Dict[int, Tuple[str, float]] = {}  # unidad -> (worker, vence)
+        self.escribiendo = set()
+        self.reencoladas = 0
+        self._lock = threading.Lock()
+        self._escritura = threading.Lock()  # el almacén tiene un solo escritor
+        self._listo = threading.Event()
+        self._listener = Listener(direccion, authkey=clave)
+        if not self.pendientes:
+            self._listo.set()
+
+    @property
+    def direccion(self) -> Tuple[str, int]:
+        return self._listener.address
+
+    def progreso(self) -> Tuple[int, int]:
+        with self._lock:
+            return len(self.completas), len(self.unidades)
+
+    # ---------- Cola de unidades ----------
+
+    def _reencolar(self, k: int):
+        self.asignadas.pop(k, None)
+        if k not in self.completas and k not in self.escribiendo and k not in self.pendientes:
+            self.pendientes.appendleft(k)
+            self.reencoladas += 1
+
+    def _tomar(self, worker: str) -> Optional[int]:
+        with self._lock:
+            ahora = time.monotonic()
+            for k, (_, vence) in list(self.asignadas.items()):
+                if vence < ahora:
+                    self._reencolar(k)  # worker colgado: otra copia puede terminarla
+            if not self.pendientes:
+                return None
+            k = self.pendientes.popleft()
+            self.asignadas[k] = (worker, ahora + self.plazo_unidad)
+            return k
+
+    def _liberar(self, worker: str):
+        with self._lock:
+            for k, (w, _) in list(self.asignadas.items()):
+                if w == worker:
+                    self._reencolar(k)
+
+    def _completar(self, k: int, series: Dict[str, Any]):
+        ini, fin = self.unidades[k]
+        with self._lock:
+            if k in self.completas or k in self.escribiendo:
+                return  # resultado tardío de una unidad reasignada
+            self.escribiendo.add(k)
+        try:
+            with self._escritura:
+                self.almacen.agregar(self.pa[ini:fin], series, bloque=nombre_bloque(k))
+        except BaseException:
+            with self._lock:
+                self.escribiendo.discard(k)
+                self._reencolar(k)
+            raise
+        with self._lock:
+            self.escribiendo.discard(k)
+            self.completas.add(k)
+            self.asignadas.pop(k, None)
+            if k in self.pendientes:
+                self.pendientes.remove(k)
+            if len(self.completas) == len(self.unidades):
+                self._listo.set()
+
+    # ---------- Servidor ----------
+
+    def _atender(self, conn: Connection):
+        worker = None
+        try:
+            while True:
+                msg = conn.recv()
+                if msg[0] == "pedir":
+                    worker = msg[1]
+                    if self._listo.is_set():
+                        conn.send(("fin",))
+                        return
+                    k = self._tomar(worker)
+                    if k is None:
+                        conn.send(("esperar", 1.0))
+                    else:
+                        ini, fin = self.unidades[k]
+                        conn.send(("unidad", k, self.pa[ini:fin], self.series, self.tipos))
+                elif msg[0] == "resultado":
+                    self._completar(msg[1], msg[2])
+        except (EOFError, OSError):
+            pass
+        finally:
+            if worker is not None:
+                self._liberar(worker)
+            conn.close()
+
+    def _aceptar(self):
+        while not self._listo.is_set():
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError):
+                if self._listo.is_set():
+                    return
+                continue  # conexión rechazada (clave inválida) o cortada
+            threading.Thread(target=self._atender, args=(conn,), daemon=True).start()
+
+    def _despertar(self):
+        # Conexión vacía para que accept() vuelva y el hilo vea el fin
+        host, puerto = self.direccion
+        try:
+            socket.create_connection(("127.0.0.1" if host == "0.0.0.0" else host, puerto), timeout=1.0).close()
+        except OSError:
+            pass
+
+    def correr(self, al_progreso: Optional[Callable[[int, int], None]] = None,
+               intervalo: float = 1.0) -> AlmacenResultados:
+        # Bloquea hasta que todas las unidades están en el almacén
+        hilo = threading.Thread(target=self._aceptar, daemon=True)
+        hilo.start()
+        try:
+            while not self._listo.wait(intervalo):
+                if al_progreso is not None:
+                    al_progreso(*self.progreso())
+        finally:
+            self._listo.set()
+            self._despertar()
+            self._listener.close()
+        self.almacen.ordenar()
+        if al_progreso is not None:
+            al_progreso(*self.progreso())
+        return self.almacen
+
+
+def trabajar(direccion: Tuple[str, int], clave: Optional[bytes] = None, reintentos: int = 30,
+             espera: float = 1.0) -> int:
+    # Worker: pide unidades hasta que el coordinador avisa el fin. Devuelve
+    # cuántas unidades corrió
+    clave = _clave(clave)
+    worker = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    for intento in range(reintentos):
+        try:
+            conn = Client(direccion, authkey=clave)
+            break
+        except ConnectionRefusedError:
+            time.sleep(espera)  # el coordinador todavía no escucha
+    else:
+        raise ConnectionRefusedError(f"no se pudo conectar a {direccion}")
+    hechas = 0
+    with conn:
+        while True:
+            try:
+                conn.send(("pedir", worker))
+                msg = conn.recv()
+            except (EOFError, OSError):
+                return hechas  # el coordinador terminó o se cayó
+            if msg[0] == "fin":
+                return hechas
+            if msg[0] == "esperar":
+                time.sleep(msg[1])
+                continue
+            _, k, lote, series, tipos = msg
+            s = batch.correr_lote(lote, tipos)
+            if series is not None:
+                s = {n: s[n] for n in series}
+            conn.send(("resultado", k, s))
+            hechas += 1
+
+
+def _direccion(texto: str) -> Tuple[str, int]:
+    host, _, puerto = texto.rpartition(":")
+    return host or "localhost", int(puerto)
+
+
+if __name__ == "__main__":
+    # python -m model.cluster worker HOST:PUERTO
+    # python -m model.cluster coordinador params.csv DIRECTORIO [--host H] [--puerto N] [--unidad N]
+    # (la clave compartida va en SCHOOL_SIM_CLAVE)
+    import argparse
+    ap = argparse.ArgumentParser(prog="python -m model.cluster")
+    sub = ap.add_subparsers(dest="modo", required=True)
+    w = sub.add_parser("worker")
+    w.add_argument("direccion")
+    c = sub.add_parser("coordinador")
+    c.add_argument("params")
+    c.add_argument("directorio")
+    c.add_argument("--host", default="127.0.0.1", help="0.0.0.0 para aceptar workers de otros hosts")
+    c.add_argument("--puerto", type=int, default=PUERTO_DEFECTO)
+    c.add_argument("--unidad", type=int, default=20000)
+    args = ap.parse_args()
+    if args.modo == "worker":
+        print(f"{trabajar(_direccion(args.direccion))} unidades")
+    else:
+        coord = Coordinador(ParamsArray.leer_csv(args.params), AlmacenResultados(args.directorio),
+                            args.unidad, (args.host, args.puerto))
+        coord.correr(lambda h, t: print(f"{h}/{t} unidades", flush=True))
@@ -0,0 +1,134 @@
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Cubo de resultados escenario x año x métrica sobre un único array contiguo
+# (S, T, M) con índices de etiquetas. Los lotes lo llenan sin pasar por
+# DataFrames y las vistas para gráficos salen en formato largo de una vez.
+
+
+class CuboResultados:
+    def __init__(self, escenarios: Sequence[str], anios: Sequence[Any],
+                 metricas: Sequence[str], datos: np.ndarray):
+        datos = np.ascontiguousarray(datos, dtype=float)
+        if datos.shape != (len(escenarios), len(anios), len(metricas)):
+            raise ValueError(f"forma {datos.shape} no coincide con las etiquetas "
+                             f"({len(escenarios)}, {len(anios)}, {len(metricas)})")
+        self.escenarios = list(escenarios)
+        self.anios = np.asarray(anios)
+        self.metricas = list(metricas)
+        self.datos = datos
+        self._i_esc = {e: i for i, e in enumerate(self.escenarios)}
+        self._i_met = {m: i for i, m in enumerate(self.metricas)}
+
+    @property
+    def shape(self):
+        return self.datos.shape
+
+    # ---------- Construcción ----------
+
+    @classmethod
+    def desde_dataframes(cls, dfs: Mapping[str, pd.DataFrame], metricas: Optional[Sequence[str]] = None,
+                         col_anio: str = "Año") -> "CuboResultados":
+        primero = next(iter(dfs.values()))
+        if metricas is None:
+            metricas = [c for c in primero.columns if c != col_anio]
+        datos = np.stack([df[list(metricas)].to_numpy(dtype=float) for df in dfs.values()])
+        return cls(list(dfs), primero[col_anio].to_numpy(), metricas, datos)
+
+    @classmethod
+    def desde_series(cls, escenarios: Sequence[str], series: Mapping[str, np.ndarray],
+                     anios: Optional[Sequence[Any]] = None) -> "CuboResultados":
+        # series: métrica -> (S, T) como las devuelve batch.correr_lote; las
+        # series con ejes extra (grados) se suman sobre ese eje
+        metricas = list(series)
+        S, T = np.shape(series[metricas[0]])[:2]
+        datos = np.empty((S, T, len(metricas)))
+        for j, m in enumerate(metricas):
+            v = np.asarray(series[m], dtype=float)
+            datos[:, :, j] = v.reshape(S, T, -1).sum(axis=-1) if v.ndim > 2 else v
+        return cls(escenarios, np.arange(T) if anios is None else anios, metricas, datos)
+
+    @classmethod
+    def desde_artefacto(cls, art: Any, metricas: Optional[Sequence[str]] = None,
+                        col_anio: str = "Año") -> "CuboResultados":
+        # Artefacto de model.scenarios: ya es (S, T, columnas)
+        cols = art.columnas
+        metricas = [c for c in cols if c != col_anio] if metricas is None else list(metricas)
+        idx = [cols.index(m) for m in metricas]
+        anios = art.datos[0, :, cols.index(col_anio)] if col_anio in cols else np.arange(art.datos.shape[1])
+        return cls(art.nombres, anios, metricas, art.datos[:, :, idx])
+
+    # ---------- Selección ----------
+
+    def _indices(self, etiquetas, mapa):
+        if etiquetas is None:
+            return slice(None)
+        if isinstance(etiquetas, str):
+            etiquetas = [etiquetas]
+        return [mapa[e] for e in etiquetas]
+
+    def sel(self, escenarios=None, metricas=None) -> "CuboResultados":
+        ie = self._indices(escenarios, self._i_esc)
+        im = self._indices(metricas, self._i_met)
+        esc = self.escenarios if escenarios is None else [self.escenarios[i] for i in ie]
+        met = self.metricas if metricas is None else [self.metricas[i] for i in im]
+        return CuboResultados(esc, self.anios, met, self.datos[ie][:, :, im])
+
+    def metrica(self, nombre: str) -> np.ndarray:
+        # (S, T)
+        return self.datos[:, :, self._i_met[nombre]]
+
+    def final(self, nombre: str) -> np.ndarray:
+        return self.datos[:, -1, self._i_met[nombre]]
+
+    def total(self, nombre: str) -> np.ndarray:
+        return self.datos[:, :, self._i_met[nombre]].sum(axis=1)
+
+    # ---------- Transformaciones ----------
+
+    def acumulado(self, metricas=None) -> "CuboResultados":
+        cubo = self if metricas is None else self.sel(metricas=metricas)
+        return CuboResultados(cubo.escenarios, cubo.anios, cubo.metricas, np.cumsum(cubo.datos, axis=1))
+
+    def relativo(self, base: str, modo: str = "ratio") -> "CuboResultados":
+        # Respecto del escenario base: "ratio" (x / base - 1) o "diferencia"
+        ref = self.datos[self._i_esc[base]][None]
+        if modo == "diferencia":
+            datos = self.datos - ref
+        elif modo == "ratio":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                datos = np.where(ref != 0, self.datos / np.where(ref != 0, ref, 1.0) - 1.0, np.nan)
+        else:
+            raise ValueError(f"modo desconocido: {modo}")
+        return CuboResultados(self.escenarios, self.anios, self.metricas, datos)
+
+    # ---------- Exportación ----------
+
+    def largo(self, metricas=None, col_escenario: str = "Escenario", col_anio: str = "Año",
+              apilar: bool = False) -> pd.DataFrame:
+        # Formato largo para Altair: una fila por escenario y año con una
+        # columna por métrica, o (apilar=True) una fila por métrica con
+        # columnas Metrica/Valor
+        cubo = self if metricas is None else self.sel(metricas=metricas)
+        S, T, M = cubo.datos.shape
+        esc = np.repeat(np.asarray(cubo.escenarios, dtype=object), T)
+        anios = np.tile(cubo.anios, S)
+        if not apilar:
+            cols: Dict[str, Any] = {col_anio: anios}
+            cols.update({m: cubo.datos[:, :, j].reshape(-1) for j, m in enumerate(cubo.metricas)})
+            cols[col_escenario] = esc
+            return pd.DataFrame(cols)
+        return pd.DataFrame({
+            col_anio: np.repeat(anios, M),
+            col_escenario: np.repeat(esc, M),
+            "Metrica": np.tile(np.asarray(cubo.metricas, dtype=object), S * T),
+            "Valor": cubo.datos.reshape(-1),
+        })
+
+    def resumen_final(self, metricas=None) -> pd.DataFrame:
+        cubo = self if metricas is None else self.sel(metricas=metricas)
+        df = pd.DataFrame(cubo.datos[:, -1, :], columns=cubo.metricas)
+        df.insert(0, "Escenario", cubo.escenarios)
+        return df
@@ -0,0 +1,293 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from model.core import Params
+
+# Mapa anual del modelo v1 escrito sobre arrays: cada función acepta estados con
+# dimensiones iniciales arbitrarias (escenarios, años apilados) y sólo usa
+# operaciones elementales de NumPy, sin asignaciones in-place.
+
+G = 12
+SEGMENTO_BAJAS = slice(2, 10)  # G3-G10
+
+# Modos de admisión (qué término del min() determina los admitidos)
+ADMISION_POLITICA = 0
+ADMISION_DEMANDA = 1
+ADMISION_CAPACIDAD = 2
+
+# Series anuales que produce el mapa (mismos nombres que en simulate)
+SERIES_FLUJO = (
+    "Demanda", "calidad", "facturacion", "sueldos", "inv_infra", "inv_calidad_alumno",
+    "mantenimiento", "marketing", "costos_opex", "resultado_operativo", "capex_total",
+    "capex_propio", "capex_financiado", "interes_deuda", "amortizacion_deuda",
+    "resultado_neto", "cac", "nuevos_candidatos", "nuevos_candidatos_mkt",
+    "nuevos_candidatos_q", "admitidos", "rechazados", "selectividad", "bajas_totales",
+    "bajas_no_continuidad", "egresados", "pipeline_construcciones",
+)
+
+
+@dataclass
+class Estado:
+    Gk: Any  # (..., 12)
+    Div: Any  # (..., 12)
+    Act: Any
+    Caja: Any
+    Deuda: Any
+    Demanda: Any
+    calidad_prev: Any  # calidad del año anterior (en k=0 vale calidad_base)
+
+
+def por_grado(x):
+    # Parámetro escalar o columna (N,) listo para operar contra el eje de grados
+    return np.expand_dims(x, -1)
+
+
+def estado_inicial(par: Params, shape=()) -> Estado:
+    uno = np.ones(shape)
+    return Estado(
+        Gk=uno[..., None] * por_grado(par.g_inicial) * np.ones(G),
+        Div=uno[..., None] * por_grado(par.div_inicial_por_grado) * np.ones(G),
+        Act=uno * par.activos_inicial,
+        Caja=uno * par.caja_inicial,
+        Deuda=uno * par.deuda_inicial,
+        Demanda=uno * par.demanda_potencial_inicial,
+        calidad_prev=uno * par.calidad_base,
+    )
+
+
+def _seguro(den, cond):
+    # Denominador que no produce avisos donde la rama no se usa
+    return np.where(cond, den, 1.0)
+
+
+def bajas_esperadas(tasa, segmento):
+    # Esperanza del sorteo multinomial: tasa * alumnos de cada grado del segmento
+    return np.maximum(tasa, 0.0)[..., None] * segmento
+
+
+def paso(est: Estado, par: Params, k, T: int,
+         bajas_fn: Optional[Callable] = None) -> Dict[str, Any]:
+    # Un año del modelo v1. Devuelve los flujos del año k, el estado k+1 en
+    # "siguiente" y las banderas de régimen usadas por el fast-forward.
+    if bajas_fn is None:
+        bajas_fn = bajas_esperadas
+    Gk, Div, Demanda = est.Gk, est.Div, est.Demanda
+
+    # Totales y capacidades
+    alumnos = Gk.sum(axis=-1)
+    Cap_opt = Div * por_grado(par.cupo_optimo)
+    aulas = Div.sum(axis=-1)
+
+    # Hacinamiento
+    hac = np.maximum(0.0, (Gk - Cap_opt) / np.maximum(Cap_opt, 1.0))
+    hac_prom = np.where(alumnos > 0, (Gk * hac).sum(axis=-1) / np.maximum(alumnos, 1.0), 0.0)
+
+    # Facturación y costos obligatorios
+    facturacion = alumnos * par.cuota_mensual * par.meses
+    sueldos = par.costo_docente_por_aula * aulas + par.sueldos_no_docentes
+    mantenimiento = par.mantenimiento_pct_facturacion * facturacion
+
+    # Targets de inversión
+    target_infra = par.inversion_infra_anual + 0.0 * alumnos
+    target_calidad = par.inversion_calidad_por_alumno * alumnos
+    margen_prov = facturacion - (sueldos + mantenimiento)
+    hay_demanda = Demanda > 0
+    saturacion = np.where(hay_demanda, np.minimum(1.0, alumnos / _seguro(Demanda, hay_demanda)), 0.0)
+    cac = par.cac_base * (1.0 + par.k_saturacion * saturacion)
+    target_mkt = np.maximum(par.mkt_floor, par.mkt_floor + par.prop_mkt * np.maximum(margen_prov, 0.0))
+
+    # Asignación presupuestaria
+    disponible = np.maximum(margen_prov, 0.0)
+    total_deseos = target_infra + target_calidad + target_mkt
+    racionado = total_deseos > disponible + 1e-9
+    positivo = total_deseos > 0
+    ratio = np.where(racionado, np.where(positivo, disponible / _seguro(total_deseos, positivo), 0.0), 1.0)
+    inv_infra = target_infra * ratio
+    inv_calidad_alumno = target_calidad * ratio
+    marketing = target_mkt * ratio
+
+    # Nuevos candidatos
+    hay_cac = cac > 0
+    nuevos_mkt = np.where(hay_cac, marketing / _seguro(cac, hay_cac), 0.0)
+    usa_lag = (np.asarray(k) > 0) & (par.lag_calidad_candidatos >= 1)
+    q_driver = np.where(usa_lag, est.calidad_prev, 0.0)
+    excedente_q = np.maximum(q_driver - par.qref_candidatos, 0.0)
+    pool = Demanda > 1e-9
+    pool_satur = np.where(pool, np.maximum(0.0, 1.0 - alumnos / _seguro(Demanda, pool)), 0.0)
+    nuevos_q = par.alpha_candidatos_q * excedente_q * alumnos * pool_satur
+    nuevos = nuevos_mkt + nuevos_q
+
+    # Admitidos
+    por_politica = par.politica_seleccion * nuevos
+    gap_demanda = np.maximum(Demanda - alumnos, 0.0)
+    capacidad_g1 = Div[..., 0] * par.cupo_maximo
+    admitidos = np.minimum(np.minimum(por_politica, gap_demanda), capacidad_g1)
+    modo_admision = np.where(
+        por_politica <= np.minimum(gap_demanda, capacidad_g1), ADMISION_POLITICA,
+        np.where(gap_demanda <= capacidad_g1, ADMISION_DEMANDA, ADMISION_CAPACIDAD))
+    rechazados = np.maximum(nuevos - admitidos, 0.0)
+    hay_nuevos = nuevos > 0
+    selectividad = np.where(hay_nuevos, admitidos / _seguro(nuevos, hay_nuevos), 0.0)
+
+    # Bajas
+    presion_precio = par.k_bajas_precio * np.maximum(par.cuota_mensual / np.maximum(par.ref_precio, 1e-9) - 1.0, 0.0)
+    tasa_bajas = np.minimum(
+        1.0,
+        par.tasa_bajas_imprevistas
+        + (1.0 - est.calidad_prev) * par.tasa_bajas_max_por_calidad
+        + presion_precio
+    )
+    bajas_seg = bajas_fn(tasa_bajas, Gk[..., SEGMENTO_BAJAS])
+    jardin_egresados = np.where(np.asarray(k) > 0, Gk[..., 0], 0.0)
+    bajas_no_continuidad = jardin_egresados * (1.0 - par.tasa_continuidad_jardin_primaria)
+    bajas_totales = bajas_seg.sum(axis=-1) + bajas_no_continuidad
+    egresados = Gk[..., 11]
+
+    # Calidad
+    dep = par.tasa_depreciacion_anual * est.Act
+    hay_alumnos = alumnos > 0
+    inv_alum_norm = np.where(hay_alumnos, (inv_calidad_alumno / np.maximum(alumnos, 1e-9)) / np.maximum(par.ref_inv_alumno, 1e-9), 0.0)
+    infra_norm = inv_infra / np.maximum(par.ref_infra, 1e-9)
+    mant_norm = (mantenimiento - dep) / np.maximum(par.ref_mant, 1e-9)
+    calidad_raw = (par.calidad_base
+                   - par.beta_hacinamiento * hac_prom
+                   + par.k_q_inv_alumno * inv_alum_norm
+                   + par.k_q_infra_inversion * infra_norm
+                   + par.k_q_mantenimiento_netodep * mant_norm
+                   - par.k_q_selectividad * selectividad
+                   + par.k_q_articulacion * par.nivel_articulacion
+                   + par.k_q_comunicacion * par.nivel_comunicacion
+                   + par.k_q_diferenciacion * par.nivel_diferenciacion)
+    calidad = np.clip(calidad_raw, 0.0, 1.0)
+
+    # OPEX y resultados
+    costos_opex = sueldos + mantenimiento + inv_infra + inv_calidad_alumno + marketing
+    resultado_operativo = facturacion - costos_opex
+
+    # Pipeline (el último año no construye)
+    desde_inicio = np.asarray(k) - par.pipeline_start_year
+    build = (np.asarray(k) < T) & (par.pipeline_start_year >= 0) & (desde_inicio >= 0) & (desde_inicio < 12)
+    capex_total = np.where(build, par.costo_construccion_aula, 0.0) + 0.0 * alumnos
+    capex_financiado = capex_total * par.pct_capex_financiado
+    capex_propio = capex_total - capex_financiado
+
+    # Deuda
+    interes_deuda = par.tasa_interes_deuda * est.Deuda
+    amortiza = par.anos_amortizacion_deuda > 0
+    amortizacion_deuda = np.where(
+        amortiza, np.minimum(est.Deuda, est.Deuda / _seguro(par.anos_amortizacion_deuda, amortiza)), 0.0)
+    resultado_neto = resultado_operativo - capex_propio - interes_deuda - amortizacion_deuda
+
+    # Alumnos por grado
+    bajas_vec = np.concatenate(
+        [np.zeros_like(Gk[..., :2]), bajas_seg, np.zeros_like(Gk[..., 10:])], axis=-1)
+    next_G = np.concatenate([
+        admitidos[..., None],
+        np.maximum(Gk[..., :10] - bajas_vec[..., :10], 0.0),
+        np.maximum(Gk[..., 10:11], 0.0),
+    ], axis=-1)
+
+    # Divisiones
+    tramo = np.mod(desde_inicio, 12)
+    next_D = Div + (np.asarray(build)[..., None] & (np.arange(G) == np.asarray(tramo)[..., None]))
+
+    # Límites de capacidad
+    total_next = next_G.sum(axis=-1)
+    allowed = np.minimum((next_D * por_grado(par.cupo_maximo)).sum(axis=-1), Demanda)
+    recorte = (total_next > allowed) & (total_next > 0)
+    factor = np.where(recorte, allowed / _seguro(total_next, recorte), 1.0)
+    next_G = np.maximum(0.0, next_G * factor[..., None])
+
+    siguiente = Estado(
+        Gk=next_G,
+        Div=next_D,
+        Act=np.maximum(est.Act + capex_total - dep, 0.0),
+        Caja=est.Caja + resultado_neto,
+        Deuda=np.maximum(est.Deuda + capex_financiado - amortizacion_deuda, 0.0),
+        Demanda=Demanda * (1.0 - par.tasa_descenso_demanda),
+        calidad_prev=calidad,
+    )
+
+    return {
+        "Demanda": Demanda,
+        "calidad": calidad,
+        "facturacion": facturacion,
+        "sueldos": sueldos,
+        "inv_infra": inv_infra,
+        "inv_calidad_alumno": inv_calidad_alumno,
+        "mantenimiento": mantenimiento,
+        "marketing": marketing,
+        "costos_opex": costos_opex,
+        "resultado_operativo": resultado_operativo,
+        "capex_total": capex_total,
+        "capex_propio": capex_propio,
+        "capex_financiado": capex_financiado,
+        "interes_deuda": interes_deuda,
+        "amortizacion_deuda": amortizacion_deuda,
+        "resultado_neto": resultado_neto,
+        "cac": cac,
+        "nuevos_candidatos": nuevos,
+        "nuevos_candidatos_mkt": nuevos_mkt,
+        "nuevos_candidatos_q": nuevos_q,
+        "admitidos": admitidos,
+        "rechazados": rechazados,
+        "selectividad": selectividad,
+        "bajas_totales": bajas_totales,
+        "bajas_no_continuidad": bajas_no_continuidad,
+        "egresados": egresados,
+        "pipeline_construcciones": np.asarray(build, dtype=float) + 0.0 * alumnos,
+        # Banderas de régimen
+        "tasa_bajas": tasa_bajas,
+        "modo_admision": modo_admision,
+        "brecha_demanda": Demanda - alumnos,
+        "racionado": racionado,
+        "margen_prov": margen_prov,
+        "recorte": recorte,
+        "build": build,
+        "siguiente": siguiente,
+    }
+
+
+class Registro:
+    # Acumula las series anuales de una corrida (años en el eje 0). Con destino
+    # las series indicadas se escriben directo en esos arrays (por ejemplo
+    # vistas de un memmap), que deben tener forma (T+1, *shape, ...)
+    def __init__(self, T: int, shape=(), destino: Optional[Dict[str, np.ndarray]] = None):
+        self.T = T
+        self.shape = tuple(shape)
+        self.s: Dict[str, np.ndarray] = dict(destino or {})
+
+    def _serie(self, nombre: str, extra=()):
+        if nombre not in self.s:
+            self.s[nombre] = np.zeros((self.T + 1,) + self.shape + tuple(extra))
+        return self.s[nombre]
+
+    def estado(self, k, est: Estado):
+        self._serie("Gk", (G,))[k] = est.Gk
+        self._serie("Div", (G,))[k] = est.Div
+        for nombre in ("Act", "Caja", "Deuda"):
+            self._serie(nombre)[k] = getattr(est, nombre)
+
+    def flujos(self, k, fl: Dict[str, Any]):
+        for nombre in SERIES_FLUJO:
+            self._serie(nombre)[k] = fl[nombre]
+        self._serie("Cand")[k] = fl["nuevos_candidatos"]
+
+    def series(self) -> Dict[str, np.ndarray]:
+        return self.s
+
+
+def correr(par: Params, bajas_fn: Optional[Callable] = None, shape=(),
+           destino: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    # Avance año a año del mapa (bajas esperadas por defecto). Con shape=(N,)
+    # los campos de par son columnas (N,) y las series quedan (T+1, N, ...).
+    T = par.years
+    est = estado_inicial(par, shape)
+    reg = Registro(T, shape, destino)
+    for k in range(T + 1):
+        fl = paso(est, par, k, T, bajas_fn)
+        reg.estado(k, est)
+        reg.flujos(k, fl)
+        est = fl["siguiente"]
+    return reg.series()
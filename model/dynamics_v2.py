@@ -0,0 +1,169 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from model.core_v2 import Params
+from model.dynamics import por_grado
+
+# Mapa anual del modelo v2 escrito sobre arrays, con la misma convención que
+# model/dynamics.py: dimensiones iniciales libres y sin asignaciones in-place.
+
+G = 12
+
+SERIES_FLUJO = (
+    "alumnos_totales", "calidad", "tasa_bajas", "nuevos_candidatos", "candidatos_pago",
+    "candidatos_organico", "admitidos_deseados", "admitidos", "Demanda", "Marketing", "CAC",
+    "inv_infra", "hacinamiento_prom", "selectividad", "capacidad_binding", "demanda_binding",
+)
+
+
+@dataclass
+class Estado:
+    G: Any  # (..., 12)
+    Div: Any  # (..., 12)
+    calidad_prev: Any  # calidad del año anterior (en k=0 vale calidad_base)
+    Demanda_prev: Any  # demanda del año anterior (en k=0, la demanda inicial)
+    alumnos_prev: Any  # alumnos del año anterior, base del marketing
+
+
+def estado_inicial(par: Params, shape=()) -> Estado:
+    uno = np.ones(shape)
+    G0 = uno[..., None] * por_grado(par.alumnos_inicial_por_grado) * np.ones(G)
+    alumnos0 = G0.sum(axis=-1)
+    return Estado(
+        G=G0,
+        Div=uno[..., None] * por_grado(par.divisiones_iniciales) * np.ones(G),
+        calidad_prev=uno * par.calidad_base,
+        Demanda_prev=np.maximum(par.demanda_inicial, alumnos0 + 50),
+        alumnos_prev=alumnos0,
+    )
+
+
+def _seguro(den, cond):
+    return np.where(cond, den, 1.0)
+
+
+def paso(est: Estado, par: Params, k, T: int) -> Dict[str, Any]:
+    # Un año del modelo v2; T es el índice del último año (anios - 1)
+    Gk, cal_prev = est.G, est.calidad_prev
+    primero = np.asarray(k) == 0
+    alumnos = Gk.sum(axis=-1)
+
+    # Demanda y CAC
+    Demanda = np.where(
+        primero, est.Demanda_prev,
+        np.maximum(est.Demanda_prev + 10 * cal_prev - 0.05 * alumnos, alumnos + 20))
+    saturacion = np.where(Demanda <= 0, 0.0, alumnos / np.maximum(Demanda, 1e-9))
+    CAC = par.cac_base * (1.0 + par.k_saturacion * saturacion)
+    precio_rel = par.cuota_mensual / np.maximum(par.ref_precio, 1e-9)
+    CAC = CAC * (1.0 + par.k_precio_cac * np.maximum(precio_rel - 1.0, 0.0))
+
+    # Marketing sobre la facturación del año anterior
+    fact_prev = est.alumnos_prev * par.cuota_mensual * par.meses_cobro
+    Marketing = np.maximum(par.mkt_floor, par.prop_mkt * fact_prev)
+
+    # Candidatos y admitidos
+    candidatos_pago = Marketing / np.maximum(CAC, 1e-9)
+    candidatos_organico = par.k_calidad_candidatos * cal_prev
+    nuevos = np.maximum(0.0, candidatos_pago + candidatos_organico)
+    capacidad_g1 = np.floor(est.Div[..., 0] * par.cupo_maximo)
+    gap_demanda = np.maximum(Demanda - alumnos, 0.0)
+    cap_politica = par.politica_seleccion * nuevos
+    cap_politica = np.where(par.admitidos_max_abs >= 0,
+                            np.minimum(cap_politica, par.admitidos_max_abs), cap_politica)
+    admitidos_deseados = np.minimum(cap_politica, gap_demanda)
+    admitidos = np.minimum(admitidos_deseados, capacidad_g1)
+
+    # Disparador de nueva aula en G1
+    exceso_g1 = np.maximum(admitidos_deseados - capacidad_g1, 0.0)
+    build = par.trigger_auto_aula & (
+        (par.regla_dos_div & (admitidos_deseados >= 2 * par.cupo_maximo)) | (exceso_g1 > 0))
+    inv_infra = np.where(build, par.capex_aula, 0.0)
+    amplia = np.asarray(build & (np.asarray(k) < T))
+    Div = est.Div + (amplia[..., None] & (np.arange(G) == 0))
+
+    # Hacinamiento
+    ratio = Gk / (np.maximum(Div, 1e-9) * por_grado(par.cupo_optimo))
+    exceso = np.maximum(ratio - 1.0, 0.0)
+    hac_prom = np.where(alumnos <= 0, 0.0, exceso.sum(axis=-1) / G)
+    potencia = (par.gamma_hacinamiento != 1.0) & (hac_prom > 0)
+    hac_prom = np.where(potencia, np.maximum(hac_prom, 1e-300) ** par.gamma_hacinamiento, hac_prom)
+
+    # Calidad
+    inv_calidad_alumno = 0.5 * Marketing
+    inv_alum_norm = np.where(
+        alumnos > 0, (inv_calidad_alumno / np.maximum(alumnos, 1e-9)) / np.maximum(par.ref_inv_alumno, 1e-9), 0.0)
+    inv_infra_norm = inv_infra / np.maximum(par.ref_inv_infra, 1e-9)
+    selectividad = np.where(nuevos <= 0, 0.0, admitidos / np.maximum(nuevos, 1e-9))
+    selectividad = np.clip(selectividad, 0.0, 1.0)
+    calidad_inst = (
+        par.calidad_base
+        - par.k_hacinamiento * hac_prom
+        + par.k_inv_alumno * inv_alum_norm
+        + par.k_inv_infra * inv_infra_norm
+        - par.k_selectividad * (1.0 - selectividad)
+    )
+    calidad = np.clip(cal_prev + par.alpha_calidad * (calidad_inst - cal_prev), 0.0, 1.0)
+
+    # Bajas proporcionales a cada grado
+    tasa = (
+        par.tasa_bajas_base
+        + (1.0 - calidad) * par.k_bajas_calidad
+        + np.maximum(precio_rel - 1.0, 0.0) * par.k_bajas_precio
+    )
+    tasa = np.clip(tasa, 0.0, 0.5)
+    bajas_tot = tasa * alumnos
+    hay = alumnos > 0
+    bajas_prev = np.where(hay[..., None], (Gk[..., :11] / _seguro(alumnos, hay)[..., None]) * bajas_tot[..., None], 0.0)
+    next_G = np.concatenate([admitidos[..., None], np.maximum(Gk[..., :11] - bajas_prev, 0.0)], axis=-1)
+
+    # Resultados del año
+    facturacion = alumnos * par.cuota_mensual * par.meses_cobro
+    sueldos_docentes = Div.sum(axis=-1) * par.costo_docente_por_aula
+    costos = sueldos_docentes + par.sueldos_no_docentes + par.mantenimiento_prop * facturacion + Marketing
+    resultado = facturacion - costos - inv_infra
+
+    siguiente = Estado(G=next_G, Div=Div, calidad_prev=calidad, Demanda_prev=Demanda, alumnos_prev=alumnos)
+    return {
+        "alumnos_totales": alumnos,
+        "calidad": calidad,
+        "tasa_bajas": tasa,
+        "nuevos_candidatos": nuevos,
+        "candidatos_pago": candidatos_pago,
+        "candidatos_organico": candidatos_organico,
+        "admitidos_deseados": admitidos_deseados,
+        "admitidos": admitidos,
+        "Demanda": Demanda,
+        "Marketing": Marketing,
+        "CAC": CAC,
+        "inv_infra": inv_infra,
+        "hacinamiento_prom": hac_prom,
+        "selectividad": selectividad,
+        "capacidad_binding": admitidos < admitidos_deseados,
+        "demanda_binding": alumnos >= Demanda - 1e-6,
+        "Div": Div,
+        "facturacion": facturacion,
+        "resultado": resultado,
+        "build": build,
+        "siguiente": siguiente,
+    }
+
+
+def correr(par: Params, shape=()) -> Dict[str, np.ndarray]:
+    T = par.anios - 1
+    shape = tuple(shape)
+    est = estado_inicial(par, shape)
+    s: Dict[str, np.ndarray] = {
+        "G": np.zeros((par.anios,) + shape + (G,)),
+        "Div": np.zeros((par.anios,) + shape + (G,), dtype=int),
+    }
+    for nombre in SERIES_FLUJO:
+        s[nombre] = np.zeros((par.anios,) + shape, dtype=bool if nombre.endswith("_binding") else float)
+    for k in range(par.anios):
+        fl = paso(est, par, k, T)
+        s["G"][k] = est.G
+        s["Div"][k] = fl["Div"]
+        for nombre in SERIES_FLUJO:
+            s[nombre][k] = fl[nombre]
+        est = fl["siguiente"]
+    return s
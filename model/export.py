@@ -0,0 +1,325 @@
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from model.params_array import ParamsArray
+from model.store import REDUCCIONES, AlmacenResultados
+
+# Exportación masiva de resultados a un XLSX de varias hojas o a un ZIP de
+# CSVs, con tres tablas: Parametros (una fila por escenario), Series (una
+# fila por escenario y año, todas las series) y KPIs (una fila por
+# escenario). Las fuentes se recorren en partes de pocos cientos de
+# escenarios que se escriben y se descartan, así que exportar miles de
+# escenarios de un barrido usa memoria acotada. El archivo se arma en un
+# temporal y se renombra al terminar: nunca queda uno a medio escribir.
+#
+# XLSX requiere xlsxwriter u openpyxl (opcionales); el ZIP sólo pandas.
+
+HOJAS = ("Parametros", "Series", "KPIs")
+FORMATOS = ("xlsx", "zip")
+FILAS_XLSX = 1_048_576  # límite de filas por hoja de Excel
+
+# (nombre, columna del DataFrame de simulate, reducción sobre los años);
+# las que no aplican al modelo del DataFrame se omiten
+KPIS = (
+    ("AlumnosFinales", "AlumnosTotales", "final"),
+    ("CalidadFinal", "Calidad", "final"),
+    ("ContinuidadPromedio", "TasaContinuidad", "media_desde_1"),
+    ("FacturacionTotal", "Facturacion", "suma"),
+    ("ResultadoNetoFinal", "ResultadoNeto", "final"),
+    ("ResultadoNetoTotal", "ResultadoNeto", "suma"),
+    ("MargenNetoFinal", "MargenNeto", "final"),
+    ("CajaFinal", "Caja", "final"),
+    ("CajaMinima", "Caja", "min"),
+    # v2
+    ("AlumnosFinales", "alumnos_totales", "final"),
+    ("CalidadFinal", "calidad", "final"),
+    ("AdmitidosTotal", "admitidos", "suma"),
+    ("ResultadoFinal", "resultado", "final"),
+    ("ResultadoTotal", "resultado", "suma"),
+)
+
+
+class ExportacionCancelada(Exception):
+    pass
+
+
+@dataclass
+class Parte:
+    parametros: pd.DataFrame
+    series: pd.DataFrame
+    kpis: pd.DataFrame
+
+    def __len__(self) -> int:
+        return len(self.parametros)
+
+
+def xlsx_disponible() -> bool:
+    for modulo in ("xlsxwriter", "openpyxl"):
+        try:
+            __import__(modulo)
+            return True
+        except ImportError:
+            pass
+    return False
+
+
+def calcular_kpis(series: pd.DataFrame, col_escenario: str = "Escenario") -> pd.DataFrame:
+    # series: formato largo (una fila por escenario y año)
+    g = series.groupby(col_escenario, sort=False)
+    salida = {}
+    for nombre, columna, red in KPIS:
+        if columna not in series.columns or nombre in salida:
+            continue
+        if red == "final":
+            salida[nombre] = g[columna].last()
+        elif red == "suma":
+            salida[nombre] = g[columna].sum()
+        elif red == "min":
+            salida[nombre] = g[columna].min()
+        else:  # el año 0 no tiene continuidad observada; un 0 de otro año sí cuenta
+            salida[nombre] = series[columna].where(g.cumcount() > 0).groupby(
+                series[col_escenario], sort=False).mean()
+    return pd.DataFrame(salida).reset_index()
+
+
+# ---------- Fuentes ----------
+
+def _parte_dataframes(nombres: Sequence[Any], dfs: Sequence[pd.DataFrame], parametros: pd.DataFrame) -> Parte:
+    largo = pd.concat(dfs, keys=nombres, names=["Escenario", None]).reset_index(level=0)
+    largo.reset_index(drop=True, inplace=True)
+    parametros.insert(0, "Escenario", list(nombres))
+    return Parte(parametros, largo, calcular_kpis(largo))
+
+
+def partes_dataframes(dfs: Mapping[str, pd.DataFrame], params: Optional[Mapping[str, Any]] = None,
+                      tam: int = 200) -> Iterator[Parte]:
+    # Resultados ya calculados (p. ej. la comparación de escenarios de la app)
+    nombres = list(dfs)
+    for i in range(0, len(nombres), tam):
+        trozo = nombres[i:i + tam]
+        parametros = (pd.DataFrame([asdict(params[n]) for n in trozo]) if params is not None
+                      else pd.DataFrame(index=range(len(trozo))))
+        yield _parte_dataframes(trozo, [dfs[n] for n in trozo], parametros)
+
+
+def partes_params(pa: ParamsArray, nombres: Optional[Sequence[Any]] = None, motor: str = "lote",
+                  tam: int = 200) -> Iterator[Parte]:
+    # Corre el ParamsArray por tramos mientras se exporta: "lote" con el motor
+    # por lotes (campo medio), "simulate" con simulate en el pool de procesos
+    from model import batch, parallel
+    for i in range(0, len(pa), tam):
+        lote = pa[i:i + tam]
+        if motor == "lote":
+            dfs = [df for df, _ in batch.simulate_batch(lote)]
+        elif motor == "simulate":
+            dfs = parallel.simular_concurrente(lote.a_lista())
+        else:
+            raise ValueError(f"motor desconocido: {motor!r}")
+        trozo = list(nombres[i:i + tam]) if nombres is not None else list(range(i, i + len(lote)))
+        yield _parte_dataframes(trozo, dfs, lote.a_dataframe(todas=True))
+
+
+def partes_almacen(almacen: AlmacenResultados, condicion: Optional[str] = None,
+                   tam: int = 2000) -> Iterator[Parte]:
+    # Barrido guardado en el almacén columnar: series crudas del motor (las
+    # que tienen eje de grados salen en una columna por grado) y como KPIs
+    # las reducciones red:serie; "Escenario" es la fila global del barrido
+    params = almacen.manifest["params"]
+    series = list(almacen.manifest["series"])
+    reducciones = [f"{r}:{s}" for s in series for r in REDUCCIONES]
+    for filas, datos in almacen.iterar(params + series + reducciones, condicion):
+        for i in range(0, len(filas), tam):
+            idx = filas[i:i + tam]
+            k = len(idx)
+            parametros = pd.DataFrame({"Escenario": idx, **{p: datos[p][i:i + tam] for p in params}})
+            anios = datos[series[0]].shape[1] if series else 0
+            largo = {"Escenario": np.repeat(idx, anios), "Año": np.tile(np.arange(anios), k)}
+            for s in series:
+                v = datos[s][i:i + tam]
+                if v.ndim == 2:
+                    largo[s] = v.reshape(-1)
+                else:
+                    plano = v.reshape(k * anios, -1)
+                    largo.update({f"{s}{g + 1}": plano[:, g] for g in range(plano.shape[1])})
+            kpis = pd.DataFrame({"Escenario": idx, **{r: datos[r][i:i + tam] for r in reducciones}})
+            yield Parte(parametros, pd.DataFrame(largo), kpis)
+
+
+# ---------- Escritores ----------
+
+def _filas(df: pd.DataFrame) -> Iterator[tuple]:
+    # Valores de Python, NaN/inf como celda vacía
+    cols = [[x if np.isfinite(x) else None for x in s.tolist()] if s.dtype.kind == "f" else s.tolist()
+            for _, s in df.items()]
+    return zip(*cols)
+
+
+class _EscritorZip:
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp_export_")
+        self.iniciadas = set()
+
+    def escribir(self, hoja: str, df: pd.DataFrame):
+        df.to_csv(os.path.join(self.tmp, f"{hoja}.csv"), mode="a", index=False,
+                  header=hoja not in self.iniciadas)
+        self.iniciadas.add(hoja)
+
+    def cerrar(self):
+        # Cada CSV pasa del disco al ZIP por bloques
+        tmp_zip = os.path.join(self.tmp, "salida.zip")
+        with zipfile.ZipFile(tmp_zip, "w", zipfile.ZIP_DEFLATED) as z:
+            for hoja in HOJAS:
+                if hoja in self.iniciadas:
+                    z.write(os.path.join(self.tmp, f"{hoja}.csv"), f"{hoja}.csv")
+        os.replace(tmp_zip, self.path)
+        self.descartar()
+
+    def descartar(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+class _EscritorXlsx:
+    # Escritura en modo streaming: cada hoja va a su propio temporal y en
+    # memoria sólo queda la fila en curso. Una hoja que pasa el límite de
+    # Excel sigue en "Series (2)", "Series (3)", ...
+    def __init__(self, path: str):
+        self.path = path
+        fd, self.tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".xlsx")
+        os.close(fd)
+        try:
+            import xlsxwriter
+            self.libro = xlsxwriter.Workbook(self.tmp, {"constant_memory": True})
+            self.motor = "xlsxwriter"
+        except ImportError:
+            try:
+                import openpyxl
+            except ImportError:
+                os.remove(self.tmp)
+                raise ImportError("exportar a XLSX requiere xlsxwriter u openpyxl "
+                                  "(pip install xlsxwriter); usar formato='zip'") from None
+            self.libro = openpyxl.Workbook(write_only=True)
+            self.motor = "openpyxl"
+        self.hojas = {}  # hoja -> [hoja actual, filas escritas, partes, encabezado]
+
+    def _nueva(self, hoja: str, encabezado: list):
+        estado = self.hojas.setdefault(hoja, [None, 0, 0, encabezado])
+        estado[2] += 1
+        titulo = hoja if estado[2] == 1 else f"{hoja} ({estado[2]})"
+        estado[0] = (self.libro.add_worksheet(titulo) if self.motor == "xlsxwriter"
+                     else self.libro.create_sheet(titulo))
+        estado[1] = 0
+        self._fila(estado, encabezado)
+        return estado
+
+    def _fila(self, estado: list, valores: Sequence[Any]):
+        if self.motor == "xlsxwriter":
+            estado[0].write_row(estado[1], 0, valores)
+        else:
+            estado[0].append(list(valores))
+        estado[1] += 1
+
+    def escribir(self, hoja: str, df: pd.DataFrame):
+        estado = self.hojas.get(hoja) or self._nueva(hoja, [str(c) for c in df.columns])
+        for fila in _filas(df):
+            if estado[1] >= FILAS_XLSX:
+                estado = self._nueva(hoja, estado[3])
+            self._fila(estado, fila)
+
+    def cerrar(self):
+        if self.motor == "xlsxwriter":
+            self.libro.close()
+        else:
+            self.libro.save(self.tmp)
+        os.replace(self.tmp, self.path)
+
+    def descartar(self):
+        if self.motor == "xlsxwriter":
+            try:
+                self.libro.close()
+            except Exception:
+                pass
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
+
+
+def exportar(path: str, partes: Iterable[Parte], formato: Optional[str] = None,
+             total: Optional[int] = None, al_progreso: Optional[Callable[[int, Optional[int]], None]] = None,
+             cancelar: Optional[threading.Event] = None) -> str:
+    # formato: "xlsx" o "zip" (por defecto, según la extensión de path).
+    # al_progreso(escenarios escritos, total) después de cada parte
+    formato = formato or ("xlsx" if path.lower().endswith(".xlsx") else "zip")
+    if formato not in FORMATOS:
+        raise ValueError(f"formato desconocido: {formato!r} (opciones: {', '.join(FORMATOS)})")
+    escritor = _EscritorXlsx(path) if formato == "xlsx" else _EscritorZip(path)
+    hechos = 0
+    try:
+        for parte in partes:
+            if cancelar is not None and cancelar.is_set():
+                raise ExportacionCancelada(f"cancelada con {hechos} escenarios escritos")
+            for hoja, df in zip(HOJAS, (parte.parametros, parte.series, parte.kpis)):
+                escritor.escribir(hoja, df)
+            hechos += len(parte)
+            if al_progreso is not None:
+                al_progreso(hechos, total)
+        escritor.cerrar()
+    except BaseException:
+        escritor.descartar()
+        raise
+    return path
+
+
+# ---------- En segundo plano ----------
+
+class TrabajoExportacion:
+    # exportar() en un hilo aparte; la app consulta el avance en cada rerun
+    def __init__(self, path: str, partes: Iterable[Parte], formato: Optional[str] = None,
+                 total: Optional[int] = None):
+        self.path = path
+        self.total = total
+        self.hechos = 0
+        self.error: Optional[BaseException] = None
+        self._cancelar = threading.Event()
+        self._hilo = threading.Thread(target=self._correr, args=(partes, formato), daemon=True)
+        self._hilo.start()
+
+    def _correr(self, partes: Iterable[Parte], formato: Optional[str]):
+        try:
+            exportar(self.path, partes, formato, self.total, self._avance, self._cancelar)
+        except BaseException as e:
+            self.error = e
+
+    def _avance(self, hechos: int, total: Optional[int]):
+        self.hechos = hechos
+
+    @property
+    def listo(self) -> bool:
+        return not self._hilo.is_alive()
+
+    @property
+    def fraccion(self) -> float:
+        if self.listo:
+            return 1.0
+        return min(1.0, self.hechos / self.total) if self.total else 0.0
+
+    def cancelar(self):
+        self._cancelar.set()
+
+    def esperar(self, timeout: Optional[float] = None) -> str:
+        self._hilo.join(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.path
+
+
+def en_segundo_plano(path: str, partes: Iterable[Parte], formato: Optional[str] = None,
+                     total: Optional[int] = None) -> TrabajoExportacion:
+    return TrabajoExportacion(path, partes, formato, total)
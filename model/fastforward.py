@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+from dataclasses import asdict
+from typing import Any, Dict, Tuple
+
+from model.core import Params
+from model.frames import armar_dataframe
+from model import dynamics
+from model.dynamics import Estado, G, ADMISION_DEMANDA, ADMISION_CAPACIDAD
+
+# Fast-forward del modelo v1 determinístico (bajas esperadas).
+#
+# Mientras ninguna restricción cambia de rama (sin recorte por capacidad, sin
+# racionamiento de presupuesto, sin construcción, calidad recortada a 1 o a 0 y
+# admitidos determinados por la demanda o por el cupo de G1, o nulos si la
+# escuela ya supera la demanda) la transición de
+# x = [G1..G12, Activos, Caja, Deuda, Demanda, 1] es afín y constante:
+# x[k+1] = A x[k]. Esos tramos se saltan con potencias precomputadas de A y los
+# flujos de cada año se evalúan de una sola vez sobre los estados apilados.
+#
+# Con calidad interior (0 < calidad < 1) la tasa de bajas depende del estado
+# del año anterior y multiplica a los alumnos: el mapa es bilineal y esos años
+# se avanzan paso a paso. El salto rinde en escuelas que sostienen la calidad
+# saturada (demanda estable: a 200 años se avanzan ~7 años de 201); una
+# escuela que entra en declive se recorre casi entera año a año.
+
+N_ESTADO = G + 5
+I_ACT, I_CAJA, I_DEUDA, I_DEM, I_UNO = G, G + 1, G + 2, G + 3, G + 4
+
+VENTANA_INICIAL = 8
+
+
+def operador_afin(par: Params, Div: np.ndarray, tasa_bajas: float, modo_admision: int,
+                  sin_hueco: bool = False) -> np.ndarray:
+    A = np.zeros((N_ESTADO, N_ESTADO))
+
+    # Admitidos: hueco de demanda (cero si no hay hueco) o cupo de G1
+    if modo_admision == ADMISION_DEMANDA:
+        if not sin_hueco:
+            A[0, :G] = -1.0
+            A[0, I_DEM] = 1.0
+    else:
+        A[0, I_UNO] = Div[0] * par.cupo_maximo
+
+    # Envejecimiento de cohortes con bajas esperadas en G3-G10
+    supervivencia = 1.0 - max(tasa_bajas, 0.0)
+    for gi in range(1, 11):
+        A[gi, gi - 1] = supervivencia if 2 <= gi - 1 <= 9 else 1.0
+    A[11, 10] = 1.0
+
+    # Activos y deuda sin capex: decaimiento geométrico
+    A[I_ACT, I_ACT] = 1.0 - par.tasa_depreciacion_anual
+    cuota_amort = 1.0 / par.anos_amortizacion_deuda if par.anos_amortizacion_deuda > 0 else 0.0
+    A[I_DEUDA, I_DEUDA] = 1.0 - cuota_amort
+
+    # Caja: resultado operativo sin racionamiento, lineal en alumnos
+    ingreso_alumno = par.cuota_mensual * par.meses
+    fijos = par.costo_docente_por_aula * float(Div.sum()) + par.sueldos_no_docentes
+    A[I_CAJA, I_CAJA] = 1.0
+    A[I_CAJA, :G] = ((1.0 - par.prop_mkt) * ingreso_alumno * (1.0 - par.mantenimiento_pct_facturacion)
+                     - par.inversion_calidad_por_alumno)
+    A[I_CAJA, I_UNO] = -(1.0 - par.prop_mkt) * fijos - par.inversion_infra_anual - par.mkt_floor
+    A[I_CAJA, I_DEUDA] = -(par.tasa_interes_deuda + cuota_amort)
+
+    A[I_DEM, I_DEM] = 1.0 - par.tasa_descenso_demanda
+    A[I_UNO, I_UNO] = 1.0
+    return A
+
+
+def potencias(A: np.ndarray, n: int) -> np.ndarray:
+    # [A^1, ..., A^n] por duplicación: log2(n) productos matriciales apilados
+    P = A[None]
+    while P.shape[0] < n:
+        P = np.concatenate([P, P @ P[-1]], axis=0)
+    return P[:n]
+
+
+def _vector(est: Estado) -> np.ndarray:
+    return np.concatenate([est.Gk, [est.Act, est.Caja, est.Deuda, est.Demanda, 1.0]])
+
+
+def _apilar(X: np.ndarray, Div: np.ndarray, calidad_prev: float) -> Estado:
+    n = X.shape[0]
+    return Estado(
+        Gk=X[:, :G],
+        Div=np.broadcast_to(Div, (n, G)),
+        Act=X[:, I_ACT],
+        Caja=X[:, I_CAJA],
+        Deuda=X[:, I_DEUDA],
+        Demanda=X[:, I_DEM],
+        calidad_prev=np.full(n, calidad_prev),
+    )
+
+
+def _elegible(par: Params, fl: Dict[str, Any]):
+    return ((~np.asarray(fl["racionado"])) & (np.asarray(fl["margen_prov"]) > 0)
+            & (~np.asarray(fl["recorte"])) & (~np.asarray(fl["build"]))
+            & np.isin(fl["modo_admision"], (ADMISION_DEMANDA, ADMISION_CAPACIDAD))
+            & (par.prop_mkt >= 0) & (0.0 <= par.tasa_depreciacion_anual <= 1.0))
+
+
+def correr_fast_forward(par: Params) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    T = par.years
+    est = dynamics.estado_inicial(par)
+    reg = dynamics.Registro(T)
+    cache_potencias: Dict[tuple, np.ndarray] = {}
+    stats = {"anios_saltados": 0, "tramos": 0, "pasos": 0}
+    ventana = VENTANA_INICIAL
+
+    k = 0
+    while k <= T:
+        fl = dynamics.paso(est, par, k, T)
+        reg.estado(k, est)
+        reg.flujos(k, fl)
+        stats["pasos"] += 1
+        siguiente = fl["siguiente"]
+
+        # Intento de salto desde k+1 si el año recién avanzado es afín y la
+        # calidad quedó igual a la del año anterior (tasa de bajas constante)
+        inicio = k + 1
+        n = min(ventana, T - inicio)
+        if (n >= 2 and bool(_elegible(par, fl))
+                and float(fl["calidad"]) == float(est.calidad_prev)):
+            modo = int(fl["modo_admision"])
+            sin_hueco = bool(fl["brecha_demanda"] < 0)
+            tasa = float(fl["tasa_bajas"])
+            clave = (modo, sin_hueco, tasa, tuple(est.Div))
+            P = cache_potencias.get(clave)
+            if P is None or P.shape[0] < n:
+                A = operador_afin(par, est.Div, tasa, modo, sin_hueco)
+                P = potencias(A, max(n, ventana))
+                cache_potencias[clave] = P
+
+            # Estados inicio..inicio+n y flujos de los años inicio..inicio+n-1
+            x0 = _vector(siguiente)
+            X = np.concatenate([x0[None], P[:n] @ x0], axis=0)
+            calidad_fija = float(fl["calidad"])
+            anios = np.arange(inicio, inicio + n)
+            fl_tramo = dynamics.paso(_apilar(X[:n], est.Div, calidad_fija), par, anios, T)
+
+            ok = (_elegible(par, fl_tramo) & (fl_tramo["modo_admision"] == modo)
+                  & ((fl_tramo["brecha_demanda"] < 0) == sin_hueco)
+                  & (fl_tramo["calidad"] == calidad_fija))
+            validos = n if ok.all() else int(np.argmin(ok))
+            if validos > 0:
+                # Años con flujos válidos; el estado de aterrizaje también lo es
+                sl = slice(inicio, inicio + validos)
+                reg.s["Gk"][sl] = X[:validos, :G]
+                reg.s["Div"][sl] = est.Div
+                reg.s["Act"][sl] = X[:validos, I_ACT]
+                reg.s["Caja"][sl] = X[:validos, I_CAJA]
+                reg.s["Deuda"][sl] = X[:validos, I_DEUDA]
+                for nombre in dynamics.SERIES_FLUJO:
+                    reg.s[nombre][sl] = fl_tramo[nombre][:validos]
+                reg.s["Cand"][sl] = fl_tramo["nuevos_candidatos"][:validos]
+                xa = X[validos]
+                siguiente = Estado(
+                    Gk=xa[:G], Div=est.Div, Act=xa[I_ACT], Caja=xa[I_CAJA],
+                    Deuda=xa[I_DEUDA], Demanda=xa[I_DEM],
+                    calidad_prev=fl_tramo["calidad"][validos - 1],
+                )
+                inicio += validos
+                stats["anios_saltados"] += validos
+                stats["tramos"] += 1
+            ventana = ventana * 2 if validos == n else VENTANA_INICIAL
+
+        est = siguiente
+        k = inicio
+
+    return reg.series(), stats
+
+
+def simulate_fast_forward(par: Params) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    series, stats = correr_fast_forward(par)
+    df = armar_dataframe(par, series)
+    meta = {"params": asdict(par), "fast_forward": stats}
+    return df, meta
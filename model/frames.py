@@ -0,0 +1,132 @@
+import numpy as np
+from typing import Dict
+
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+
+# Capa de presentación: arma los DataFrames de salida de simulate (mismas
+# columnas de siempre) a partir de las series que devuelven los núcleos NumPy.
+# Las columnas se calculan sólo con NumPy (columnas/columnas_v2), así quien
+# no necesita el DataFrame (los workers de memoria compartida) no carga pandas.
+
+
+def columnas(par: Params, s: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    # Columnas de salida, en orden, a partir de las series anuales del modelo
+    T = s["Gk"].shape[0] - 1
+    G = s["Gk"].shape[1]
+    t = np.arange(T+1)
+    Gk, Div = s["Gk"], s["Div"]
+
+    aulas = Div.sum(axis=1)
+
+    def rint(a): return np.rint(a).astype(int)
+
+    # KPIs
+    facturacion = s["facturacion"]
+    margen_operativo = np.where(facturacion > 0, s["resultado_operativo"] / facturacion, 0.0)
+    margen_neto = np.where(facturacion > 0, s["resultado_neto"] / facturacion, 0.0)
+    costos_totales_cash = s["costos_opex"] + s["capex_propio"] + s["interes_deuda"] + s["amortizacion_deuda"]
+    
+    # Tasa de continuidad efectiva (admitidos / egresados jardín aproximado)
+    tasa_continuidad_efectiva = np.zeros(T+1)
+    for k in range(T+1):
+        if k > 0 and Gk[k-1, 0] > 0:
+            tasa_continuidad_efectiva[k] = min(1.0, Gk[k, 1] / Gk[k-1, 0])
+
+    columnas = {
+        "Año": t,
+        "DemandaPotencial": s["Demanda"],
+        "AlumnosTotales": rint(Gk.sum(axis=1)),
+        "Calidad": s["calidad"],
+        "TasaContinuidad": tasa_continuidad_efectiva,
+        "AulasTotales": rint(aulas),
+        "CapacidadMaxTotal": rint((Div * par.cupo_maximo).sum(axis=1)),
+        "CapacidadOptTotal": rint((Div * par.cupo_optimo).sum(axis=1)),
+        "Facturacion": facturacion,
+        "Sueldos": s["sueldos"],
+        "InversionInfra": s["inv_infra"],
+        "InversionCalidadAlumno": s["inv_calidad_alumno"],
+        "Mantenimiento": s["mantenimiento"],
+        "Marketing": s["marketing"],
+        "CostosOPEX": s["costos_opex"],
+        "CostosTotalesCash": costos_totales_cash,
+        "ResultadoOperativo": s["resultado_operativo"],
+        "CAPEX_Total": s["capex_total"],
+        "CAPEX_Propio": s["capex_propio"],
+        "CAPEX_Financiado": s["capex_financiado"],
+        "InteresDeuda": s["interes_deuda"],
+        "AmortizacionDeuda": s["amortizacion_deuda"],
+        "ResultadoNeto": s["resultado_neto"],
+        "Caja": s["Caja"],
+        "Deuda": s["Deuda"],
+        "MargenOperativo": margen_operativo,
+        "MargenNeto": margen_neto,
+        "CAC": s["cac"],
+        "CandidatosStock": rint(s["Cand"]),
+        "NuevosCandidatos": rint(s["nuevos_candidatos"]),
+        "NuevosCandidatosMkt": rint(s["nuevos_candidatos_mkt"]),
+        "NuevosCandidatosQ": rint(s["nuevos_candidatos_q"]),
+        "Admitidos": rint(s["admitidos"]),
+        "Rechazados": rint(s["rechazados"]),
+        "Selectividad": s["selectividad"],
+        "BajasTotales": rint(s["bajas_totales"]),
+        "BajasNoContinuidad": rint(s["bajas_no_continuidad"]),
+        "Egresados": rint(s["egresados"]),
+        "PipelineConstrucciones": s["pipeline_construcciones"],
+        "Activos": s["Act"]
+    }
+
+    # Series por grado (se arman antes del DataFrame: insertar columnas una a
+    # una en pandas cuesta más que el modelo)
+    for gi in range(G):
+        columnas[f"G{gi+1}"] = rint(Gk[:, gi])
+        columnas[f"DivG{gi+1}"] = Div[:, gi]
+        Cap_opt_series = Div[:, gi] * par.cupo_optimo
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hac_series = np.maximum(0.0, (Gk[:, gi] - Cap_opt_series) / np.maximum(Cap_opt_series, 1.0))
+        columnas[f"HacG{gi+1}"] = hac_series
+
+    return columnas
+
+
+def columnas_v2(par: ParamsV2, s: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    Div = s["Div"]
+    alumnos_tot = s["alumnos_totales"]
+    facturacion = alumnos_tot * par.cuota_mensual * par.meses_cobro
+    sueldos_docentes = np.sum(Div, axis=1) * par.costo_docente_por_aula
+    costos = sueldos_docentes + par.sueldos_no_docentes + par.mantenimiento_prop * facturacion + s["Marketing"]
+    resultado = facturacion - costos - s["inv_infra"]
+    return {
+        "anio": np.arange(len(alumnos_tot)),
+        "alumnos_totales": alumnos_tot,
+        "calidad": s["calidad"],
+        "tasa_bajas": s["tasa_bajas"],
+        "nuevos_candidatos": s["nuevos_candidatos"],
+        "candidatos_pago": s["candidatos_pago"],
+        "candidatos_organico": s["candidatos_organico"],
+        "admitidos_deseados": s["admitidos_deseados"],
+        "admitidos": s["admitidos"],
+        "Demanda": s["Demanda"],
+        "Marketing": s["Marketing"],
+        "CAC": s["CAC"],
+        "DivG1": Div[:, 0],
+        "AulasTotales": Div.sum(axis=1),
+        "hacinamiento_prom": s["hacinamiento_prom"],
+        "selectividad": s["selectividad"],
+        "capacidad_binding": s["capacidad_binding"].astype(int),
+        "demanda_binding": s["demanda_binding"].astype(int),
+        "facturacion": facturacion,
+        "sueldos_docentes": sueldos_docentes,
+        "costos_totales": costos,
+        "resultado": resultado,
+    }
+
+
+def armar_dataframe(par: Params, s: Dict[str, np.ndarray]):
+    import pandas as pd
+    return pd.DataFrame(columnas(par, s))
+
+
+def armar_dataframe_v2(par: ParamsV2, s: Dict[str, np.ndarray]):
+    import pandas as pd
+    return pd.DataFrame(columnas_v2(par, s))
@@ -0,0 +1,172 @@
+import json
+from collections import OrderedDict
+from typing import Any, Dict, IO, Iterable, List, Tuple
+
+import numpy as np
+
+from model import batch, dynamics, dynamics_v2, parallel
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+from model.params_array import params_validados
+
+# Procesador de pedidos de simulación en JSONL, línea por línea. Cada línea
+# de entrada es un pedido:
+#   {"id": "a1", "modelo": "v1", "motor": "lote", "params": {"cuota_mensual": 90000},
+#    "salidas": ["alumnos", "Caja"]}
+# (todo opcional salvo id). Los pedidos compatibles (mismo modelo, motor,
+# horizonte y salidas) se juntan en micro-lotes para el motor por lotes; cada
+# lote que se completa se escribe enseguida, una línea por pedido:
+#   {"id": "a1", "salidas": {"alumnos": [...], "Caja": [...]}}
+# o {"id": ..., "error": "..."} si el pedido es inválido. Las respuestas salen
+# en orden de finalización, no de entrada; el id es la clave. La memoria queda
+# acotada por max_pendientes pedidos en espera, sin importar el tamaño del
+# archivo.
+
+MODELOS = {"v1": Params, "v2": ParamsV2}
+MOTORES = ("lote", "simulate")
+SALIDAS_DEFECTO = {
+    "v1": ("alumnos", "calidad", "facturacion", "resultado_neto", "Caja"),
+    "v2": ("alumnos_totales", "calidad", "admitidos", "Demanda"),
+}
+# Series que se pueden pedir en "salidas" (las del motor por lotes)
+SERIES = {
+    "v1": frozenset(dynamics.SERIES_FLUJO) | {"alumnos", "Gk", "Div", "Act", "Caja", "Deuda", "Cand"},
+    "v2": frozenset(dynamics_v2.SERIES_FLUJO) | {"G", "Div"},
+}
+# Tope del horizonte por pedido: un pedido no puede pedir memoria sin límite
+HORIZONTE_MAX = 1000
+
+
+def _serie(series: Dict[str, np.ndarray], nombre: str) -> np.ndarray:
+    if nombre == "alumnos" and "alumnos" not in series:
+        return series["Gk"].sum(axis=-1)
+    return series[nombre]
+
+
+def _horizonte(par: Any) -> int:
+    return par.anios if isinstance(par, ParamsV2) else par.years
+
+
+def leer_pedido(pedido: Any, motor_defecto: str = "lote") -> Tuple[str, str, Any]:
+    # (modelo, motor, params) de un pedido ya decodificado; ValueError si no es
+    # un objeto o si algún campo es inválido. Lo comparte el servicio HTTP.
+    if not isinstance(pedido, dict):
+        raise ValueError("se esperaba un objeto JSON")
+    modelo = pedido.get("modelo", "v1")
+    motor = pedido.get("motor", motor_defecto)
+    if not isinstance(modelo, str) or modelo not in MODELOS:
+        raise ValueError(f"modelo desconocido: {modelo!r}")
+    if not isinstance(motor, str) or motor not in MOTORES:
+        raise ValueError(f"motor desconocido: {motor!r}")
+    par = params_validados(MODELOS[modelo], pedido.get("params", {}))
+    minimo = 1 if modelo == "v2" else 0  # v2 con anios=0 no tiene filas
+    if not minimo <= _horizonte(par) <= HORIZONTE_MAX:
+        raise ValueError(f"horizonte fuera de rango [{minimo}, {HORIZONTE_MAX}]: {_horizonte(par)}")
+    return modelo, motor, par
+
+
+def leer_salidas(pedido: dict, modelo: str) -> Tuple[str, ...]:
+    # Lista de nombres de series conocidos del modelo; ValueError si no
+    salidas = pedido.get("salidas") or SALIDAS_DEFECTO[modelo]
+    if not isinstance(salidas, (list, tuple)) or not all(isinstance(s, str) for s in salidas):
+        raise ValueError("salidas debe ser una lista de nombres de series")
+    desconocidas = [s for s in salidas if s not in SERIES[modelo]]
+    if desconocidas:
+        raise ValueError(f"salidas desconocidas para {modelo}: {desconocidas}")
+    return tuple(salidas)
+
+
+def _correr(pedidos: List[Tuple[Any, Any]], motor: str, salidas: Tuple[str, ...]) -> List[dict]:
+    params = [p for _, p in pedidos]
+    if motor == "lote":
+        series = batch.correr_lote(params)
+    else:
+        corridas = parallel.mapear(parallel.simular_arrays, params)
+        series = {k: np.stack([s[k] for s, _ in corridas]) for k in corridas[0][0]}
+    cols = {s: _serie(series, s) for s in salidas}
+    return [{"id": pid, "salidas": {s: cols[s][i].tolist() for s in salidas}}
+            for i, (pid, _) in enumerate(pedidos)]
+
+
+class Procesador:
+    def __init__(self, salida: IO[str], tam_lote: int = 256, max_pendientes: int = 4096,
+                 motor_defecto: str = "lote"):
+        self.salida = salida
+        self.tam_lote = tam_lote
+        self.max_pendientes = max_pendientes
+        self.motor_defecto = motor_defecto
+        # clave de compatibilidad -> [(id, params)], en orden de llegada
+        self.pendientes: "OrderedDict[tuple, List[Tuple[Any, Any]]]" = OrderedDict()
+        self.en_espera = 0
+        self.procesados = 0
+        self.errores = 0
+        self.lotes = 0
+
+    def _escribir(self, linea: dict):
+        self.salida.write(json.dumps(linea, ensure_ascii=False) + "\n")
+
+    def _error(self, pid: Any, mensaje: str):
+        self.errores += 1
+        self._escribir({"id": pid, "error": mensaje})
+
+    def _vaciar(self, clave: tuple):
+        pedidos = self.pendientes.pop(clave)
+        self.en_espera -= len(pedidos)
+        _, motor, _, salidas = clave
+        try:
+            respuestas = _correr(pedidos, motor, salidas)
+        except (KeyError, ValueError) as e:
+            if len(pedidos) == 1:
+                self._error(pedidos[0][0], f"{type(e).__name__}: {e}")
+                return
+            # Un pedido que falla no arrastra al resto del lote: se reintenta
+            # uno por uno y sólo el culpable recibe la línea de error
+            for pedido in pedidos:
+                self.pendientes[clave] = [pedido]
+                self.en_espera += 1
+                self._vaciar(clave)
+            return
+        for r in respuestas:
+            self._escribir(r)
+        self.procesados += len(respuestas)
+        self.lotes += 1
+        self.salida.flush()
+
+    def agregar(self, linea: str):
+        linea = linea.strip()
+        if not linea:
+            return
+        try:
+            pedido = json.loads(linea)
+        except json.JSONDecodeError as e:
+            self._error(None, f"JSON inválido: {e}")
+            return
+        pid = pedido.get("id") if isinstance(pedido, dict) else None
+        try:
+            modelo, motor, par = leer_pedido(pedido, self.motor_defecto)
+            salidas = leer_salidas(pedido, modelo)
+        except (TypeError, ValueError) as e:
+            self._error(pid, str(e))
+            return
+        clave = (modelo, motor, _horizonte(par), salidas)
+        self.pendientes.setdefault(clave, []).append((pid, par))
+        self.en_espera += 1
+        if len(self.pendientes[clave]) >= self.tam_lote:
+            self._vaciar(clave)
+        elif self.en_espera > self.max_pendientes:
+            self._vaciar(next(iter(self.pendientes)))  # el grupo más viejo
+
+    def terminar(self):
+        while self.pendientes:
+            self._vaciar(next(iter(self.pendientes)))
+        self.salida.flush()
+
+
+def procesar(entrada: Iterable[str], salida: IO[str], tam_lote: int = 256,
+             max_pendientes: int = 4096, motor_defecto: str = "lote") -> Procesador:
+    # entrada: cualquier iterable de líneas (archivo abierto, sys.stdin)
+    proc = Procesador(salida, tam_lote, max_pendientes, motor_defecto)
+    for linea in entrada:
+        proc.agregar(linea)
+    proc.terminar()
+    return proc
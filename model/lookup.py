@@ -0,0 +1,111 @@
+import itertools
+import json
+import os
+import numpy as np
+from dataclasses import asdict
+from typing import Dict, Mapping, Optional, Sequence
+
+from model.core import Params
+from model.surrogate import SALIDAS, correr_muestras
+
+# Tablas precalculadas sobre una grilla de decisiones: los tres controles de
+# "Variables de Decisión" de la app (paso 0.05 en [0, 1]) y una grilla gruesa
+# de otros insumos. La tabla se guarda como .npy y se abre memory-mapped; las
+# consultas interpolan multilinealmente entre los vértices de la celda.
+
+PASO_CONTROLES = np.round(np.linspace(0.0, 1.0, 21), 2)
+
+EJES_DECISION = {
+    "nivel_articulacion": PASO_CONTROLES,
+    "nivel_comunicacion": PASO_CONTROLES,
+    "nivel_diferenciacion": PASO_CONTROLES,
+    "cuota_mensual": np.linspace(50000.0, 150000.0, 5),
+    "tasa_continuidad_jardin_primaria": np.array([0.30, 0.56, 0.80, 1.0]),
+}
+
+ARCHIVO_TABLA = "tabla.npy"
+ARCHIVO_EJES = "ejes.json"
+
+
+def construir_tabla(path: str, base: Optional[Params] = None,
+                    ejes: Optional[Mapping[str, Sequence[float]]] = None,
+                    salidas: Sequence[str] = SALIDAS, bloque: int = 20000) -> "TablaDecision":
+    # Simula la grilla completa por bloques y la escribe en path/tabla.npy con
+    # forma (*ejes, n_salidas, T+1) en float32
+    base = base if base is not None else Params()
+    ejes = {k: np.asarray(v, dtype=float) for k, v in (ejes if ejes is not None else EJES_DECISION).items()}
+    nombres = list(ejes)
+    forma = tuple(len(v) for v in ejes.values())
+    os.makedirs(path, exist_ok=True)
+    tabla = np.lib.format.open_memmap(
+        os.path.join(path, ARCHIVO_TABLA), mode="w+", dtype=np.float32,
+        shape=forma + (len(salidas), base.years + 1))
+    plana = tabla.reshape(-1, len(salidas), base.years + 1)
+    total = plana.shape[0]
+    for ini in range(0, total, bloque):
+        idx = np.unravel_index(np.arange(ini, min(ini + bloque, total)), forma)
+        X = np.column_stack([ejes[n][i] for n, i in zip(nombres, idx)])
+        series = correr_muestras(base, nombres, X, salidas)
+        plana[ini:ini + len(X)] = np.stack([series[s] for s in salidas], axis=1)
+    tabla.flush()
+    del plana, tabla
+    with open(os.path.join(path, ARCHIVO_EJES), "w") as f:
+        json.dump({
+            "ejes": {k: v.tolist() for k, v in ejes.items()},
+            "salidas": list(salidas),
+            "base": asdict(base),
+        }, f)
+    return TablaDecision.abrir(path)
+
+
+class TablaDecision:
+    def __init__(self, tabla: np.ndarray, ejes: Dict[str, np.ndarray],
+                 salidas: Sequence[str], base: Dict):
+        self.tabla = tabla
+        self.ejes = ejes
+        self.variables = list(ejes)
+        self.salidas = list(salidas)
+        self.base = base
+        self._vertices = np.array(list(itertools.product((0, 1), repeat=len(ejes))))  # (2^d, d)
+
+    @classmethod
+    def abrir(cls, path: str) -> "TablaDecision":
+        with open(os.path.join(path, ARCHIVO_EJES)) as f:
+            meta = json.load(f)
+        tabla = np.load(os.path.join(path, ARCHIVO_TABLA), mmap_mode="r")
+        ejes = {k: np.asarray(v) for k, v in meta["ejes"].items()}
+        return cls(tabla, ejes, meta["salidas"], meta["base"])
+
+    def _celdas(self, X: np.ndarray):
+        # Índice inferior y peso del vértice superior en cada eje (fuera de la
+        # grilla se satura al borde)
+        idx, pesos = [], []
+        for j, nombre in enumerate(self.variables):
+            eje = self.ejes[nombre]
+            x = np.clip(X[:, j], eje[0], eje[-1])
+            i = np.clip(np.searchsorted(eje, x, side="right") - 1, 0, max(len(eje) - 2, 0))
+            ancho = eje[np.minimum(i + 1, len(eje) - 1)] - eje[i]
+            t = np.where(ancho > 0, (x - eje[i]) / np.where(ancho > 0, ancho, 1.0), 0.0)
+            idx.append(i)
+            pesos.append(t)
+        return idx, pesos
+
+    def consultar_array(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        # X (M, d) en el orden de self.variables; serie -> (M, T+1)
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        d = len(self.variables)
+        forma = self.tabla.shape[:d]
+        idx, pesos = self._celdas(X)
+        # Los 2^d vértices de cada celda se leen de una sola vez
+        vertices = self._vertices
+        pos = [np.minimum(idx[j][:, None] + vertices[:, j], forma[j] - 1) for j in range(d)]
+        w = np.prod([np.where(vertices[:, j], pesos[j][:, None], 1.0 - pesos[j][:, None])
+                     for j in range(d)], axis=0)  # (M, 2^d)
+        plana = self.tabla.reshape((-1,) + self.tabla.shape[d:])
+        Y = np.einsum("mc,mcst->mst", w, plana[np.ravel_multi_index(pos, forma)])
+        return {nombre: Y[:, j] for j, nombre in enumerate(self.salidas)}
+
+    def consultar(self, valores: Mapping[str, float]) -> Dict[str, np.ndarray]:
+        # Un punto; las variables que falten toman el valor de la base
+        x = np.array([float(valores.get(v, self.base[v])) for v in self.variables])
+        return {k: v[0] for k, v in self.consultar_array(x[None]).items()}
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Optional
+
+from model import dynamics
+from model.core import Params
+from model.precision import PoliticaTipos, aplicar
+
+# Réplicas Monte Carlo del modelo v1 vectorizadas: todas las réplicas avanzan
+# juntas y el sorteo multinomial de bajas se hace en una sola llamada por año.
+
+
+def bajas_multinomiales(rng: np.random.Generator) -> Callable:
+    def sorteo(tasa, segmento):
+        total = segmento.sum(axis=-1)
+        activo = (total > 0) & (tasa > 0)
+        bajas_obj = np.where(activo, np.minimum(np.round(tasa * total), np.floor(total)), 0).astype(np.int64)
+        probs = np.where(activo[..., None], segmento / np.where(activo, total, 1.0)[..., None],
+                         1.0 / segmento.shape[-1])
+        return rng.multinomial(bajas_obj, probs).astype(float)
+    return sorteo
+
+
+def simulate_mc(par: Params, n_reps: int, seed: Optional[int] = None,
+                tipos: Optional[PoliticaTipos] = None) -> Dict[str, np.ndarray]:
+    # Series con forma (n_reps, T+1, ...); tipos: política de almacenamiento
+    rng = np.random.default_rng(par.random_seed if seed is None else seed)
+    series = dynamics.correr(par, bajas_multinomiales(rng), shape=(n_reps,))
+    return aplicar({k: np.moveaxis(v, 0, 1) for k, v in series.items()}, tipos)
+
+
+# Series que se comparan entre el campo medio y la media Monte Carlo
+SERIES_VALIDACION = (
+    "alumnos", "calidad", "admitidos", "bajas_totales", "resultado_operativo", "Caja",
+)
+
+
+def _serie(s: Dict[str, np.ndarray], nombre: str) -> np.ndarray:
+    return s["Gk"].sum(axis=-1) if nombre == "alumnos" else s[nombre]
+
+
+def validar_mean_field(par: Params, n_reps: int = 1000, seed: Optional[int] = None) -> pd.DataFrame:
+    # Diferencia por serie entre el campo medio y la media de n_reps réplicas.
+    # El campo medio usa la tasa esperada sin redondear la cantidad de bajas,
+    # así que aun con varianza nula queda un sesgo de hasta medio alumno por año.
+    mc = simulate_mc(par, n_reps, seed)
+    mf = dynamics.correr(par)
+    filas = []
+    for nombre in SERIES_VALIDACION:
+        reps = _serie(mc, nombre)
+        media = reps.mean(axis=0)
+        ee = reps.std(axis=0, ddof=1) / np.sqrt(n_reps)
+        diff = np.abs(_serie(mf, nombre) - media)
+        escala = np.maximum(np.abs(media), 1e-9)
+        filas.append({
+            "serie": nombre,
+            "error_abs_max": float(diff.max()),
+            "error_rel_max": float((diff / escala).max()),
+            "error_rel_final": float(diff[-1] / escala[-1]),
+            "ee_mc_max": float(ee.max()),
+        })
+    return pd.DataFrame(filas)
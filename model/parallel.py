@@ -0,0 +1,221 @@
+import atexit
+import multiprocessing as mp
+import os
+import sys
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model import core, core_v2
+
+# Pool de procesos persistente para correr simulaciones independientes en
+# paralelo. Se crea una sola vez por proceso (la app lo comparte entre reruns y
+# sesiones) y los workers arrancan con "spawn" para no heredar los hilos del
+# servidor. Los workers sólo importan el núcleo NumPy; pandas se carga en el
+# worker recién si se piden DataFrames.
+#
+# Con "spawn" el hijo vuelve a ejecutar el __main__ del padre, que bajo
+# Streamlit es el script de la app entera (y desde ahí podría volver a crear
+# el pool durante el arranque). Los workers se lanzan con un __main__ vacío:
+# lo que se manda al pool tiene que vivir en un módulo importable (model.*).
+#
+# Para lotes grandes los workers no devuelven DataFrames: escriben sus filas en
+# un bloque de memoria compartida reservado por el proceso padre, (N, T+1, C)
+# en float64, y por el pipe sólo vuelven índices.
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+_lock_main = threading.Lock()
+_MAIN_WORKER = types.ModuleType("__main__")  # sin __file__ ni __spec__: el hijo no importa nada
+
+
+class _ProcesoWorker(mp.get_context("spawn").Process):
+    def start(self):
+        # spawn lee sys.modules["__main__"] al preparar el hijo (dentro de start)
+        with _lock_main:
+            principal = sys.modules["__main__"]
+            sys.modules["__main__"] = _MAIN_WORKER
+            try:
+                super().start()
+            finally:
+                sys.modules["__main__"] = principal
+
+
+class _ContextoWorkers(type(mp.get_context("spawn"))):
+    Process = _ProcesoWorker
+
+
+def pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        # Un pool roto (worker caído) se reemplaza por uno nuevo
+        if _pool is None or getattr(_pool, "_broken", False):
+            _pool = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                        mp_context=_ContextoWorkers())
+        return _pool
+
+
+@atexit.register
+def cerrar():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def simular_arrays(par: Any) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    # Worker: series NumPy y metadatos (v1 o v2 según el tipo de par)
+    if isinstance(par, core_v2.Params):
+        return core_v2.simular_series(par)
+    return core.simular_series(par)
+
+
+def simular_columnas(par: Any) -> Dict[str, np.ndarray]:
+    # Worker: columnas de simulate como arrays, sin pasar por pandas
+    from model import frames
+    series, _ = simular_arrays(par)
+    if isinstance(par, core_v2.Params):
+        return frames.columnas_v2(par, series)
+    return frames.columnas(par, series)
+
+
+def simular_df(par: Any):
+    # Worker: DataFrame de simulate
+    from model import frames
+    series, _ = simular_arrays(par)
+    if isinstance(par, core_v2.Params):
+        return frames.armar_dataframe_v2(par, series)
+    return frames.armar_dataframe(par, series)
+
+
+def simular_lote_df(params_list: Sequence[Any]) -> List[Any]:
+    # Worker: DataFrames del motor por lotes (mismo horizonte en todo el lote)
+    from model import batch
+    return [df for df, _ in batch.simulate_batch(params_list)]
+
+
+def mapear(fn: Callable, items: Sequence[Any],
+           al_terminar: Optional[Callable[[int, Any], None]] = None) -> List[Any]:
+    # Envía todos los items al pool y junta los resultados a medida que
+    # terminan; la lista devuelta respeta el orden de entrada
+    if len(items) <= 1:
+        resultados = [fn(x) for x in items]
+        if al_terminar is not None and resultados:
+            al_terminar(0, resultados[0])
+        return resultados
+    futuros = {pool().submit(fn, x): i for i, x in enumerate(items)}
+    resultados: List[Any] = [None] * len(items)
+    for fut in as_completed(futuros):
+        i = futuros[fut]
+        resultados[i] = fut.result()
+        if al_terminar is not None:
+            al_terminar(i, resultados[i])
+    return resultados
+
+
+class ResultadosCompartidos:
+    # Resultados de un lote en memoria compartida: datos es (N, T+1, C) y
+    # vive mientras no se llame a cerrar()
+    def __init__(self, columnas: List[str], tipos: List[str], forma: Tuple[int, int, int]):
+        self.columnas = columnas
+        self.tipos = tipos
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(forma)) * 8))
+        self.datos = np.ndarray(forma, dtype=np.float64, buffer=self.shm.buf)
+
+    def df(self, i: int):
+        import pandas as pd
+        bloque = self.datos[i]
+        return pd.DataFrame({c: bloque[:, j].astype(t) for j, (c, t) in enumerate(zip(self.columnas, self.tipos))})
+
+    def dfs(self) -> List[Any]:
+        return [self.df(i) for i in range(len(self.datos))]
+
+    def copiar(self) -> np.ndarray:
+        return self.datos.copy()
+
+    def cerrar(self):
+        if self.shm is not None:
+            del self.datos
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def _llenar_compartido(nombre: str, forma: Tuple[int, int, int], ini: int, params: Sequence[Any]) -> Tuple[int, int]:
+    # Worker: simula params y escribe las filas ini.. del bloque compartido
+    shm = shared_memory.SharedMemory(name=nombre)
+    try:
+        datos = np.ndarray(forma, dtype=np.float64, buffer=shm.buf)
+        for j, par in enumerate(params):
+            for c, col in enumerate(simular_columnas(par).values()):
+                datos[ini + j, :, c] = col
+        del datos
+    finally:
+        shm.close()
+    return ini, len(params)
+
+
+def _horizonte(par: Any) -> int:
+    return par.anios if isinstance(par, core_v2.Params) else par.years
+
+
+def simular_compartido(params_list: Sequence[Any], por_tarea: Optional[int] = None,
+                       al_terminar: Optional[Callable[[ResultadosCompartidos, int, int], None]] = None
+                       ) -> ResultadosCompartidos:
+    # Todas las corridas en un único array contiguo. El primer escenario se
+    # corre en el padre para conocer columnas y tipos; el resto va al pool en
+    # tramos de por_tarea escenarios. al_terminar(res, ini, n) por tramo listo.
+    if len({_horizonte(p) for p in params_list}) > 1:
+        raise ValueError("todos los escenarios deben tener el mismo horizonte")
+    primero = simular_columnas(params_list[0])
+    filas = len(next(iter(primero.values())))
+    res = ResultadosCompartidos(list(primero), [str(np.asarray(v).dtype) for v in primero.values()],
+                                (len(params_list), filas, len(primero)))
+    try:
+        for c, col in enumerate(primero.values()):
+            res.datos[0, :, c] = col
+        if al_terminar is not None:
+            al_terminar(res, 0, 1)
+        resto = len(params_list) - 1
+        if resto:
+            por_tarea = por_tarea or max(1, -(-resto // (4 * (os.cpu_count() or 1))))
+            futuros = [pool().submit(_llenar_compartido, res.shm.name, res.datos.shape, ini,
+                                     list(params_list[ini:ini + por_tarea]))
+                       for ini in range(1, len(params_list), por_tarea)]
+            for fut in as_completed(futuros):
+                ini, n = fut.result()
+                if al_terminar is not None:
+                    al_terminar(res, ini, n)
+    except BaseException:
+        res.cerrar()
+        raise
+    return res
+
+
+def simular_concurrente(params_list: Sequence[Any],
+                        al_terminar: Optional[Callable[[int, Any], None]] = None) -> List[Any]:
+    # Lista de DataFrames en el orden de params_list. Con un mismo horizonte
+    # el lote viaja por memoria compartida y los DataFrames se arman en el padre
+    if len(params_list) <= 2 or len({_horizonte(p) for p in params_list}) > 1:
+        return mapear(simular_df, params_list, al_terminar)
+    dfs: List[Any] = [None] * len(params_list)
+
+    def listo(res: ResultadosCompartidos, ini: int, n: int):
+        for i in range(ini, ini + n):
+            dfs[i] = res.df(i)
+            if al_terminar is not None:
+                al_terminar(i, dfs[i])
+
+    simular_compartido(params_list, al_terminar=listo).cerrar()
+    return dfs
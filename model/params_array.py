@@ -0,0 +1,222 @@
+import hashlib
+import numpy as np
+from dataclasses import asdict, fields
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+from model.core import Params
+
+# Conjuntos de parámetros en formato columnar: un array por campo de Params
+# (o de ParamsV2) en lugar de una instancia por escenario. Las columnas que no
+# varían se guardan como escalares (arrays 0-d) y no ocupan memoria por fila,
+# así un barrido de 10^6 escenarios sobre unas pocas variables pesa decenas de
+# MB. Es la entrada nativa del motor por lotes (model/batch.py).
+
+# Columnas de una tabla de escenarios que los identifican y no son parámetros
+IDENTIFICADORES = ("nombre", "escenario")
+
+
+def _tipo(valor: Any) -> np.dtype:
+    if isinstance(valor, bool):
+        return np.dtype(bool)
+    if isinstance(valor, int):
+        return np.dtype(np.int64)
+    return np.dtype(np.float64)
+
+
+def _validar(nombre: str, valor: Any, tipo: np.dtype) -> np.ndarray:
+    x = np.asarray(valor)
+    if x.dtype.kind not in "biuf":
+        raise ValueError(f"{nombre}: se esperaban valores numéricos, no {x.dtype}")
+    if x.ndim > 1:
+        raise ValueError(f"{nombre}: se esperaba un escalar o una columna, forma {x.shape}")
+    if tipo == bool:
+        if x.dtype != bool and not np.isin(x, (0, 1)).all():
+            raise ValueError(f"{nombre}: valores no booleanos")
+    elif not np.isfinite(x.astype(float)).all():
+        raise ValueError(f"{nombre}: valores no finitos")
+    elif tipo.kind == "i" and x.dtype.kind == "f" and not (x == np.round(x)).all():
+        raise ValueError(f"{nombre}: se esperaban enteros")
+    x = x.astype(tipo, copy=False)
+    if x.ndim == 1 and x.size and (x == x[0]).all():
+        return x[0].copy()  # columna constante: se guarda como escalar
+    return x
+
+
+def params_validados(clase: type, valores: Any) -> Any:
+    # Una instancia de clase a partir de un dict externo (pedido JSON/HTTP)
+    # con la misma validación que las columnas: nombres, tipos y finitud
+    if not isinstance(valores, Mapping):
+        raise ValueError(f"params debe ser un objeto, no {type(valores).__name__}")
+    return ParamsArray(clase, valores, n=1).params(0)
+
+
+class ParamsArray:
+    def __init__(self, clase: type, columnas: Mapping[str, Any], n: Optional[int] = None):
+        # columnas: campo -> escalar o array (n,); los campos ausentes toman el
+        # valor por defecto de la clase
+        defecto = asdict(clase())
+        desconocidos = set(columnas) - set(defecto)
+        if desconocidos:
+            raise ValueError(f"parámetros desconocidos {sorted(desconocidos)}")
+        largos = {np.shape(v)[0] for v in columnas.values() if np.ndim(v) == 1}
+        if n is not None:
+            largos.add(n)
+        if len(largos) > 1:
+            raise ValueError(f"columnas de distinto largo: {sorted(largos)}")
+        self.clase = clase
+        self.n = largos.pop() if largos else 1
+        self._cols: Dict[str, np.ndarray] = {}
+        for nombre, valor in defecto.items():
+            self._cols[nombre] = _validar(nombre, columnas.get(nombre, valor), _tipo(valor))
+
+    # ---------- Construcción ----------
+
+    @classmethod
+    def desde_params(cls, params_list: Sequence[Any]) -> "ParamsArray":
+        if not len(params_list):
+            raise ValueError("se necesita al menos un escenario")
+        clase = type(params_list[0])
+        if any(type(p) is not clase for p in params_list):
+            raise ValueError("todos los parámetros deben ser de la misma clase")
+        columnas = {f.name: [getattr(p, f.name) for p in params_list] for f in fields(clase)}
+        return cls(clase, columnas, n=len(params_list))
+
+    @classmethod
+    def desde_base(cls, base: Any, n: Optional[int] = None, **variables) -> "ParamsArray":
+        # Barrido alrededor de base: sólo las variables indicadas son columnas
+        columnas = asdict(base)
+        columnas.update(variables)
+        return cls(type(base), columnas, n)
+
+    @classmethod
+    def grilla(cls, base: Any, **ejes: Sequence[Any]) -> "ParamsArray":
+        # Producto cartesiano de los ejes alrededor de base (el último eje
+        # varía más rápido)
+        mallas = np.meshgrid(*[np.asarray(v) for v in ejes.values()], indexing="ij")
+        n = int(np.prod([len(v) for v in ejes.values()])) if ejes else 1
+        return cls.desde_base(base, n, **{k: m.ravel() for k, m in zip(ejes, mallas)})
+
+    @classmethod
+    def desde_dataframe(cls, df: Any, clase: type = Params, base: Any = None) -> "ParamsArray":
+        # Toda columna debe ser un campo de la clase, salvo las que identifican
+        # al escenario (un nombre mal escrito no cae en silencio al defecto)
+        columnas = asdict(base) if base is not None else {}
+        nombres = set(asdict(clase()))
+        desconocidas = [c for c in df.columns if c not in nombres and c not in IDENTIFICADORES]
+        if desconocidas:
+            raise ValueError(f"columnas que no son parámetros de {clase.__name__}: {desconocidas}")
+        columnas.update({c: df[c].to_numpy() for c in df.columns if c in nombres})
+        return cls(clase, columnas, n=len(df))
+
+    @classmethod
+    def leer_csv(cls, path: str, clase: type = Params, base: Any = None) -> "ParamsArray":
+        import pandas as pd
+        return cls.desde_dataframe(pd.read_csv(path, float_precision="round_trip"), clase, base)
+
+    @classmethod
+    def leer_parquet(cls, path: str, clase: type = Params, base: Any = None,
+                     columnas: Optional[Sequence[str]] = None) -> "ParamsArray":
+        import pandas as pd  # requiere pyarrow o fastparquet
+        return cls.desde_dataframe(pd.read_parquet(path, columns=columnas), clase, base)
+
+    @classmethod
+    def concatenar(cls, partes: Sequence["ParamsArray"]) -> "ParamsArray":
+        clase = partes[0].clase
+        if any(p.clase is not clase for p in partes):
+            raise ValueError("todos los lotes deben ser de la misma clase")
+        columnas = {}
+        for nombre in partes[0]._cols:
+            if partes[0].es_constante(nombre) and all(
+                    p.es_constante(nombre) and p._cols[nombre] == partes[0]._cols[nombre] for p in partes):
+                columnas[nombre] = partes[0]._cols[nombre]
+            else:
+                columnas[nombre] = np.concatenate([p.columna(nombre) for p in partes])
+        return cls(clase, columnas, n=sum(len(p) for p in partes))
+
+    # ---------- Acceso ----------
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def nombres(self) -> List[str]:
+        return list(self._cols)
+
+    @property
+    def variables(self) -> List[str]:
+        # Campos que cambian entre escenarios
+        return [k for k in self._cols if not self.es_constante(k)]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(c.nbytes for c in self._cols.values())
+
+    def es_constante(self, nombre: str) -> bool:
+        return self._cols[nombre].ndim == 0
+
+    def huella(self) -> str:
+        # Hash del contenido (clase, largo y columnas) para reconocer un barrido
+        h = hashlib.sha256(f"{self.clase.__module__}.{self.clase.__name__}:{self.n}".encode())
+        for k, c in self._cols.items():
+            h.update(k.encode())
+            h.update(c.dtype.str.encode())
+            h.update(np.ascontiguousarray(c).tobytes())
+        return h.hexdigest()[:16]
+
+    def columna(self, nombre: str) -> np.ndarray:
+        # Siempre (n,); las constantes salen como vista de sólo lectura
+        c = self._cols[nombre]
+        return np.broadcast_to(c, (self.n,)) if c.ndim == 0 else c
+
+    def params(self, i: int) -> Any:
+        return self.clase(**{k: c.item() if c.ndim == 0 else c[i].item() for k, c in self._cols.items()})
+
+    def __getitem__(self, idx: Union[int, slice, np.ndarray]) -> Any:
+        # Entero -> instancia de Params; slice/máscara/índices -> ParamsArray
+        if isinstance(idx, (int, np.integer)):
+            i = int(idx)
+            if not -self.n <= i < self.n:
+                raise IndexError(i)
+            return self.params(i % self.n)
+        filas = np.arange(self.n)[idx]
+        return ParamsArray(self.clase, {k: c if c.ndim == 0 else c[filas] for k, c in self._cols.items()},
+                           n=len(filas))
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(self.n):
+            yield self.params(i)
+
+    def reemplazar(self, **columnas: Any) -> "ParamsArray":
+        # Copia con algunos campos cambiados (escalares o columnas (n,))
+        return ParamsArray(self.clase, {**self._cols, **columnas}, n=self.n)
+
+    def a_lista(self) -> List[Any]:
+        return list(self)
+
+    def lotes(self, tam: int) -> Iterator["ParamsArray"]:
+        for i in range(0, self.n, tam):
+            yield self[i:i + tam]
+
+    def espacio_nombres(self) -> SimpleNamespace:
+        # Entrada de los mapas anuales: columnas (n,) y escalares de Python
+        # para lo constante (se difunden sin materializarse)
+        return SimpleNamespace(**{k: c.item() if c.ndim == 0 else c for k, c in self._cols.items()})
+
+    # ---------- Exportación ----------
+
+    def a_dataframe(self, todas: bool = False):
+        # Por defecto sólo las columnas que varían
+        import pandas as pd
+        nombres = self.nombres if todas else self.variables
+        return pd.DataFrame({k: self.columna(k) for k in nombres})
+
+    def guardar_csv(self, path: str, todas: bool = True):
+        self.a_dataframe(todas).to_csv(path, index=False)
+
+    def guardar_parquet(self, path: str, todas: bool = True):
+        self.a_dataframe(todas).to_parquet(path, index=False)
+
+    def __repr__(self):
+        return (f"ParamsArray({self.clase.__module__}.{self.clase.__name__}, n={self.n}, "
+                f"variables={self.variables}, {self.nbytes / 2**20:.1f} MB)")
@@ -0,0 +1,100 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple
+
+# Política de tipos para guardar las salidas de los motores por lotes y Monte
+# Carlo. El estado se calcula siempre en float64; la política sólo decide con
+# qué tipo se guardan las series al terminar:
+#   - personas (alumnos por grado, divisiones, candidatos, bajas, ...): int16
+#     redondeado al entero más cercano, |e| <= 0.5 (el mismo redondeo que
+#     aplica rint en los DataFrames). Las admisiones del modelo no son enteras,
+#     así que hay fracciones aun en Monte Carlo; divisiones y egresados quedan
+#     exactos. Un valor fuera de [-32768, 32767] es un error.
+#   - dinero y ratios: float32, error relativo |e| <= 2^-24 (~6e-8) por valor;
+#     una Caja de 2e9 queda a menos de 128 unidades de moneda.
+#   - series booleanas y las no clasificadas se guardan sin cambios.
+
+PERSONAS = {
+    "Gk", "G", "Div", "Demanda", "alumnos", "alumnos_totales", "admitidos", "admitidos_deseados",
+    "rechazados", "bajas_totales", "bajas_no_continuidad", "egresados", "nuevos_candidatos",
+    "nuevos_candidatos_mkt", "nuevos_candidatos_q", "Cand", "candidatos_pago",
+    "candidatos_organico", "pipeline_construcciones",
+}
+RATIOS = {"calidad", "selectividad", "tasa_bajas", "hacinamiento_prom"}
+DINERO = {
+    "Act", "Caja", "Deuda", "facturacion", "sueldos", "inv_infra", "inv_calidad_alumno",
+    "mantenimiento", "marketing", "Marketing", "costos_opex", "resultado_operativo", "capex_total",
+    "capex_propio", "capex_financiado", "interes_deuda", "amortizacion_deuda", "resultado_neto",
+    "cac", "CAC",
+}
+
+EPS_FLOAT32 = 2.0 ** -24
+
+
+@dataclass(frozen=True)
+class PoliticaTipos:
+    personas: str = "int16"
+    dinero: str = "float32"
+    ratios: str = "float32"
+
+    def tipo(self, nombre: str, actual: np.dtype) -> np.dtype:
+        if actual == bool:
+            return np.dtype(bool)
+        if nombre in PERSONAS:
+            return np.dtype(self.personas)
+        if nombre in DINERO:
+            return np.dtype(self.dinero)
+        if nombre in RATIOS:
+            return np.dtype(self.ratios)
+        return np.dtype(actual)
+
+
+COMPACTA = PoliticaTipos()
+# Para campo medio cuando importan las fracciones de alumno
+COMPACTA_FRACCIONAL = PoliticaTipos(personas="float32")
+
+
+def convertir(nombre: str, v: np.ndarray, politica: Optional[PoliticaTipos]) -> np.ndarray:
+    if politica is None:
+        return v
+    tipo = politica.tipo(nombre, v.dtype)
+    if tipo == v.dtype:
+        return v
+    if tipo.kind == "i":
+        r = np.rint(v)
+        info = np.iinfo(tipo)
+        if r.size and (r.min() < info.min or r.max() > info.max):
+            raise ValueError(f"{nombre}: valores fuera del rango de {tipo}")
+        return r.astype(tipo)
+    return v.astype(tipo)
+
+
+def aplicar(series: Mapping[str, np.ndarray], politica: Optional[PoliticaTipos]) -> Dict[str, np.ndarray]:
+    return {k: convertir(k, np.asarray(v), politica) for k, v in series.items()}
+
+
+def cota(nombre: str, v: np.ndarray, politica: Optional[PoliticaTipos]) -> float:
+    # Error absoluto máximo garantizado al guardar v con la política
+    if politica is None:
+        return 0.0
+    tipo = politica.tipo(nombre, np.asarray(v).dtype)
+    if tipo.kind == "i":
+        return 0.5
+    if tipo == np.float32:
+        return float(np.abs(v).max(initial=0.0)) * EPS_FLOAT32
+    return 0.0
+
+
+def errores(series: Mapping[str, np.ndarray], politica: Optional[PoliticaTipos]
+            ) -> Dict[str, Tuple[float, float]]:
+    # serie -> (error absoluto máximo observado, cota)
+    salida = {}
+    for k, v in series.items():
+        v = np.asarray(v)
+        c = convertir(k, v, politica)
+        salida[k] = (float(np.abs(c.astype(float) - v).max(initial=0.0)), cota(k, v, politica))
+    return salida
+
+
+def bytes_series(series: Mapping[str, np.ndarray]) -> int:
+    return sum(np.asarray(v).nbytes for v in series.values())
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from model import parallel
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+from model.version import MODEL_VERSION
+
+# Registro declarativo de escenarios con nombre (un archivo JSON o YAML por
+# escuela) y artefactos con sus resultados precalculados. Un artefacto guarda
+# la versión del modelo y el hash de las definiciones con que se generó; si
+# alguno no coincide se considera vencido y se vuelve a calcular.
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+REGISTRO_DEFECTO = os.path.join(CARPETA, "escenarios.json")
+ARTEFACTOS_DEFECTO = os.environ.get("SCHOOL_SIM_ARTIFACTS", os.path.join(CARPETA, "artefactos"))
+
+MODELOS = {"v1": Params, "v2": ParamsV2}
+
+
+@dataclass
+class Escenario:
+    nombre: str
+    params: Dict[str, Any]
+    etiqueta: str = ""
+    descripcion: str = ""
+
+    def __post_init__(self):
+        if not self.etiqueta:
+            self.etiqueta = self.nombre
+
+
+@dataclass
+class Registro:
+    escuela: str
+    modelo: str = "v1"
+    defecto: str = ""  # escenario con que arranca la app
+    escenarios: Dict[str, Escenario] = field(default_factory=dict)
+
+    @property
+    def clase_params(self):
+        return MODELOS[self.modelo]
+
+    def nombres(self) -> List[str]:
+        return list(self.escenarios)
+
+    def params(self, nombre: str) -> Any:
+        # Instancia nueva en cada llamada: quien la recibe puede modificarla
+        return self.clase_params(**self.escenarios[nombre].params)
+
+    def huella(self) -> str:
+        datos = json.dumps([self.modelo, [[e.nombre, e.params] for e in self.escenarios.values()]],
+                           sort_keys=True)
+        return hashlib.sha256(datos.encode()).hexdigest()[:16]
+
+
+def _leer(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml  # dependencia opcional, sólo para registros en YAML
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def cargar_registro(path: str = REGISTRO_DEFECTO) -> Registro:
+    datos = _leer(path)
+    reg = Registro(escuela=datos["escuela"], modelo=datos.get("modelo", "v1"),
+                   defecto=datos.get("defecto", ""))
+    validos = set(reg.clase_params.__dataclass_fields__)
+    for e in datos["escenarios"]:
+        esc = Escenario(nombre=e["nombre"], params=dict(e.get("params", {})),
+                        etiqueta=e.get("etiqueta", ""), descripcion=e.get("descripcion", ""))
+        desconocidos = set(esc.params) - validos
+        if desconocidos:
+            raise ValueError(f"escenario {esc.nombre!r}: parámetros desconocidos {sorted(desconocidos)}")
+        if esc.nombre in reg.escenarios:
+            raise ValueError(f"escenario duplicado: {esc.nombre!r}")
+        reg.escenarios[esc.nombre] = esc
+    if not reg.defecto and reg.escenarios:
+        reg.defecto = next(iter(reg.escenarios))
+    if reg.defecto and reg.defecto not in reg.escenarios:
+        raise ValueError(f"escenario por defecto desconocido: {reg.defecto!r}")
+    return reg
+
+
+class Artefacto:
+    # Resultados de todos los escenarios de un registro en un solo array
+    # (n_escenarios, n_años, n_columnas)
+    def __init__(self, nombres: List[str], columnas: List[str], tipos: List[str],
+                 datos: np.ndarray, version: str, huella: str):
+        self.nombres = nombres
+        self.columnas = columnas
+        self.tipos = tipos
+        self.datos = datos
+        self.version = version
+        self.huella = huella
+        self._indice = {n: i for i, n in enumerate(nombres)}
+
+    def vigente(self, reg: Registro) -> bool:
+        return self.version == MODEL_VERSION and self.huella == reg.huella()
+
+    def df(self, nombre: str) -> pd.DataFrame:
+        bloque = self.datos[self._indice[nombre]]
+        return pd.DataFrame({c: bloque[:, j].astype(t)
+                             for j, (c, t) in enumerate(zip(self.columnas, self.tipos))})
+
+    def guardar(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, datos=self.datos, meta=np.array(json.dumps({
+                "nombres": self.nombres, "columnas": self.columnas, "tipos": self.tipos,
+                "version": self.version, "huella": self.huella,
+            })))
+        os.replace(tmp, path)
+
+    @classmethod
+    def cargar(cls, path: str) -> "Artefacto":
+        with np.load(path) as z:
+            meta = json.loads(str(z["meta"]))
+            return cls(meta["nombres"], meta["columnas"], meta["tipos"], z["datos"],
+                       meta["version"], meta["huella"])
+
+
+def precalcular(reg: Registro, en_paralelo: bool = True) -> Artefacto:
+    # en_paralelo=False corre en este proceso, sin arrancar el pool (la app
+    # lo usa si al desplegar no se corrió python -m model.scenarios)
+    nombres = reg.nombres()
+    lista = [reg.params(n) for n in nombres]
+    if en_paralelo:
+        with parallel.simular_compartido(lista) as res:
+            return Artefacto(nombres, res.columnas, res.tipos, res.copiar(), MODEL_VERSION, reg.huella())
+    corridas = [parallel.simular_columnas(par) for par in lista]
+    columnas = list(corridas[0])
+    tipos = [str(np.asarray(v).dtype) for v in corridas[0].values()]
+    datos = np.stack([np.column_stack([np.asarray(v, dtype=float) for v in c.values()]) for c in corridas])
+    return Artefacto(nombres, columnas, tipos, datos, MODEL_VERSION, reg.huella())
+
+
+def path_artefacto(reg: Registro, directorio: str = ARTEFACTOS_DEFECTO) -> str:
+    nombre = "".join(c if c.isalnum() else "_" for c in reg.escuela)
+    return os.path.join(directorio, f"{nombre}.npz")
+
+
+def artefacto(reg: Registro, directorio: str = ARTEFACTOS_DEFECTO,
+              recalcular: bool = True, en_paralelo: bool = True) -> Optional[Artefacto]:
+    # Artefacto vigente del registro; si falta o está vencido se recalcula y
+    # se guarda (o se devuelve None con recalcular=False)
+    path = path_artefacto(reg, directorio)
+    if os.path.exists(path):
+        art = Artefacto.cargar(path)
+        if art.vigente(reg):
+            return art
+    if not recalcular:
+        return None
+    art = precalcular(reg, en_paralelo)
+    art.guardar(path)
+    return art
+
+
+if __name__ == "__main__":
+    # Paso de despliegue: python -m model.scenarios [registro.json|yaml ...]
+    import sys
+    for path in sys.argv[1:] or [REGISTRO_DEFECTO]:
+        reg = cargar_registro(path)
+        art = artefacto(reg)
+        print(f"{reg.escuela}: {len(art.nombres)} escenarios -> {path_artefacto(reg)} (modelo {art.version})")
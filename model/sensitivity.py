@@ -0,0 +1,280 @@
+import numpy as np
+import pandas as pd
+from dataclasses import asdict, dataclass, fields
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence
+
+from model import dynamics, dynamics_v2
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+
+# Sensibilidades en modo directo (números duales). Cada parámetro se siembra
+# con una derivada unitaria y el mapa anual (v1 de campo medio o v2) se corre
+# una sola vez arrastrando, junto a cada valor, el vector de derivadas respecto
+# de todos los parámetros. Los quiebres de max/min/clip/where se tratan como
+# subgradientes: se propaga la derivada de la rama activa y en los empates la
+# del primer argumento; floor tiene derivada nula.
+
+# Parámetros que fijan la estructura de la corrida y no se derivan
+ESTRUCTURALES = {
+    "years", "anios", "random_seed", "pipeline_start_year", "lag_calidad_candidatos",
+    "div_inicial_por_grado", "divisiones_iniciales",
+}
+
+
+def _val(x):
+    return x.val if isinstance(x, Dual) else x
+
+
+def _der(x):
+    return x.der if isinstance(x, Dual) else 0.0
+
+
+def _col(x):
+    # Valor listo para multiplicar contra el eje de parámetros
+    return np.asarray(_val(x))[..., None]
+
+
+def _eje_der(axis):
+    # Eje de val trasladado a der (que tiene un eje extra al final)
+    return axis - 1 if axis < 0 else axis
+
+
+class Dual:
+    # Valor (...) con derivadas (..., P); sólo implementa lo que usan los mapas
+    __array_priority__ = 1000
+
+    def __init__(self, val, der):
+        self.val = np.asarray(val, dtype=float)
+        der = np.asarray(der, dtype=float)
+        self.der = np.broadcast_to(der, self.val.shape + der.shape[-1:])
+
+    @property
+    def shape(self):
+        return self.val.shape
+
+    @property
+    def ndim(self):
+        return self.val.ndim
+
+    def __repr__(self):
+        return f"Dual(val={self.val!r}, der.shape={self.der.shape})"
+
+    def __getitem__(self, idx):
+        idx = idx if isinstance(idx, tuple) else (idx,)
+        return Dual(self.val[idx], self.der[idx + (slice(None),)])
+
+    def sum(self, axis=None):
+        if axis is None:
+            return Dual(self.val.sum(), self.der.reshape(-1, self.der.shape[-1]).sum(axis=0))
+        return Dual(self.val.sum(axis=axis), self.der.sum(axis=_eje_der(axis)))
+
+    # Aritmética delegada en los ufuncs
+    def __add__(self, o): return np.add(self, o)
+    def __radd__(self, o): return np.add(o, self)
+    def __sub__(self, o): return np.subtract(self, o)
+    def __rsub__(self, o): return np.subtract(o, self)
+    def __mul__(self, o): return np.multiply(self, o)
+    def __rmul__(self, o): return np.multiply(o, self)
+    def __truediv__(self, o): return np.true_divide(self, o)
+    def __rtruediv__(self, o): return np.true_divide(o, self)
+    def __pow__(self, o): return np.power(self, o)
+    def __rpow__(self, o): return np.power(o, self)
+    def __neg__(self): return np.negative(self)
+
+    # Las comparaciones miran sólo el valor
+    def __lt__(self, o): return self.val < _val(o)
+    def __le__(self, o): return self.val <= _val(o)
+    def __gt__(self, o): return self.val > _val(o)
+    def __ge__(self, o): return self.val >= _val(o)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != "__call__" or kwargs:
+            return NotImplemented
+        regla = _UFUNCS.get(ufunc)
+        if regla is None:
+            # Comparaciones y demás: se evalúan sobre los valores
+            return ufunc(*[_val(x) for x in inputs])
+        return regla(*inputs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        regla = _FUNCIONES.get(func)
+        if regla is None:
+            return NotImplemented
+        return regla(*args, **kwargs)
+
+
+def _sumar(a, b):
+    return Dual(_val(a) + _val(b), _der(a) + _der(b))
+
+
+def _restar(a, b):
+    return Dual(_val(a) - _val(b), _der(a) - _der(b))
+
+
+def _multiplicar(a, b):
+    return Dual(_val(a) * _val(b), _der(a) * _col(b) + _col(a) * _der(b))
+
+
+def _dividir(a, b):
+    q = _val(a) / _val(b)
+    return Dual(q, (_der(a) - np.asarray(q)[..., None] * _der(b)) / _col(b))
+
+
+def _potencia(a, b):
+    v = _val(a) ** _val(b)
+    der = _col(b) * _col(a) ** (_col(b) - 1.0) * _der(a)
+    if isinstance(b, Dual):
+        der = der + np.asarray(v)[..., None] * np.log(np.maximum(_col(a), 1e-300)) * b.der
+    return Dual(v, der)
+
+
+def _elegir(cond, a, b):
+    # Derivada de la rama elegida; las constantes aportan derivada nula
+    return Dual(np.where(cond, _val(a), _val(b)),
+                np.where(np.asarray(cond)[..., None], _der(a), _der(b)))
+
+
+def _maximo(a, b):
+    return _elegir(_val(a) >= _val(b), a, b)
+
+
+def _minimo(a, b):
+    return _elegir(_val(a) <= _val(b), a, b)
+
+
+_UFUNCS = {
+    np.add: _sumar,
+    np.subtract: _restar,
+    np.multiply: _multiplicar,
+    np.true_divide: _dividir,
+    np.power: _potencia,
+    np.negative: lambda a: Dual(-a.val, -a.der),
+    np.maximum: _maximo,
+    np.minimum: _minimo,
+    np.floor: lambda a: np.floor(a.val),
+}
+
+
+def _where(cond, a=None, b=None):
+    return _elegir(_val(cond), a, b)
+
+
+def _clip(a, lo, hi):
+    return _minimo(_maximo(a, lo), hi)
+
+
+def _concatenate(seq, axis=0):
+    P = next(x.der.shape[-1] for x in seq if isinstance(x, Dual))
+    val = np.concatenate([_val(x) for x in seq], axis=axis)
+    der = np.concatenate(
+        [x.der if isinstance(x, Dual) else np.zeros(np.shape(x) + (P,)) for x in seq],
+        axis=_eje_der(axis))
+    return Dual(val, der)
+
+
+def _expand_dims(a, axis):
+    return Dual(np.expand_dims(a.val, axis), np.expand_dims(a.der, _eje_der(axis)))
+
+
+_FUNCIONES = {
+    np.where: _where,
+    np.clip: _clip,
+    np.concatenate: _concatenate,
+    np.expand_dims: _expand_dims,
+    np.zeros_like: lambda a, *args, **kw: np.zeros_like(a.val, *args, **kw),
+    np.shape: lambda a: a.shape,
+    np.ndim: lambda a: a.ndim,
+}
+
+
+# ---------- Corridas aumentadas ----------
+
+def parametros_derivables(par: Any) -> List[str]:
+    return [f.name for f in fields(par) if f.name not in ESTRUCTURALES
+            and not isinstance(getattr(par, f.name), bool)]
+
+
+def _sembrar(par: Any, nombres: Sequence[str]) -> SimpleNamespace:
+    cols = asdict(par)
+    P = len(nombres)
+    for i, nombre in enumerate(nombres):
+        cols[nombre] = Dual(float(cols[nombre]), np.eye(P)[i])
+    return SimpleNamespace(**cols)
+
+
+def _apilar(filas: List[Any], P: int):
+    val = np.stack([np.asarray(_val(x), dtype=float) for x in filas])
+    der = np.stack([np.broadcast_to(_der(x), np.shape(_val(x)) + (P,)) for x in filas])
+    return val, der
+
+
+@dataclass
+class Sensibilidades:
+    modelo: str
+    parametros: List[str]
+    valores_parametros: np.ndarray
+    valores: Dict[str, np.ndarray]  # serie -> (T+1, ...)
+    derivadas: Dict[str, np.ndarray]  # serie -> (T+1, ..., P)
+
+    def gradiente(self, serie: str, anio: int = -1) -> np.ndarray:
+        return self.derivadas[serie][anio]
+
+    def tabla(self, serie: str, anio: int = -1) -> pd.DataFrame:
+        # Derivadas y elasticidades de una serie escalar en un año, ordenadas
+        # por impacto (insumo directo de un gráfico tornado)
+        y = float(self.valores[serie][anio])
+        d = self.derivadas[serie][anio]
+        elasticidad = d * self.valores_parametros / y if y != 0 else np.full_like(d, np.nan)
+        df = pd.DataFrame({
+            "parametro": self.parametros,
+            "valor": self.valores_parametros,
+            "derivada": d,
+            "elasticidad": elasticidad,
+        })
+        orden = np.argsort(-np.abs(np.nan_to_num(df["elasticidad"].to_numpy())), kind="stable")
+        return df.iloc[orden].reset_index(drop=True)
+
+
+def _correr(par, mod, T, anios, nombres, series_estado, agregar):
+    P = len(nombres)
+    pd_ = _sembrar(par, nombres)
+    est = mod.estado_inicial(pd_)
+    filas: Dict[str, List[Any]] = {}
+    for k in range(anios):
+        fl = mod.paso(est, pd_, k, T)
+        for nombre in series_estado:
+            filas.setdefault(nombre, []).append(getattr(est, nombre))
+        for nombre in mod.SERIES_FLUJO:
+            filas.setdefault(nombre, []).append(fl[nombre])
+        agregar(filas, est, fl)
+        est = fl["siguiente"]
+    valores, derivadas = {}, {}
+    for nombre, lista in filas.items():
+        valores[nombre], derivadas[nombre] = _apilar(lista, P)
+    return valores, derivadas
+
+
+def sensibilidades_v1(par: Params, parametros: Optional[Sequence[str]] = None) -> Sensibilidades:
+    # Modelo v1 de campo medio (bajas esperadas), años 0..years
+    nombres = list(parametros) if parametros is not None else parametros_derivables(par)
+
+    def agregar(filas, est, fl):
+        filas.setdefault("alumnos", []).append(est.Gk.sum(axis=-1))
+
+    valores, derivadas = _correr(par, dynamics, par.years, par.years + 1, nombres,
+                                 ("Gk", "Act", "Caja", "Deuda"), agregar)
+    return Sensibilidades("v1", nombres, np.array([float(getattr(par, n)) for n in nombres]),
+                          valores, derivadas)
+
+
+def sensibilidades_v2(par: ParamsV2, parametros: Optional[Sequence[str]] = None) -> Sensibilidades:
+    nombres = list(parametros) if parametros is not None else parametros_derivables(par)
+
+    def agregar(filas, est, fl):
+        filas.setdefault("facturacion", []).append(fl["facturacion"])
+        filas.setdefault("resultado", []).append(fl["resultado"])
+
+    valores, derivadas = _correr(par, dynamics_v2, par.anios - 1, par.anios, nombres, ("G",), agregar)
+    return Sensibilidades("v2", nombres, np.array([float(getattr(par, n)) for n in nombres]),
+                          valores, derivadas)
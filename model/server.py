@@ -0,0 +1,319 @@
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from model import parallel
+from model.cache import CacheResultados, cache_global, clave_params
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+from model.jsonl import leer_pedido
+from model.version import MODEL_VERSION
+
+# Servicio HTTP local (asyncio, sin dependencias) para consultar escenarios
+# desde otras herramientas sin importar la app:
+#
+#   POST /simular  {"modelo": "v1", "motor": "lote", "params": {"cuota_mensual": 90000},
+#                   "columnas": ["AlumnosTotales", "Caja"]}
+#       -> {"columnas": {"AlumnosTotales": [...], ...}, "origen": "calculo"}
+#   GET  /metricas  latencias p50/p95/p99, throughput, tamaño de lotes, caché
+#   GET  /salud
+#
+# Las respuestas son las del DataFrame de simulate() (motor "simulate") o de
+# simulate_batch (motor "lote", campo medio); "columnas" es opcional. Por cada
+# pedido: primero la caché de resultados (para "simulate", la de memoria y
+# disco que comparte la app); si el mismo escenario ya se está calculando, el pedido
+# espera ese cálculo en lugar de repetirlo; si no, los pedidos "lote" que
+# llegan dentro de la ventana se juntan en una sola llamada al motor por
+# lotes. Todo el cálculo corre en el pool de procesos (model/parallel.py).
+
+PUERTO_DEFECTO = 8150
+MUESTRAS_LATENCIA = 10000
+
+
+def _horizonte(par: Any) -> int:
+    return par.anios if isinstance(par, ParamsV2) else par.years
+
+
+class PedidoInvalido(ValueError):
+    pass
+
+
+def _lista(valores: np.ndarray) -> list:
+    # JSON estricto: NaN/inf como null
+    return [x if math.isfinite(x) else None for x in valores.tolist()] \
+        if valores.dtype.kind == "f" else valores.tolist()
+
+
+class Metricas:
+    def __init__(self, objetivo_p99_ms: float):
+        self.objetivo_p99_ms = objetivo_p99_ms
+        self.inicio = time.monotonic()
+        self.latencias = deque(maxlen=MUESTRAS_LATENCIA)  # (instante, ms)
+        self.pedidos = 0
+        self.errores = 0
+        self.por_origen = {"cache": 0, "coalescido": 0, "calculo": 0}
+        self.lotes = 0
+        self.escenarios_en_lotes = 0
+
+    def registrar(self, ms: float, origen: Optional[str]):
+        self.pedidos += 1
+        if origen is None:
+            self.errores += 1
+        else:
+            self.por_origen[origen] += 1
+            self.latencias.append((time.monotonic(), ms))
+
+    def resumen(self, ventana_s: float = 60.0) -> dict:
+        ahora = time.monotonic()
+        ms = np.array([m for _, m in self.latencias]) if self.latencias else np.zeros(1)
+        recientes = sum(1 for t, _ in self.latencias if t >= ahora - ventana_s)
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        return {
+            "pedidos": self.pedidos,
+            "errores": self.errores,
+            "por_origen": dict(self.por_origen),
+            "latencia_ms": {"p50": p50, "p95": p95, "p99": p99, "max": float(ms.max()),
+                            "muestras": len(self.latencias)},
+            "objetivo_p99_ms": self.objetivo_p99_ms,
+            "cumple_objetivo": bool(p99 <= self.objetivo_p99_ms),
+            "pedidos_por_s": recientes / min(ventana_s, max(ahora - self.inicio, 1e-9)),
+            "lotes": self.lotes,
+            "escenarios_por_lote": self.escenarios_en_lotes / self.lotes if self.lotes else 0.0,
+            "activo_s": ahora - self.inicio,
+        }
+
+
+class _Workers(asyncio.Semaphore):
+    # Semáforo de lotes en el pool que avisa cuando se libera un worker
+    def __init__(self, n: int, libre: asyncio.Event):
+        super().__init__(n)
+        self._aviso = libre
+
+    def release(self):
+        super().release()
+        self._aviso.set()
+
+
+class Servicio:
+    def __init__(self, ventana_ms: float = 5.0, tam_lote: int = 256, objetivo_p99_ms: float = 250.0,
+                 lotes_simultaneos: Optional[int] = None,
+                 cache_simulate: Optional[CacheResultados] = None,
+                 cache_lote: Optional[CacheResultados] = None):
+        self.ventana_s = ventana_ms / 1000
+        self.tam_lote = tam_lote
+        self.lotes_simultaneos = lotes_simultaneos or os.cpu_count() or 1  # uno por worker
+        # Campo medio y simulate estocástico no comparten entradas de caché;
+        # la del campo medio queda sólo en memoria (recalcular cuesta menos
+        # que comprimir a disco)
+        self.caches = {"simulate": cache_simulate or cache_global(),
+                       "lote": cache_lote or CacheResultados(None, version=MODEL_VERSION + "-lote")}
+        self.metricas = Metricas(objetivo_p99_ms)
+        self.en_vuelo: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._cola: Optional[asyncio.Queue] = None
+        self._juntador: Optional[asyncio.Task] = None
+        self._tareas = set()  # referencias a los lotes en curso
+        self._libre = asyncio.Event()
+        self._workers: Optional[_Workers] = None
+
+    # ---------- Cálculo ----------
+
+    async def _correr_lote(self, grupo: List[Tuple[Any, asyncio.Future]]):
+        params = [p for p, _ in grupo]
+        self.metricas.lotes += 1
+        self.metricas.escenarios_en_lotes += len(params)
+        try:
+            async with self._workers:
+                dfs = await asyncio.wrap_future(parallel.pool().submit(parallel.simular_lote_df, params))
+        except Exception as e:
+            if len(grupo) == 1:
+                if not grupo[0][1].done():
+                    grupo[0][1].set_exception(e)
+                return
+            # Un escenario inválido no arrastra al resto del lote
+            await asyncio.gather(*(self._correr_lote([g]) for g in grupo))
+            return
+        for (_, fut), df in zip(grupo, dfs):
+            if not fut.done():
+                fut.set_result(df)
+
+    async def _juntar(self):
+        # Micro-lotes: el primer pedido abre una ventana; lo que llega dentro
+        # de ella (hasta tam_lote) sale en la misma llamada, agrupado por
+        # clase y horizonte. Con todos los workers ocupados no se arma el
+        # lote siguiente: los pedidos se acumulan en la cola y bajo carga los
+        # lotes crecen solos en lugar de hacer fila en el pool
+        while True:
+            pendientes = [await self._cola.get()]
+            while self._workers.locked():
+                await self._libre.wait()
+                self._libre.clear()
+            limite = time.monotonic() + self.ventana_s
+            while len(pendientes) < self.tam_lote:
+                resto = limite - time.monotonic()
+                if resto <= 0:
+                    break
+                try:
+                    pendientes.append(await asyncio.wait_for(self._cola.get(), resto))
+                except asyncio.TimeoutError:
+                    break
+            grupos: Dict[Tuple[type, int], list] = {}
+            for par, fut in pendientes:
+                grupos.setdefault((type(par), _horizonte(par)), []).append((par, fut))
+            for grupo in grupos.values():
+                tarea = asyncio.create_task(self._correr_lote(grupo))
+                self._tareas.add(tarea)
+                tarea.add_done_callback(self._tareas.discard)
+
+    async def _calcular(self, par: Any, motor: str):
+        if motor == "simulate":
+            return await asyncio.wrap_future(parallel.pool().submit(parallel.simular_df, par))
+        if self._juntador is None:
+            self._cola = asyncio.Queue()
+            self._workers = _Workers(self.lotes_simultaneos, self._libre)
+            self._juntador = asyncio.create_task(self._juntar())
+        fut = asyncio.get_running_loop().create_future()
+        await self._cola.put((par, fut))
+        return await fut
+
+    async def resultado(self, par: Any, motor: str) -> Tuple[Any, str]:
+        # (DataFrame, origen) con origen "cache", "coalescido" o "calculo"
+        loop = asyncio.get_running_loop()
+        cache = self.caches[motor]
+        clave = (motor, clave_params(par))
+        if clave in self.en_vuelo:
+            return await asyncio.shield(self.en_vuelo[clave]), "coalescido"
+        df = await loop.run_in_executor(None, cache.obtener, par)
+        if df is not None:
+            return df, "cache"
+        if clave in self.en_vuelo:  # llegó otro igual mientras se leía el disco
+            return await asyncio.shield(self.en_vuelo[clave]), "coalescido"
+        fut = loop.create_future()
+        self.en_vuelo[clave] = fut
+        try:
+            df = await self._calcular(par, motor)
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # marcada como vista si nadie más esperaba
+            del self.en_vuelo[clave]
+            raise
+        fut.set_result(df)
+        # La entrada sigue "en vuelo" hasta quedar en la caché, así un pedido
+        # igual que llegue mientras tanto no recalcula
+        guardado = loop.run_in_executor(None, cache.guardar, par, df)
+        guardado.add_done_callback(lambda _: self.en_vuelo.pop(clave, None))
+        return df, "calculo"
+
+    # ---------- Pedidos ----------
+
+    async def simular(self, pedido: Any) -> dict:
+        t0 = time.perf_counter()
+        origen = None
+        try:
+            try:
+                _, motor, par = leer_pedido(pedido)
+            except ValueError as e:
+                raise PedidoInvalido(str(e)) from None
+            columnas = pedido.get("columnas")
+            if columnas is not None and not (isinstance(columnas, list)
+                                             and all(isinstance(c, str) for c in columnas)):
+                raise PedidoInvalido("columnas debe ser una lista de nombres")
+            df, origen = await self.resultado(par, motor)
+            columnas = columnas or list(df.columns)
+            faltan = [c for c in columnas if c not in df.columns]
+            if faltan:
+                origen = None
+                raise PedidoInvalido(f"columnas desconocidas: {faltan}")
+            return {"columnas": {c: _lista(df[c].to_numpy()) for c in columnas}, "origen": origen}
+        finally:
+            self.metricas.registrar((time.perf_counter() - t0) * 1000, origen)
+
+    # ---------- HTTP ----------
+
+    async def _despachar(self, metodo: str, ruta: str, cuerpo: bytes) -> Tuple[int, Any]:
+        if ruta == "/simular":
+            if metodo != "POST":
+                return 405, {"error": "usar POST"}
+            try:
+                pedido = json.loads(cuerpo or b"{}")
+            except json.JSONDecodeError as e:
+                return 400, {"error": f"JSON inválido: {e}"}
+            try:
+                return 200, await self.simular(pedido)
+            except PedidoInvalido as e:
+                return 400, {"error": str(e)}
+            except Exception as e:
+                return 500, {"error": f"{type(e).__name__}: {e}"}
+        if ruta == "/metricas":
+            return 200, {**self.metricas.resumen(), "en_vuelo": len(self.en_vuelo),
+                         "cache": {m: c.estadisticas() for m, c in self.caches.items()}}
+        if ruta == "/salud":
+            return 200, {"ok": True, "version": MODEL_VERSION}
+        return 404, {"error": f"ruta desconocida: {ruta}"}
+
+    async def _atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        # HTTP/1.1 mínimo con keep-alive; cuerpo sólo por Content-Length
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, ruta, version = linea.decode("latin-1").split()
+                except ValueError:
+                    break
+                cabeceras = {}
+                while True:
+                    h = await lector.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    cabeceras[k.strip().lower()] = v.strip()
+                cuerpo = await lector.readexactly(int(cabeceras.get("content-length", 0)))
+                estado, datos = await self._despachar(metodo, ruta.split("?")[0], cuerpo)
+                seguir = (cabeceras.get("connection", "").lower() != "close"
+                          and version == "HTTP/1.1")
+                salida = json.dumps(datos, ensure_ascii=False).encode()
+                escritor.write(
+                    f"HTTP/1.1 {estado} {'OK' if estado == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(salida)}\r\n"
+                    f"Connection: {'keep-alive' if seguir else 'close'}\r\n\r\n".encode("latin-1") + salida)
+                await escritor.drain()
+                if not seguir:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            escritor.close()
+
+    async def iniciar(self, host: str = "127.0.0.1", puerto: int = PUERTO_DEFECTO) -> asyncio.AbstractServer:
+        # Arranca los workers antes del primer pedido para no cargarle el spawn
+        await asyncio.gather(*(asyncio.wrap_future(parallel.pool().submit(parallel.simular_lote_df, [Params()]))
+                               for _ in range(os.cpu_count() or 1)))
+        return await asyncio.start_server(self._atender, host, puerto)
+
+
+async def servir(host: str = "127.0.0.1", puerto: int = PUERTO_DEFECTO, **opciones):
+    servidor = await Servicio(**opciones).iniciar(host, puerto)
+    async with servidor:
+        await servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    # python -m model.server [--host 127.0.0.1] [--puerto 8150] [--ventana-ms 5]
+    import argparse
+    ap = argparse.ArgumentParser(prog="python -m model.server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--puerto", type=int, default=PUERTO_DEFECTO)
+    ap.add_argument("--ventana-ms", type=float, default=5.0)
+    ap.add_argument("--tam-lote", type=int, default=256)
+    ap.add_argument("--objetivo-p99-ms", type=float, default=250.0)
+    args = ap.parse_args()
+    asyncio.run(servir(args.host, args.puerto, ventana_ms=args.ventana_ms, tam_lote=args.tam_lote,
+                       objetivo_p99_ms=args.objetivo_p99_ms))
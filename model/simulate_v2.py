@@ -0,0 +1,12 @@
+import pandas as pd
+from typing import Any, Dict, Tuple
+
+from model.core_v2 import Params, simular_series
+from model.frames import armar_dataframe_v2 as armar_dataframe
+
+# API con DataFrames del modelo v2 (núcleo NumPy en model/core_v2.py)
+
+
+def simulate(par: Params) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    series, extras = simular_series(par)
+    return armar_dataframe(par, series), extras
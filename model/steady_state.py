@@ -0,0 +1,229 @@
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from model import dynamics, dynamics_v2
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+
+# Equilibrio de largo plazo: punto fijo x* = F(x*) del mapa anual determinístico
+# (v1 con bajas esperadas, v2 tal cual). La caja no entra en el estado porque
+# acumula resultados; en el equilibrio se informa el flujo anual.
+
+K_ESTACIONARIO = 10**9  # año genérico: k > 0, fuera de la ventana de obras
+
+
+@dataclass
+class Equilibrio:
+    modelo: str
+    convergido: bool
+    iteraciones: int
+    residuo: float
+    autovalor_dominante: complex
+    estable: bool
+    grados: np.ndarray
+    calidad: float
+    admitidos: float
+    resultado_operativo: float
+    flujos: Dict[str, float] = field(default_factory=dict)
+    estado: Optional[np.ndarray] = None
+
+
+def _anderson(F: Callable, x0: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+              tol: float, max_iter: int, m: int = 6) -> Tuple[np.ndarray, int, float, bool]:
+    # Aceleración de Anderson (tipo II) en coordenadas escaladas
+    escala = np.maximum(np.abs(x0), 1.0)
+    x = x0.copy()
+    Xh, Gh = [], []
+    res = np.inf
+    for it in range(max_iter):
+        g = (F(x[None])[0] - x) / escala
+        res_nuevo = float(np.max(np.abs(g)))
+        if res_nuevo < tol:
+            return x, it, res_nuevo, True
+        if res_nuevo > 10 * res:
+            Xh, Gh = [], []  # reinicio si la extrapolación empeoró el residuo
+        res = res_nuevo
+        Xh.append(x / escala)
+        Gh.append(g)
+        if len(Gh) > m + 1:
+            Xh.pop(0)
+            Gh.pop(0)
+        z = x / escala + g
+        if len(Gh) > 1:
+            dG = np.diff(np.array(Gh), axis=0)
+            dX = np.diff(np.array(Xh), axis=0)
+            gamma = np.linalg.lstsq(dG.T, g, rcond=None)[0]
+            z = z - (dX + dG).T @ gamma
+        x = np.clip(z * escala, lo, hi)
+    return x, max_iter, res, False
+
+
+def _jacobiano(F: Callable, x: np.ndarray) -> np.ndarray:
+    # Diferencias finitas hacia adelante, todas las columnas en una sola llamada
+    n = x.size
+    h = 1e-6 * np.maximum(np.abs(x), 1.0)
+    X = np.concatenate([x[None], x[None] + np.diag(h)], axis=0)
+    FX = F(X)
+    return ((FX[1:] - FX[0]) / h[:, None]).T
+
+
+def _newton(F: Callable, x0: np.ndarray, lo: np.ndarray, hi: np.ndarray,
+            tol: float, max_iter: int) -> Tuple[np.ndarray, int, float, bool]:
+    escala = np.maximum(np.abs(x0), 1.0)
+    x = x0.copy()
+    res = np.inf
+    for it in range(max_iter):
+        g = F(x[None])[0] - x
+        res = float(np.max(np.abs(g / escala)))
+        if res < tol:
+            return x, it, res, True
+        # Mínimos cuadrados: tolera direcciones neutras (J - I singular)
+        J = _jacobiano(F, x) - np.eye(x.size)
+        dx = np.linalg.lstsq(J, -g, rcond=None)[0]
+        # Paso amortiguado: se acepta el primero que reduce el residuo
+        for t in (1.0, 0.5, 0.25, 0.125):
+            xn = np.clip(x + t * dx, lo, hi)
+            if float(np.max(np.abs((F(xn[None])[0] - xn) / escala))) < res:
+                break
+        x = xn
+    return x, max_iter, res, False
+
+
+def _resolver(F, x0, lo, hi, metodo, tol, max_iter):
+    # Newton cae a Anderson si no converge (p. ej. al cruzar quiebres del mapa)
+    if metodo == "newton":
+        x, it, res, ok = _newton(F, x0, lo, hi, tol, min(max_iter, 50))
+        if ok:
+            return x, it, res, ok
+        x, it2, res, ok = _anderson(F, x, lo, hi, tol, max_iter)
+        return x, it + it2, res, ok
+    if metodo != "anderson":
+        raise ValueError(f"metodo desconocido: {metodo}")
+    return _anderson(F, x0, lo, hi, tol, max_iter)
+
+
+def _autovalor(F: Callable, x: np.ndarray, exogenas=()) -> complex:
+    # Autovalor dominante de la parte endógena del jacobiano del mapa
+    J = _jacobiano(F, x)
+    idx = [i for i in range(x.size) if i not in exogenas]
+    lam = np.linalg.eigvals(J[np.ix_(idx, idx)])
+    return complex(lam[np.argmax(np.abs(lam))])
+
+
+# ---------- v1 (bajas esperadas) ----------
+
+def _estado_v1(X: np.ndarray, Div: np.ndarray) -> dynamics.Estado:
+    n = X.shape[0]
+    return dynamics.Estado(
+        Gk=X[:, :12], Div=np.broadcast_to(Div, (n, 12)), Act=X[:, 12], Caja=np.zeros(n),
+        Deuda=X[:, 13], Demanda=X[:, 14], calidad_prev=X[:, 15])
+
+
+def _vector_v1(est: dynamics.Estado) -> np.ndarray:
+    return np.concatenate([est.Gk, [est.Act, est.Deuda, est.Demanda, est.calidad_prev]], axis=-1)
+
+
+def equilibrio_v1(par: Params, metodo: str = "newton", tol: float = 1e-10,
+                  max_iter: int = 500, x0: Optional[np.ndarray] = None) -> Equilibrio:
+    # Punto de partida: el estado al final del horizonte de par.years años
+    est = dynamics.estado_inicial(par)
+    for k in range(par.years):
+        est = dynamics.paso(est, par, k, par.years)["siguiente"]
+    Div = np.asarray(est.Div)
+    if x0 is None:
+        x0 = _vector_v1(est)
+
+    def F(X):
+        fl = dynamics.paso(_estado_v1(X, Div), par, K_ESTACIONARIO, K_ESTACIONARIO + 1)
+        sig = fl["siguiente"]
+        return np.column_stack([sig.Gk, sig.Act, sig.Deuda, sig.Demanda, sig.calidad_prev])
+
+    lo = np.zeros(16)
+    hi = np.full(16, np.inf)
+    hi[15] = 1.0
+    x, it, res, ok = _resolver(F, np.asarray(x0, dtype=float), lo, hi, metodo, tol, max_iter)
+    # La demanda es exógena en v1 (decae a tasa fija): no entra en la estabilidad
+    lam = _autovalor(F, x, exogenas=(14,))
+    fl = dynamics.paso(_estado_v1(x[None], Div), par, K_ESTACIONARIO, K_ESTACIONARIO + 1)
+    flujos = {nombre: float(fl[nombre][0]) for nombre in dynamics.SERIES_FLUJO}
+    return Equilibrio(
+        modelo="v1",
+        convergido=ok,
+        iteraciones=it,
+        residuo=res,
+        autovalor_dominante=lam,
+        estable=abs(lam) < 1.0,
+        grados=x[:12],
+        calidad=flujos["calidad"],
+        admitidos=flujos["admitidos"],
+        resultado_operativo=flujos["resultado_operativo"],
+        flujos=flujos,
+        estado=x,
+    )
+
+
+# ---------- v2 ----------
+
+def _estado_v2(X: np.ndarray, Div: np.ndarray) -> dynamics_v2.Estado:
+    n = X.shape[0]
+    return dynamics_v2.Estado(
+        G=X[:, :12], Div=np.broadcast_to(Div, (n, 12)), calidad_prev=X[:, 12],
+        Demanda_prev=X[:, 13], alumnos_prev=X[:, 14])
+
+
+def equilibrio_v2(par: ParamsV2, metodo: str = "newton", tol: float = 1e-10,
+                  max_iter: int = 500, x0: Optional[np.ndarray] = None) -> Equilibrio:
+    est = dynamics_v2.estado_inicial(par)
+    for k in range(par.anios):
+        est = dynamics_v2.paso(est, par, k, par.anios)["siguiente"]
+    Div = np.asarray(est.Div)
+    if x0 is None:
+        x0 = np.concatenate([est.G, [est.calidad_prev, est.Demanda_prev, est.alumnos_prev]])
+
+    def F(X):
+        sig = dynamics_v2.paso(_estado_v2(X, Div), par, K_ESTACIONARIO, K_ESTACIONARIO + 1)["siguiente"]
+        return np.column_stack([sig.G, sig.calidad_prev, sig.Demanda_prev, sig.alumnos_prev])
+
+    lo = np.zeros(15)
+    hi = np.full(15, np.inf)
+    hi[12] = 1.0
+    x0 = np.asarray(x0, dtype=float)
+
+    # La demanda de v2 integra 10*calidad - 0.05*alumnos. Primero se busca el
+    # límite con demanda infinita (saturación nula, hueco sin efecto); si en él
+    # esa deriva sigue positiva no existe punto fijo con demanda finita.
+    idx = [i for i in range(15) if i != 13]
+
+    def F_red(X):
+        return F(np.insert(X, 13, np.inf, axis=1))[:, idx]
+
+    xr, it, res, ok = _resolver(F_red, x0[idx], lo[idx], hi[idx], metodo, tol, max_iter)
+    demanda_infinita = bool(ok and 10 * xr[12] - 0.05 * xr[:12].sum() > 0)
+    if demanda_infinita:
+        x = np.insert(xr, 13, np.inf)
+        lam = _autovalor(F_red, xr)
+    else:
+        x, it2, res, ok = _resolver(F, x0, lo, hi, metodo, tol, max_iter)
+        it += it2
+        lam = _autovalor(F, x)
+    fl = dynamics_v2.paso(_estado_v2(x[None], Div), par, K_ESTACIONARIO, K_ESTACIONARIO + 1)
+    flujos: Dict[str, Any] = {nombre: float(fl[nombre][0]) for nombre in dynamics_v2.SERIES_FLUJO}
+    flujos["resultado"] = float(fl["resultado"][0])
+    flujos["demanda_infinita"] = demanda_infinita
+    # Si en el equilibrio se dispara una nueva aula, las divisiones siguen creciendo
+    construye = bool(fl["build"][0])
+    return Equilibrio(
+        modelo="v2",
+        convergido=ok and not construye,
+        iteraciones=it,
+        residuo=res,
+        autovalor_dominante=lam,
+        estable=abs(lam) < 1.0,
+        grados=x[:12],
+        calidad=flujos["calidad"],
+        admitidos=flujos["admitidos"],
+        resultado_operativo=flujos["resultado"],
+        flujos=flujos,
+        estado=x,
+    )
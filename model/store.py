@@ -0,0 +1,236 @@
+import json
+import operator
+import os
+import re
+import shutil
+import tempfile
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from model import batch
+from model.params_array import ParamsArray
+from model.precision import PoliticaTipos
+from model.version import MODEL_VERSION
+
+# Almacén columnar en disco para barridos grandes. Cada lote agregado es un
+# bloque (directorio) con un .npy por columna: parámetros (n,), series
+# (n, T+1, ...) y, por cada serie, sus reducciones por fila (min, max, final).
+# manifest.json lista los bloques con el rango [mín, máx] de cada columna
+# escalar; las consultas descartan los bloques cuyo rango no puede cumplir la
+# condición sin abrirlos, y del resto leen memory-mapped sólo las columnas
+# que necesitan.
+#
+# Se eligieron .npy en lugar de Parquet para no depender de pyarrow y poder
+# leer las series multidimensionales con mmap.
+
+MANIFEST = "manifest.json"
+REDUCCIONES = {
+    "min": lambda v: v.min(axis=1),
+    "max": lambda v: v.max(axis=1),
+    "final": lambda v: v[:, -1],
+}
+OPERADORES = {
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt,
+    "<=": operator.le, "==": operator.eq, "!=": operator.ne,
+}
+_CONDICION = re.compile(r"^\s*([\w:.]+)\s*(>=|<=|==|!=|>|<)\s*(\S+)\s*$")
+
+Condicion = Tuple[str, str, float]
+
+
+def nombre_bloque(k: int) -> str:
+    return f"bloque_{k:06d}"
+
+
+def parsear(texto: str) -> List[Condicion]:
+    # "min:Caja > 0 and final:calidad >= 0.7" -> [("min:Caja", ">", 0.0), ...]
+    condiciones = []
+    for parte in re.split(r"\s+and\s+", texto.strip()):
+        m = _CONDICION.match(parte)
+        if m is None:
+            raise ValueError(f"condición inválida: {parte!r}")
+        condiciones.append((m.group(1), m.group(2), float(m.group(3))))
+    return condiciones
+
+
+def _puede_cumplir(rango: Sequence[float], op: str, valor: float) -> bool:
+    # ¿Algún x en [lo, hi] cumple x op valor?
+    lo, hi = rango
+    if op in (">", ">="):
+        return OPERADORES[op](hi, valor)
+    if op in ("<", "<="):
+        return OPERADORES[op](lo, valor)
+    if op == "==":
+        return lo <= valor <= hi
+    return not lo == hi == valor
+
+
+def _escribir_json(path: str, datos: dict):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(datos, f, indent=1)
+    os.replace(tmp, path)
+
+
+class AlmacenResultados:
+    def __init__(self, directorio: str):
+        # Abre el almacén si existe; si no, se crea con el primer bloque
+        self.directorio = directorio
+        path = os.path.join(directorio, MANIFEST)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {"version": MODEL_VERSION, "clase": None, "params": [],
+                             "series": {}, "bloques": []}
+
+    # ---------- Escritura ----------
+
+    def _path_bloque(self, bloque: str) -> str:
+        return os.path.join(self.directorio, bloque)
+
+    def _esquema(self, pa: ParamsArray, series: Mapping[str, np.ndarray]):
+        clase = f"{pa.clase.__module__}.{pa.clase.__name__}"
+        esquema = {k: list(np.shape(v)[1:]) for k, v in series.items()}
+        if self.manifest["clase"] is None:
+            self.manifest.update(clase=clase, params=pa.nombres, series=esquema)
+            return
+        if clase != self.manifest["clase"] or esquema != self.manifest["series"]:
+            raise ValueError("el lote no coincide con el esquema del almacén "
+                             f"({self.manifest['clase']}, {sorted(self.manifest['series'])})")
+
+    def agregar(self, pa: ParamsArray, series: Mapping[str, np.ndarray],
+                bloque: Optional[str] = None) -> str:
+        # series: nombre -> (n, T+1, ...) como las devuelve batch.correr_lote.
+        # Un bloque con el mismo nombre se reemplaza (reintentos idempotentes).
+        n = len(pa)
+        if any(np.shape(v)[0] != n for v in series.values()):
+            raise ValueError("las series deben tener una fila por escenario")
+        self._esquema(pa, series)
+        os.makedirs(self.directorio, exist_ok=True)
+        if bloque is None:
+            k = len(self.manifest["bloques"])
+            while nombre_bloque(k) in self.bloques:
+                k += 1
+            bloque = nombre_bloque(k)
+        tmp = tempfile.mkdtemp(dir=self.directorio, prefix=".tmp_")
+        rangos = {}
+        try:
+            for nombre in pa.nombres:
+                col = np.ascontiguousarray(pa.columna(nombre))
+                np.save(os.path.join(tmp, f"p.{nombre}.npy"), col)
+                rangos[nombre] = [float(col.min()), float(col.max())] if n else [0.0, 0.0]
+            for nombre, v in series.items():
+                v = np.asarray(v)
+                np.save(os.path.join(tmp, f"s.{nombre}.npy"), v)
+                plano = v.reshape(n, v.shape[1], -1).sum(axis=-1) if v.ndim > 2 else v
+                for red, fn in REDUCCIONES.items():
+                    r = fn(plano)
+                    np.save(os.path.join(tmp, f"r.{red}.{nombre}.npy"), r)
+                    rangos[f"{red}:{nombre}"] = [float(r.min()), float(r.max())] if n else [0.0, 0.0]
+            destino = self._path_bloque(bloque)
+            if os.path.exists(destino):
+                shutil.rmtree(destino)
+            os.replace(tmp, destino)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        entrada = {"nombre": bloque, "filas": n, "rangos": rangos}
+        previos = self.bloques
+        if bloque in previos:
+            self.manifest["bloques"][previos.index(bloque)] = entrada
+        else:
+            self.manifest["bloques"].append(entrada)
+        _escribir_json(os.path.join(self.directorio, MANIFEST), self.manifest)
+        return bloque
+
+    def ordenar(self):
+        # Bloques por nombre (los que llegan fuera de orden quedan en su lugar)
+        self.manifest["bloques"].sort(key=lambda b: b["nombre"])
+        if os.path.isdir(self.directorio):
+            _escribir_json(os.path.join(self.directorio, MANIFEST), self.manifest)
+
+    # ---------- Lectura ----------
+
+    def __len__(self) -> int:
+        return sum(b["filas"] for b in self.manifest["bloques"])
+
+    @property
+    def bloques(self) -> List[str]:
+        return [b["nombre"] for b in self.manifest["bloques"]]
+
+    @property
+    def columnas(self) -> List[str]:
+        # Columnas escalares consultables: parámetros y reducciones red:serie
+        return self.manifest["params"] + [f"{r}:{s}" for s in self.manifest["series"] for r in REDUCCIONES]
+
+    def _archivo(self, nombre: str) -> str:
+        if nombre in self.manifest["params"]:
+            return f"p.{nombre}.npy"
+        if nombre in self.manifest["series"]:
+            return f"s.{nombre}.npy"
+        red, _, serie = nombre.partition(":")
+        if red in REDUCCIONES and serie in self.manifest["series"]:
+            return f"r.{red}.{serie}.npy"
+        raise KeyError(f"columna desconocida: {nombre!r}")
+
+    def leer(self, bloque: str, nombre: str) -> np.ndarray:
+        # Memory-mapped: sólo se leen del disco las páginas que se tocan
+        return np.load(os.path.join(self._path_bloque(bloque), self._archivo(nombre)), mmap_mode="r")
+
+    def iterar(self, columnas: Sequence[str],
+               condicion: Union[str, Sequence[Condicion], None] = None
+               ) -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+        # Por bloque: (filas globales que cumplen, columna -> valores de esas filas)
+        condiciones = parsear(condicion) if isinstance(condicion, str) else list(condicion or [])
+        for c, _, _ in condiciones:
+            self._archivo(c)
+        inicio = 0
+        for b in self.manifest["bloques"]:
+            n, nombre = b["filas"], b["nombre"]
+            ini, inicio = inicio, inicio + n
+            if not all(_puede_cumplir(b["rangos"][c], op, v) for c, op, v in condiciones):
+                continue
+            mascara = np.ones(n, dtype=bool)
+            for c, op, v in condiciones:
+                mascara &= OPERADORES[op](self.leer(nombre, c), v)
+            filas = np.flatnonzero(mascara)
+            if filas.size:
+                yield ini + filas, {c: np.asarray(self.leer(nombre, c)[filas]) for c in columnas}
+
+    def consultar(self, condicion: Union[str, Sequence[Condicion], None] = None,
+                  columnas: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        # Junta en memoria sólo las filas que cumplen; "fila" es el índice global
+        columnas = list(columnas) if columnas is not None else self.manifest["params"]
+        partes = list(self.iterar(columnas, condicion))
+        salida = {"fila": np.concatenate([f for f, _ in partes]) if partes else np.zeros(0, dtype=np.int64)}
+        for c in columnas:
+            salida[c] = (np.concatenate([d[c] for _, d in partes]) if partes
+                         else np.zeros((0,) + tuple(self.manifest["series"].get(c, []))))
+        return salida
+
+    def contar(self, condicion: Union[str, Sequence[Condicion], None] = None) -> int:
+        return sum(len(f) for f, _ in self.iterar([], condicion))
+
+    def a_dataframe(self, condicion: Union[str, Sequence[Condicion], None] = None,
+                    columnas: Optional[Sequence[str]] = None):
+        import pandas as pd
+        datos = self.consultar(condicion, columnas)
+        if any(np.ndim(v) > 1 for v in datos.values()):
+            raise ValueError("a_dataframe sólo admite columnas escalares (parámetros o red:serie)")
+        return pd.DataFrame(datos).set_index("fila")
+
+
+def barrer(pa: ParamsArray, almacen: AlmacenResultados, tam_bloque: int = 50000,
+           series: Optional[Sequence[str]] = None,
+           tipos: Optional[PoliticaTipos] = None) -> AlmacenResultados:
+    # Corre un ParamsArray por bloques con el motor por lotes y guarda cada
+    # bloque apenas termina (nunca hay más de un bloque de series en memoria).
+    # Con tipos las series se guardan reducidas (model/precision.py).
+    for i, lote in enumerate(pa.lotes(tam_bloque)):
+        s = batch.correr_lote(lote, tipos)
+        if series is not None:
+            s = {k: s[k] for k in series}
+        almacen.agregar(lote, s, bloque=nombre_bloque(i))
+    return almacen
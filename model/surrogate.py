@@ -0,0 +1,170 @@
+import json
+import numpy as np
+import pandas as pd
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Mapping, Optional, Sequence
+
+from model import batch
+from model.core import Params
+from model.params_array import ParamsArray
+
+# Emulador del modelo v1 (campo medio) sobre las variables de decisión de la
+# app: se muestrea el espacio con un hipercubo latino, se corre el lote con el
+# motor vectorizado y se ajusta una interpolación RBF cúbica con cola lineal
+# (sólo NumPy) que predice cada serie año a año en milisegundos.
+
+# Variables muestreadas y sus rangos (los mismos que los controles de la app)
+VARIABLES_DECISION = {
+    "nivel_articulacion": (0.0, 1.0),
+    "nivel_comunicacion": (0.0, 1.0),
+    "nivel_diferenciacion": (0.0, 1.0),
+    "cuota_mensual": (50000.0, 150000.0),
+    "prop_mkt": (0.0, 0.20),
+    "tasa_descenso_demanda": (0.0, 0.15),
+    "tasa_continuidad_jardin_primaria": (0.30, 1.0),
+    "politica_seleccion": (0.50, 1.0),
+}
+
+# Series emuladas (las que muestran las métricas y gráficos principales)
+SALIDAS = (
+    "alumnos", "calidad", "admitidos", "bajas_no_continuidad", "facturacion",
+    "resultado_operativo", "resultado_neto", "Caja",
+)
+
+
+def _serie(s: Dict[str, np.ndarray], nombre: str) -> np.ndarray:
+    return s["Gk"].sum(axis=-1) if nombre == "alumnos" else s[nombre]
+
+
+def hipercubo_latino(n: int, d: int, rng: np.random.Generator) -> np.ndarray:
+    # Un punto por estrato en cada dimensión, estratos permutados al azar
+    u = (np.arange(n)[:, None] + rng.random((n, d))) / n
+    return np.take_along_axis(u, rng.random((n, d)).argsort(axis=0), axis=0)
+
+
+def correr_muestras(base: Params, variables: Sequence[str], X: np.ndarray,
+                    salidas: Sequence[str] = SALIDAS) -> Dict[str, np.ndarray]:
+    # X en unidades físicas (M, d); devuelve serie -> (M, T+1)
+    lote = ParamsArray.desde_base(base, len(X), **{v: X[:, j] for j, v in enumerate(variables)})
+    series = batch.correr_lote(lote)
+    return {nombre: _serie(series, nombre) for nombre in salidas}
+
+
+def _rbf(r: np.ndarray) -> np.ndarray:
+    return r ** 3
+
+
+def _distancias(A: np.ndarray, B: np.ndarray) -> np.ndarray:
+    d2 = (A * A).sum(axis=1)[:, None] + (B * B).sum(axis=1)[None, :] - 2.0 * A @ B.T
+    return np.sqrt(np.maximum(d2, 0.0))
+
+
+def _polinomio(U: np.ndarray) -> np.ndarray:
+    return np.column_stack([np.ones(len(U)), U])
+
+
+@dataclass
+class Emulador:
+    variables: Sequence[str]
+    lo: np.ndarray
+    hi: np.ndarray
+    salidas: Sequence[str]
+    anios: int  # T+1 puntos por serie
+    centros: np.ndarray  # (n, d) en el cubo unitario
+    pesos: np.ndarray  # (n + d + 1, n_salidas * anios)
+    media: np.ndarray
+    escala: np.ndarray
+    base: Dict = field(default_factory=dict)
+    errores: Optional[pd.DataFrame] = None
+
+    def _unitario(self, X: np.ndarray) -> np.ndarray:
+        return (np.atleast_2d(np.asarray(X, dtype=float)) - self.lo) / (self.hi - self.lo)
+
+    def predecir_array(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        # X (M, d) en unidades físicas; serie -> (M, T+1)
+        U = self._unitario(X)
+        A = np.concatenate([_rbf(_distancias(U, self.centros)), _polinomio(U)], axis=1)
+        Y = (A @ self.pesos) * self.escala + self.media
+        Y = Y.reshape(len(U), len(self.salidas), self.anios)
+        return {nombre: Y[:, j] for j, nombre in enumerate(self.salidas)}
+
+    def predecir(self, valores: Mapping[str, float]) -> Dict[str, np.ndarray]:
+        # Un punto; las variables que falten toman el valor de la base
+        x = np.array([float(valores.get(v, self.base[v])) for v in self.variables])
+        return {k: v[0] for k, v in self.predecir_array(x[None]).items()}
+
+    def guardar(self, path: str):
+        np.savez_compressed(
+            path, lo=self.lo, hi=self.hi, centros=self.centros, pesos=self.pesos,
+            media=self.media, escala=self.escala, anios=self.anios,
+            meta=json.dumps({
+                "variables": list(self.variables),
+                "salidas": list(self.salidas),
+                "base": self.base,
+                "errores": None if self.errores is None else self.errores.to_dict(orient="list"),
+            }),
+        )
+
+    @classmethod
+    def cargar(cls, path: str) -> "Emulador":
+        with np.load(path) as z:
+            meta = json.loads(str(z["meta"]))
+            return cls(
+                variables=meta["variables"], lo=z["lo"], hi=z["hi"], salidas=meta["salidas"],
+                anios=int(z["anios"]), centros=z["centros"], pesos=z["pesos"],
+                media=z["media"], escala=z["escala"], base=meta["base"],
+                errores=None if meta["errores"] is None else pd.DataFrame(meta["errores"]),
+            )
+
+
+def ajustar(U: np.ndarray, Y: np.ndarray, suavizado: float = 1e-10):
+    # Interpolación RBF cúbica con cola lineal: [[Phi, P], [P', 0]] [w; c] = [Y; 0]
+    n, d = U.shape
+    P = _polinomio(U)
+    Phi = _rbf(_distancias(U, U)) + suavizado * np.eye(n)
+    M = np.block([[Phi, P], [P.T, np.zeros((d + 1, d + 1))]])
+    rhs = np.concatenate([Y, np.zeros((d + 1, Y.shape[1]))], axis=0)
+    return np.linalg.solve(M, rhs)
+
+
+def validar(emu: Emulador, X: np.ndarray, reales: Dict[str, np.ndarray]) -> pd.DataFrame:
+    pred = emu.predecir_array(X)
+    filas = []
+    for nombre in emu.salidas:
+        err = pred[nombre] - reales[nombre]
+        rango = float(np.ptp(reales[nombre])) or 1.0
+        filas.append({
+            "serie": nombre,
+            "rmse": float(np.sqrt(np.mean(err ** 2))),
+            "error_abs_max": float(np.abs(err).max()),
+            "rmse_rel_rango": float(np.sqrt(np.mean(err ** 2)) / rango),
+            "error_max_rel_rango": float(np.abs(err).max() / rango),
+        })
+    return pd.DataFrame(filas)
+
+
+def entrenar(base: Optional[Params] = None, variables: Optional[Mapping[str, tuple]] = None,
+             salidas: Sequence[str] = SALIDAS, n_muestras: int = 1500, n_validacion: int = 300,
+             seed: int = 0) -> Emulador:
+    base = base if base is not None else Params()
+    variables = dict(variables if variables is not None else VARIABLES_DECISION)
+    nombres = list(variables)
+    lo = np.array([variables[v][0] for v in nombres], dtype=float)
+    hi = np.array([variables[v][1] for v in nombres], dtype=float)
+    rng = np.random.default_rng(seed)
+
+    U = hipercubo_latino(n_muestras, len(nombres), rng)
+    reales = correr_muestras(base, nombres, lo + U * (hi - lo), salidas)
+    Y = np.concatenate([reales[s] for s in salidas], axis=1)
+    media, escala = Y.mean(axis=0), Y.std(axis=0)
+    escala = np.where(escala > 0, escala, 1.0)
+
+    emu = Emulador(
+        variables=nombres, lo=lo, hi=hi, salidas=list(salidas), anios=base.years + 1,
+        centros=U, pesos=ajustar(U, (Y - media) / escala), media=media, escala=escala,
+        base=asdict(base),
+    )
+    if n_validacion > 0:
+        Xv = lo + rng.random((n_validacion, len(nombres))) * (hi - lo)
+        emu.errores = validar(emu, Xv, correr_muestras(base, nombres, Xv, salidas))
+    return emu
@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from model import batch, parallel
+from model.params_array import ParamsArray
+from model.precision import PoliticaTipos, aplicar
+from model.store import AlmacenResultados, nombre_bloque
+
+# Barridos reanudables: el ParamsArray se corre por bloques y cada bloque
+# terminado queda en el almacén columnar (model/store.py), que hace de
+# registro de avance. barrido.json identifica el barrido (huella de los
+# parámetros, tamaño de bloque y motor); al relanzarlo sobre el mismo
+# directorio se saltean los bloques ya guardados. El avance se informa por
+# callback y la cancelación es cooperativa: se revisa entre bloques.
+
+DESCRIPTOR = "barrido.json"
+MOTORES = ("lote", "simulate")
+
+
+class BarridoCancelado(Exception):
+    pass
+
+
+@dataclass
+class Progreso:
+    hechos: int  # escenarios terminados (incluye los de corridas anteriores)
+    total: int
+    bloques_hechos: int
+    bloques_total: int
+    transcurrido_s: float
+    por_segundo: float  # escenarios por segundo en esta corrida
+    eta_s: float  # estimado; inf hasta terminar el primer bloque
+
+    @property
+    def fraccion(self) -> float:
+        return self.hechos / self.total if self.total else 1.0
+
+
+def _series_simulate(lote: ParamsArray) -> Dict[str, np.ndarray]:
+    # Motor "simulate": corrida estocástica completa por escenario en el pool
+    corridas = parallel.mapear(parallel.simular_arrays, lote.a_lista())
+    return {k: np.stack([s[k] for s, _ in corridas]) for k in corridas[0][0]}
+
+
+def _descriptor(pa: ParamsArray, tam_bloque: int, motor: str, series, tipos) -> dict:
+    return {"huella": pa.huella(), "n": len(pa), "tam_bloque": tam_bloque, "motor": motor,
+            "series": list(series) if series is not None else None,
+            "tipos": None if tipos is None else [tipos.personas, tipos.dinero, tipos.ratios]}
+
+
+def correr_barrido(pa: ParamsArray, directorio: str, tam_bloque: int = 10000, motor: str = "lote",
+                   series: Optional[Sequence[str]] = None, tipos: Optional[PoliticaTipos] = None,
+                   al_progreso: Optional[Callable[[Progreso], None]] = None,
+                   cancelar: Optional[threading.Event] = None) -> AlmacenResultados:
+    # motor "lote": motor vectorizado de campo medio; "simulate": simulate
+    # estocástico por escenario repartido en el pool de procesos.
+    # Si cancelar se activa, el bloque en curso termina, queda guardado y se
+    # lanza BarridoCancelado; la próxima llamada retoma desde ahí.
+    if motor not in MOTORES:
+        raise ValueError(f"motor desconocido: {motor!r} (opciones: {', '.join(MOTORES)})")
+    os.makedirs(directorio, exist_ok=True)
+    desc = _descriptor(pa, tam_bloque, motor, series, tipos)
+    path_desc = os.path.join(directorio, DESCRIPTOR)
+    if os.path.exists(path_desc):
+        with open(path_desc) as f:
+            previo = json.load(f)
+        if previo != desc:
+            raise ValueError(f"{directorio} tiene otro barrido (huella {previo.get('huella')}); "
+                             "usar otro directorio o borrarlo")
+    else:
+        with open(path_desc, "w") as f:
+            json.dump(desc, f, indent=1)
+
+    almacen = AlmacenResultados(directorio)
+    rangos = [(i, min(i + tam_bloque, len(pa))) for i in range(0, len(pa), tam_bloque)]
+    hechos_previos = set(almacen.bloques)
+    faltan = [k for k in range(len(rangos)) if nombre_bloque(k) not in hechos_previos]
+    hechos = len(pa) - sum(rangos[k][1] - rangos[k][0] for k in faltan)
+    bloques_hechos = len(rangos) - len(faltan)
+    t0 = time.perf_counter()
+    corridos = 0
+
+    def informar():
+        if al_progreso is None:
+            return
+        dt = time.perf_counter() - t0
+        ritmo = corridos / dt if dt > 0 and corridos else 0.0
+        al_progreso(Progreso(hechos, len(pa), bloques_hechos, len(rangos), dt, ritmo,
+                             (len(pa) - hechos) / ritmo if ritmo else (0.0 if hechos == len(pa) else float("inf"))))
+
+    informar()
+    for k in faltan:
+        if cancelar is not None and cancelar.is_set():
+            raise BarridoCancelado(f"cancelado con {hechos}/{len(pa)} escenarios guardados en {directorio}")
+        ini, fin = rangos[k]
+        lote = pa[ini:fin]
+        s = batch.correr_lote(lote) if motor == "lote" else _series_simulate(lote)
+        if series is not None:
+            s = {n: s[n] for n in series}
+        almacen.agregar(lote, aplicar(s, tipos), bloque=nombre_bloque(k))
+        hechos += fin - ini
+        corridos += fin - ini
+        bloques_hechos += 1
+        informar()
+    almacen.ordenar()
+    return almacen
@@ -0,0 +1,211 @@
+import json
+import os
+import tempfile
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model import dynamics
+from model.montecarlo import bajas_multinomiales
+from model.params_array import ParamsArray
+from model.precision import PoliticaTipos, convertir
+from model.version import MODEL_VERSION
+
+# Tensores de resultados en disco para barridos con réplicas Monte Carlo: cada
+# serie es un .npy memory-mapped con forma (escenarios, réplicas, T+1, ...)
+# (Gk queda (S, R, T+1, 12)). El motor escribe cada bloque de escenarios
+# directo en el archivo y el lector devuelve vistas perezosas; percentiles y
+# frente de Pareto recorren el archivo por bloques sin tenerlo entero en RAM.
+
+META = "meta.json"
+SERIES_DEFECTO = ("Gk", "Caja", "calidad", "resultado_neto")
+EXTRA = {"Gk": (dynamics.G,), "Div": (dynamics.G,)}
+
+
+def _escribir_meta(directorio: str, meta: dict):
+    fd, tmp = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp, os.path.join(directorio, META))
+
+
+def _dtypes(series: Sequence[str], tipos: Optional[PoliticaTipos]) -> dict:
+    # dtype de almacenamiento de cada serie (float64 sin política)
+    return {s: (tipos.tipo(s, np.dtype(float)) if tipos else np.dtype(float)) for s in series}
+
+
+def frente_pareto(objetivos: np.ndarray) -> np.ndarray:
+    # Índices de las filas no dominadas (todas las columnas se maximizan)
+    orden = np.argsort(-objetivos[:, 0], kind="stable")
+    frente: List[int] = []
+    for i in orden:
+        if frente:
+            F = objetivos[frente]
+            if ((F >= objetivos[i]).all(axis=1) & (F > objetivos[i]).any(axis=1)).any():
+                continue
+        frente.append(int(i))
+    return np.sort(np.asarray(frente, dtype=np.int64))
+
+
+class TensorResultados:
+    def __init__(self, directorio: str):
+        self.directorio = directorio
+        with open(os.path.join(directorio, META)) as f:
+            self.meta = json.load(f)
+
+    @classmethod
+    def crear(cls, directorio: str, escenarios: int, replicas: int, anios: int,
+              series: Sequence[str] = SERIES_DEFECTO,
+              tipos: Optional[PoliticaTipos] = None, barrido: Optional[dict] = None) -> "TensorResultados":
+        # Reserva los archivos (dispersos: el disco se ocupa a medida que se
+        # escribe); tipos fija el dtype de cada serie (float64 sin política).
+        # barrido: descriptor de quien llena el tensor, para poder reanudarlo
+        os.makedirs(directorio, exist_ok=True)
+        dtypes = _dtypes(series, tipos)
+        meta = {
+            "version": MODEL_VERSION, "escenarios": escenarios, "replicas": replicas, "anios": anios,
+            "series": {s: list(EXTRA.get(s, ())) for s in series},
+            "tipos": {s: t.str for s, t in dtypes.items()}, "completos": 0, "barrido": barrido,
+        }
+        for s in series:
+            np.lib.format.open_memmap(
+                os.path.join(directorio, f"{s}.npy"), mode="w+", dtype=dtypes[s],
+                shape=(escenarios, replicas, anios) + tuple(EXTRA.get(s, ())))
+        _escribir_meta(directorio, meta)
+        return cls(directorio)
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.meta["escenarios"], self.meta["replicas"], self.meta["anios"]
+
+    @property
+    def series(self) -> List[str]:
+        return list(self.meta["series"])
+
+    @property
+    def completos(self) -> int:
+        # Escenarios ya escritos (los bloques se llenan en orden)
+        return self.meta["completos"]
+
+    def marcar_completos(self, n: int):
+        self.meta["completos"] = n
+        _escribir_meta(self.directorio, self.meta)
+
+    def abrir(self, serie: str, modo: str = "r") -> np.memmap:
+        return np.load(os.path.join(self.directorio, f"{serie}.npy"), mmap_mode=modo)
+
+    def vista(self, serie: str, escenarios=slice(None), replicas=slice(None),
+              anios=slice(None)) -> np.ndarray:
+        # Vista perezosa: nada se lee hasta que se usan los valores
+        return self.abrir(serie)[escenarios, replicas, anios]
+
+    def bloques(self, serie: str, tam: int = 256, total_grados: bool = True
+                ) -> Iterator[Tuple[int, np.ndarray]]:
+        # (primer escenario, bloque en memoria (s, R, T+1[, ...])) sobre lo completo
+        m = self.abrir(serie)
+        for ini in range(0, self.completos, tam):
+            x = np.asarray(m[ini:min(ini + tam, self.completos)], dtype=float)
+            yield ini, (x.sum(axis=-1) if total_grados and x.ndim > 3 else x)
+
+    # ---------- Post-proceso por bloques ----------
+
+    def percentiles(self, serie: str, q: Sequence[float] = (10, 50, 90), tam: int = 256) -> np.ndarray:
+        # Percentiles entre réplicas: (S, T+1, len(q)); Gk se suma por grados
+        salida = np.full((self.completos, self.meta["anios"], len(q)), np.nan)
+        for ini, x in self.bloques(serie, tam):
+            salida[ini:ini + len(x)] = np.moveaxis(np.percentile(x, q, axis=1), 0, -1)
+        return salida
+
+    def media(self, serie: str, tam: int = 256) -> np.ndarray:
+        salida = np.full((self.completos, self.meta["anios"]), np.nan)
+        for ini, x in self.bloques(serie, tam):
+            salida[ini:ini + len(x)] = x.mean(axis=1)
+        return salida
+
+    def objetivo(self, serie: str, estadistico: str = "media", anio: int = -1, tam: int = 256) -> np.ndarray:
+        # Un valor por escenario: "media" o "pNN" entre réplicas del año dado
+        salida = np.empty(self.completos)
+        for ini, x in self.bloques(serie, tam):
+            v = x[:, :, anio]
+            salida[ini:ini + len(x)] = (v.mean(axis=1) if estadistico == "media"
+                                        else np.percentile(v, float(estadistico[1:]), axis=1))
+        return salida
+
+    def pareto(self, objetivos: Sequence[Tuple[str, str, str]], tam: int = 256
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        # objetivos: (serie, estadístico, "max"|"min"). Devuelve los índices de
+        # los escenarios no dominados y sus valores (n_frente, n_objetivos).
+        # El frente se mantiene incremental: cada bloque sólo se compara contra
+        # el frente acumulado, nunca contra todos los escenarios.
+        signos = np.array([1.0 if s == "max" else -1.0 for _, _, s in objetivos])
+        m = [self.abrir(serie) for serie, _, _ in objetivos]
+        indices = np.zeros(0, dtype=np.int64)
+        valores = np.zeros((0, len(objetivos)))
+        for ini in range(0, self.completos, tam):
+            fin = min(ini + tam, self.completos)
+            cols = []
+            for arr, (_, est, _) in zip(m, objetivos):
+                x = np.asarray(arr[ini:fin], dtype=float)
+                v = (x.sum(axis=-1) if x.ndim > 3 else x)[:, :, -1]
+                cols.append(v.mean(axis=1) if est == "media" else np.percentile(v, float(est[1:]), axis=1))
+            indices = np.concatenate([indices, np.arange(ini, fin)])
+            valores = np.concatenate([valores, np.column_stack(cols)])
+            frente = frente_pareto(valores * signos)
+            indices, valores = indices[frente], valores[frente]
+        return indices, valores
+
+
+def llenar(pa: ParamsArray, directorio: str, n_reps: int = 1, series: Sequence[str] = SERIES_DEFECTO,
+           tam_bloque: int = 64, seed: int = 0, mean_field: bool = False,
+           tipos: Optional[PoliticaTipos] = None, reanudar: bool = True) -> TensorResultados:
+    # Corre el modelo v1 para todos los escenarios de pa con n_reps réplicas
+    # (o campo medio con una réplica) escribiendo cada bloque en los
+    # memmaps. Cada bloque usa su propio generador (seed, primer escenario),
+    # así que las réplicas dependen de seed y de tam_bloque. Con reanudar se
+    # continúa un tensor a medio llenar. tipos: política de almacenamiento
+    # (model/precision.py); el cálculo sigue en float64.
+    if not pa.es_constante("years"):
+        raise ValueError("todos los escenarios deben tener el mismo years")
+    n_reps = 1 if mean_field else n_reps
+    T = int(pa.columna("years")[0])
+    existente = os.path.exists(os.path.join(directorio, META))
+    # Lo que determina el contenido: reanudar con otros parámetros, semilla,
+    # campo medio o bloques (las réplicas dependen de la semilla por bloque)
+    # dejaría un tensor mezclado
+    barrido = {"huella": pa.huella(), "seed": seed, "mean_field": mean_field, "tam_bloque": tam_bloque}
+    if reanudar and existente:
+        tensor = TensorResultados(directorio)
+        if tensor.shape != (len(pa), n_reps, T + 1) or tensor.series != list(series):
+            raise ValueError(f"el tensor existente en {directorio} tiene otra forma")
+        # Reanudar con otra política mezclaría bloques convertidos de distinta
+        # manera (o truncaría en silencio al escribir)
+        pedidos = {s: t.str for s, t in _dtypes(series, tipos).items()}
+        guardados = tensor.meta.get("tipos", {s: np.dtype(float).str for s in series})
+        if pedidos != guardados:
+            raise ValueError(f"el tensor existente en {directorio} usa otros tipos: "
+                             f"{guardados} (pedidos {pedidos})")
+        if tensor.meta.get("barrido") != barrido:
+            raise ValueError(f"el tensor existente en {directorio} tiene otro barrido: "
+                             f"{tensor.meta.get('barrido')} (pedido {barrido})")
+    else:
+        tensor = TensorResultados.crear(directorio, len(pa), n_reps, T + 1, series, tipos, barrido)
+    salida = {s: tensor.abrir(s, "r+") for s in series}
+    for ini in range(tensor.completos, len(pa), tam_bloque):
+        fin = min(ini + tam_bloque, len(pa))
+        ns = pa[ini:fin].espacio_nombres()
+        for k, v in vars(ns).items():
+            if np.ndim(v) == 1:
+                setattr(ns, k, v[:, None])  # (s, 1) contra el eje de réplicas
+        ns.years = T
+        sorteo = None if mean_field else bajas_multinomiales(np.random.default_rng([seed, ini]))
+        # Las series en float64 se escriben directo en vistas (T+1, s, R, ...)
+        # del memmap; las reducidas se convierten al final del bloque
+        destino = {s: np.moveaxis(m[ini:fin], 2, 0) for s, m in salida.items() if m.dtype == np.float64}
+        res = dynamics.correr(ns, sorteo, shape=(fin - ini, n_reps), destino=destino)
+        for s, m in salida.items():
+            if s not in destino:
+                m[ini:fin] = np.moveaxis(convertir(s, res[s], tipos), 0, 2)
+        for m in salida.values():
+            m.flush()
+        tensor.marcar_completos(fin)
+    return tensor
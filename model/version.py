@@ -0,0 +1,21 @@
+import hashlib
+import os
+
+# Versión del modelo: hash del código fuente de las ecuaciones. Cualquier
+# resultado guardado (caché, artefactos precalculados) se asocia a esta versión
+# y deja de usarse cuando cambia el modelo.
+
+FUENTES = ("core.py", "core_v2.py", "dynamics.py", "dynamics_v2.py", "frames.py")
+
+
+def _hash_fuentes() -> str:
+    h = hashlib.sha256()
+    carpeta = os.path.dirname(os.path.abspath(__file__))
+    for nombre in FUENTES:
+        with open(os.path.join(carpeta, nombre), "rb") as f:
+            h.update(nombre.encode())
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+MODEL_VERSION = _hash_fuentes()
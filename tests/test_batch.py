@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import batch, dynamics, dynamics_v2
+from model.params_array import ParamsArray
+from model.simulate import Params, simulate
+from model.simulate_v2 import Params as ParamsV2, simulate as simulate_v2
+
+LOTE_V1 = [Params(years=12, cuota_mensual=c, prop_mkt=m)
+           for c, m in [(70000.0, 0.05), (90000.0, 0.10), (120000.0, 0.0)]]
+LOTE_V2 = [ParamsV2(anios=12, cuota_mensual=c) for c in (40.0, 50.0, 65.0)]
+
+
+@pytest.mark.parametrize("lote, modulo", [(LOTE_V1, dynamics), (LOTE_V2, dynamics_v2)])
+def test_lote_igual_a_escalar(lote, modulo):
+    series = batch.correr_lote(lote)
+    for i, par in enumerate(lote):
+        for nombre, v in modulo.correr(par).items():
+            np.testing.assert_allclose(np.asarray(series[nombre][i], dtype=float), np.asarray(v, dtype=float),
+                                       rtol=1e-12, atol=1e-9, err_msg=nombre)
+
+
+def test_simulate_batch_igual_a_simulate():
+    for (df, meta), par in zip(batch.simulate_batch(LOTE_V1), LOTE_V1):
+        pd.testing.assert_frame_equal(df, simulate(par, mean_field=True)[0])
+        assert meta["mean_field"]
+    for (df, _), par in zip(batch.simulate_batch(LOTE_V2), LOTE_V2):
+        pd.testing.assert_frame_equal(df, simulate_v2(par)[0])
+
+
+def test_params_array_igual_a_lista():
+    de_lista = batch.correr_lote(LOTE_V1)
+    de_array = batch.correr_lote(ParamsArray.desde_params(LOTE_V1))
+    for nombre in de_lista:
+        np.testing.assert_array_equal(de_lista[nombre], de_array[nombre])
+
+
+def test_orden_del_lote_no_cambia_resultados():
+    series = batch.correr_lote(LOTE_V1)
+    invertido = batch.correr_lote(LOTE_V1[::-1])
+    for nombre in series:
+        np.testing.assert_array_equal(series[nombre], invertido[nombre][::-1])
+
+
+def test_horizonte_distinto_falla():
+    with pytest.raises(ValueError):
+        batch.correr_lote([Params(years=5), Params(years=6)])
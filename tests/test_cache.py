@@ -0,0 +1,67 @@
+import os
+from dataclasses import replace
+
+import pandas as pd
+
+from model.cache import CacheResultados, clave_params
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+from model.simulate import simulate
+
+
+def test_clave_distingue_clase_y_valores():
+    assert clave_params(Params()) == clave_params(Params())
+    assert clave_params(Params()) != clave_params(replace(Params(), cuota_mensual=90000.0))
+    assert clave_params(Params()) != clave_params(ParamsV2())
+
+
+def test_ida_y_vuelta_memoria_y_disco(tmp_path):
+    par = Params(years=5)
+    cache = CacheResultados(str(tmp_path))
+    df = cache.simular(par)
+    pd.testing.assert_frame_equal(df, simulate(par)[0])
+    assert cache.simular(par) is df
+    # Otro proceso (otra instancia) lo encuentra en disco, idéntico
+    otra = CacheResultados(str(tmp_path))
+    pd.testing.assert_frame_equal(otra.obtener(par), df)
+    assert otra.obtener(par) is otra.obtener(par)
+    e = cache.estadisticas(), otra.estadisticas()
+    assert (e[0]["fallos"], e[0]["aciertos_memoria"]) == (1, 1)
+    assert (e[1]["fallos"], e[1]["aciertos_disco"], e[1]["aciertos_memoria"]) == (0, 1, 2)
+
+
+def test_otra_version_no_usa_las_entradas_viejas(tmp_path):
+    par = Params(years=5)
+    CacheResultados(str(tmp_path), version="1.0").simular(par)
+    nueva = CacheResultados(str(tmp_path), version="1.1")
+    assert nueva.obtener(par) is None
+    nueva.simular(par)
+    assert sorted(os.listdir(tmp_path)) == ["1.0", "1.1"]
+
+
+def test_memoria_acotada_desaloja_la_menos_usada():
+    pars = [Params(years=5, cuota_mensual=80000.0 + i) for i in range(3)]
+    cache = CacheResultados(None)
+    dfs = cache.simular_varios(pars)
+    tam = cache.bytes // 3
+    chica = CacheResultados(None, max_bytes=2 * tam)
+    chica.guardar(pars[0], dfs[0])
+    chica.guardar(pars[1], dfs[1])
+    chica.obtener(pars[0])
+    chica.guardar(pars[2], dfs[2])
+    assert chica.obtener(pars[1]) is None
+    assert chica.obtener(pars[0]) is dfs[0] and chica.obtener(pars[2]) is dfs[2]
+    assert chica.bytes <= chica.max_bytes
+
+
+def test_archivo_danado_se_recalcula(tmp_path):
+    par = Params(years=5)
+    cache = CacheResultados(str(tmp_path))
+    df = cache.simular(par)
+    path = cache._path(clave_params(par))
+    with open(path, "wb") as f:
+        f.write(b"no es un npz")
+    otra = CacheResultados(str(tmp_path))
+    assert otra.obtener(par) is None
+    pd.testing.assert_frame_equal(otra.simular(par), df)
+    pd.testing.assert_frame_equal(CacheResultados(str(tmp_path)).obtener(par), df)
@@ -0,0 +1,54 @@
+from dataclasses import replace
+
+import numpy as np
+
+from model import batch, calibration
+from model.core import Params
+from model.params_array import ParamsArray
+
+PARAMETROS = ("tasa_continuidad_jardin_primaria", "tasa_bajas_imprevistas", "tasa_descenso_demanda")
+OBSERVADOS = ("continuidad", "alumnos", "admitidos", "bajas_totales", "Demanda")
+
+
+def _escuelas(S=6, seed=0):
+    rng = np.random.default_rng(seed)
+    verdad = np.column_stack([rng.uniform(0.5, 0.95, S), rng.uniform(0.0, 0.06, S), rng.uniform(0.0, 0.1, S)])
+    bases = [Params(g_inicial=int(rng.integers(20, 30)), demanda_potencial_inicial=int(rng.integers(300, 600)),
+                    years=7) for _ in range(S)]
+    s = batch.correr_lote(ParamsArray.desde_params(
+        [replace(b, **dict(zip(PARAMETROS, v))) for b, v in zip(bases, verdad)]))
+    obs = [calibration.Observaciones({n: calibration.observable(s, n)[i] for n in OBSERVADOS},
+                                     base=bases[i], nombre=f"esc{i}") for i in range(S)]
+    return verdad, obs
+
+
+def test_recupera_parametros_de_escuelas_sinteticas():
+    verdad, obs = _escuelas()
+    res = calibration.calibrar_lote(obs, PARAMETROS)
+    assert all(r.convergio and r.motivo == "convergio" for r in res)
+    np.testing.assert_allclose([r.valores for r in res], verdad, atol=1e-3)
+    assert all(r.sse < 1e-8 for r in res)
+
+
+def test_lote_igual_a_una_por_una():
+    _, obs = _escuelas(S=3, seed=1)
+    juntas = calibration.calibrar_lote(obs, PARAMETROS)
+    for o, r in zip(obs, juntas):
+        sola = calibration.calibrar(o, PARAMETROS)
+        np.testing.assert_allclose(sola.valores, r.valores, atol=1e-6)
+
+
+def test_sin_iteraciones_no_converge():
+    _, obs = _escuelas(S=2)
+    res = calibration.calibrar_lote(obs, PARAMETROS, max_iter=0)
+    assert [r.motivo for r in res] == ["max_iter", "max_iter"]
+    assert not any(r.convergio for r in res)
+
+
+def test_caso_san_gabriel_solo_continuidad():
+    r = calibration.calibrar_caso()
+    assert r.parametros == list(calibration.PARAMETROS_CASO)
+    assert r.convergio
+    # con una tasa constante el ajuste es la media de las continuidades observadas
+    assert abs(r.valores[0] - np.mean(calibration.CASO_SAN_GABRIEL["continuidad"])) < 1e-6
+    assert np.isfinite(r.error_estandar).all()
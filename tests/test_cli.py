@@ -0,0 +1,110 @@
+import json
+import zipfile
+
+import pandas as pd
+import pytest
+
+from model import __main__ as cli
+from model.scenarios import REGISTRO_DEFECTO, cargar_registro
+from model.store import AlmacenResultados
+
+GRILLA_YAML = """\
+modelo: v1
+base: {years: 4}
+ejes:
+  cuota_mensual: {desde: 80000, hasta: 100000, pasos: 3}
+  g_inicial: [20, 25]
+"""
+
+
+@pytest.fixture
+def grilla(tmp_path):
+    path = tmp_path / "grilla.yaml"
+    path.write_text(GRILLA_YAML)
+    return str(path)
+
+
+@pytest.fixture
+def tabla(tmp_path):
+    path = tmp_path / "escenarios.csv"
+    pd.DataFrame({"nombre": ["barato", "caro"], "years": [3, 3],
+                  "cuota_mensual": [70000.0, 110000.0]}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_run_registro(tmp_path):
+    salida = tmp_path / "series.csv"
+    assert cli.main(["run", REGISTRO_DEFECTO, "--motor", "lote", "--csv", str(salida)]) == 0
+    df = pd.read_csv(salida)
+    reg = cargar_registro(REGISTRO_DEFECTO)
+    assert list(df["Escenario"].unique()) == reg.nombres()
+    assert len(df) == sum(reg.params(n).years + 1 for n in reg.nombres())
+
+
+def test_run_csv_usa_la_columna_nombre(tabla, capsys):
+    assert cli.main(["run", tabla]) == 0
+    salida = capsys.readouterr().out
+    assert "barato" in salida and "caro" in salida
+
+
+def test_run_columna_desconocida_falla(tmp_path):
+    path = tmp_path / "malo.csv"
+    pd.DataFrame({"cuota_mesual": [70000.0]}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match="cuota_mesual"):
+        cli.main(["run", str(path)])
+
+
+def test_sweep_con_filtro_y_csv(grilla, tmp_path, capsys):
+    almacen, salida = tmp_path / "almacen", tmp_path / "finales.csv"
+    assert cli.main(["sweep", grilla, "--almacen", str(almacen), "--tam-bloque", "4", "--silencioso",
+                     "--series", "Caja", "calidad", "--filtro", "final:Caja > 0", "--csv", str(salida)]) == 0
+    alm = AlmacenResultados(str(almacen))
+    assert len(alm) == 6 and len(alm.bloques) == 2
+    df = pd.read_csv(salida)
+    assert len(df) == alm.contar("final:Caja > 0")
+    assert {"cuota_mensual", "g_inicial", "final:Caja", "final:calidad"} <= set(df.columns)
+    # Relanzado sobre el mismo almacén no recalcula y sólo informa
+    assert cli.main(["sweep", grilla, "--almacen", str(almacen), "--tam-bloque", "4", "--silencioso",
+                     "--series", "Caja", "calidad", "--filtro", "final:Caja > 0"]) == 0
+    assert "de 6 escenarios cumplen" in capsys.readouterr().out
+
+
+def test_mc(tabla, tmp_path):
+    salida = tmp_path / "mc.csv"
+    assert cli.main(["mc", tabla, "--replicas", "20", "--seed", "1", "--series", "alumnos", "Caja",
+                     "--csv", str(salida)]) == 0
+    df = pd.read_csv(salida)
+    assert set(df["Escenario"]) == {"barato", "caro"} and set(df["Serie"]) == {"alumnos", "Caja"}
+    assert len(df) == 2 * 2 * 4
+    assert (df["p10"] <= df["p50"]).all() and (df["p50"] <= df["p90"]).all()
+    assert cli.main(["mc", tabla, "--replicas", "5", "--tensor", str(tmp_path / "tensor")]) == 0
+    assert json.loads((tmp_path / "tensor" / "meta.json").read_text())["completos"] == 2
+
+
+def test_export_zip(tabla, grilla, tmp_path):
+    salida = tmp_path / "salida.zip"
+    assert cli.main(["export", tabla, str(salida), "--silencioso"]) == 0
+    with zipfile.ZipFile(salida) as z:
+        assert sorted(z.namelist()) == ["KPIs.csv", "Parametros.csv", "Series.csv"]
+        kpis = pd.read_csv(z.open("KPIs.csv"))
+    assert len(kpis) == 2
+    # Desde el directorio de un almacén, con filtro
+    almacen = tmp_path / "almacen"
+    cli.main(["sweep", grilla, "--almacen", str(almacen), "--silencioso"])
+    assert cli.main(["export", str(almacen), str(salida), "--filtro", "g_inicial == 25", "--silencioso"]) == 0
+    with zipfile.ZipFile(salida) as z:
+        assert len(pd.read_csv(z.open("Parametros.csv"))) == 3
+
+
+def test_jsonl_devuelve_1_con_errores(tmp_path):
+    entrada, salida = tmp_path / "pedidos.jsonl", tmp_path / "respuestas.jsonl"
+    entrada.write_text(json.dumps({"id": 1, "params": {"years": 3}}) + "\n" + json.dumps({"id": 2, "modelo": "v9"}))
+    assert cli.main(["jsonl", str(entrada), "-o", str(salida)]) == 1
+    assert len(salida.read_text().splitlines()) == 2
+
+
+def test_bench(capsys):
+    assert cli.main(["bench", "-n", "3", "--fast-forward", "20"]) == 0
+    salida = capsys.readouterr().out
+    for motor in ("escalar", "lote", "paralelo", "ff estable", "ff base"):
+        assert motor in salida
@@ -0,0 +1,72 @@
+import subprocess
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+from model import batch, cluster
+from model.core import Params
+from model.params_array import ParamsArray
+from model.store import AlmacenResultados, nombre_bloque
+
+CLAVE = b"prueba"
+
+
+def _pa(n=12, cuota=80000.0):
+    return ParamsArray.desde_base(Params(years=4), n, cuota_mensual=np.linspace(cuota, cuota + 30000, n))
+
+
+def _coordinador(pa, directorio, **kw):
+    return cluster.Coordinador(pa, AlmacenResultados(str(directorio)), tam_unidad=4,
+                               direccion=("127.0.0.1", 0), clave=CLAVE, series=["Caja"], **kw)
+
+
+def test_sin_clave_no_arranca(tmp_path, monkeypatch):
+    monkeypatch.delenv("SCHOOL_SIM_CLAVE", raising=False)
+    with pytest.raises(ValueError, match="clave"):
+        cluster.Coordinador(_pa(), AlmacenResultados(str(tmp_path)), direccion=("127.0.0.1", 0))
+    with pytest.raises(ValueError, match="clave"):
+        cluster.trabajar(("127.0.0.1", 1))
+
+
+def test_worker_caido_reencola_su_unidad(tmp_path):
+    pa = _pa()
+    coord = _coordinador(pa, tmp_path)
+    host, puerto = coord.direccion
+    hilo = threading.Thread(target=coord.correr, daemon=True)
+    hilo.start()
+    # Un worker que toma una unidad y muere sin devolverla
+    codigo = (
+        "import sys, time\n"
+        "from multiprocessing.connection import Client\n"
+        f"conn = Client(({host!r}, {puerto}), authkey={CLAVE!r})\n"
+        "conn.send(('pedir', 'caido')); conn.recv()\n"
+        "print('tomada', flush=True); time.sleep(120)\n"
+    )
+    caido = subprocess.Popen([sys.executable, "-c", codigo], stdout=subprocess.PIPE, text=True)
+    try:
+        assert caido.stdout.readline().strip() == "tomada"
+    finally:
+        caido.kill()
+        caido.wait()
+    hechas = cluster.trabajar((host, puerto), clave=CLAVE)
+    hilo.join(timeout=60)
+    assert not hilo.is_alive()
+    assert coord.reencoladas == 1
+    assert hechas == len(coord.unidades)
+    esperado = batch.correr_lote(pa)["Caja"]
+    for k, (ini, fin) in enumerate(coord.unidades):
+        np.testing.assert_array_equal(coord.almacen.leer(nombre_bloque(k), "Caja"), esperado[ini:fin])
+
+
+def test_reanudar_con_otros_parametros_falla(tmp_path):
+    coord = _coordinador(_pa(), tmp_path)
+    coord._listener.close()
+    with pytest.raises(ValueError, match="otro barrido"):
+        _coordinador(_pa(cuota=90000.0), tmp_path)
+    with pytest.raises(ValueError, match="otro barrido"):
+        cluster.Coordinador(_pa(), AlmacenResultados(str(tmp_path)), tam_unidad=6,
+                            direccion=("127.0.0.1", 0), clave=CLAVE, series=["Caja"])
+    # El mismo barrido sí se retoma
+    _coordinador(_pa(), tmp_path)._listener.close()
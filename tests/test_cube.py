@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import batch, scenarios
+from model.core import Params
+from model.cube import CuboResultados
+from model.params_array import ParamsArray
+from model.simulate import simulate
+
+
+@pytest.fixture
+def cubo():
+    datos = np.arange(3 * 4 * 2, dtype=float).reshape(3, 4, 2) + 1
+    return CuboResultados(["a", "b", "c"], [2024, 2025, 2026, 2027], ["x", "y"], datos)
+
+
+def test_forma_distinta_a_las_etiquetas_falla():
+    with pytest.raises(ValueError, match="no coincide"):
+        CuboResultados(["a"], [0, 1], ["x"], np.zeros((1, 3, 1)))
+
+
+def test_seleccion(cubo):
+    sub = cubo.sel(escenarios=["c", "a"], metricas="y")
+    assert sub.shape == (2, 4, 1) and sub.escenarios == ["c", "a"] and sub.metricas == ["y"]
+    np.testing.assert_array_equal(sub.datos[:, :, 0], cubo.datos[[2, 0], :, 1])
+    np.testing.assert_array_equal(cubo.metrica("x"), cubo.datos[:, :, 0])
+    np.testing.assert_array_equal(cubo.final("y"), cubo.datos[:, -1, 1])
+    np.testing.assert_array_equal(cubo.total("x"), cubo.datos[:, :, 0].sum(axis=1))
+    with pytest.raises(KeyError):
+        cubo.sel(escenarios="z")
+
+
+def test_transformaciones(cubo):
+    np.testing.assert_array_equal(cubo.acumulado("x").metrica("x"), np.cumsum(cubo.metrica("x"), axis=1))
+    np.testing.assert_allclose(cubo.relativo("a").datos, cubo.datos / cubo.datos[:1] - 1)
+    np.testing.assert_array_equal(cubo.relativo("b", "diferencia").datos, cubo.datos - cubo.datos[1:2])
+    cero = CuboResultados(["a", "b"], [0], ["x"], np.array([[[0.0]], [[2.0]]]))
+    assert np.isnan(cero.relativo("a").datos).all()
+    with pytest.raises(ValueError, match="modo"):
+        cubo.relativo("a", "log")
+
+
+def test_formato_largo(cubo):
+    ancho = cubo.largo()
+    assert list(ancho.columns) == ["Año", "x", "y", "Escenario"] and len(ancho) == 12
+    fila = ancho[(ancho["Escenario"] == "b") & (ancho["Año"] == 2026)].iloc[0]
+    assert (fila["x"], fila["y"]) == tuple(cubo.datos[1, 2])
+    apilado = cubo.largo(metricas=["y"], apilar=True)
+    assert list(apilado.columns) == ["Año", "Escenario", "Metrica", "Valor"] and len(apilado) == 12
+    np.testing.assert_array_equal(apilado["Valor"], cubo.datos[:, :, 1].reshape(-1))
+    resumen = cubo.resumen_final()
+    assert resumen["Escenario"].tolist() == ["a", "b", "c"]
+    np.testing.assert_array_equal(resumen[["x", "y"]].to_numpy(), cubo.datos[:, -1])
+
+
+def test_desde_dataframes_y_series_coinciden():
+    pars = [Params(years=5, cuota_mensual=c) for c in (80000.0, 95000.0)]
+    dfs = {str(i): simulate(p, mean_field=True)[0] for i, p in enumerate(pars)}
+    de_dfs = CuboResultados.desde_dataframes(dfs, metricas=["AlumnosTotales", "Caja"])
+    np.testing.assert_array_equal(de_dfs.anios, dfs["0"]["Año"])
+    np.testing.assert_array_equal(de_dfs.metrica("Caja")[1], dfs["1"]["Caja"])
+    s = batch.correr_lote(ParamsArray.desde_params(pars))
+    de_series = CuboResultados.desde_series(["0", "1"], {"Gk": s["Gk"], "Caja": s["Caja"]})
+    # Gk se suma por grados (AlumnosTotales sale redondeado en el DataFrame)
+    np.testing.assert_allclose(de_series.metrica("Gk"), de_dfs.metrica("AlumnosTotales"), atol=0.5)
+    np.testing.assert_allclose(de_series.metrica("Caja"), de_dfs.metrica("Caja"))
+    pd.testing.assert_frame_equal(de_dfs.largo()[["Año", "Escenario"]], de_series.largo()[["Año", "Escenario"]],
+                                  check_dtype=False)
+
+
+def test_desde_artefacto():
+    reg = scenarios.cargar_registro()
+    art = scenarios.precalcular(reg, en_paralelo=False)
+    cubo = CuboResultados.desde_artefacto(art, metricas=["AlumnosTotales", "Caja"])
+    assert cubo.escenarios == reg.nombres() and cubo.shape[2] == 2
+    for i, nombre in enumerate(reg.nombres()):
+        df = art.df(nombre)
+        np.testing.assert_array_equal(cubo.anios, df["Año"])
+        np.testing.assert_array_equal(cubo.metrica("Caja")[i], df["Caja"])
@@ -0,0 +1,18 @@
+import pandas as pd
+import pytest
+
+from model import export
+
+
+def test_continuidad_promedio_excluye_solo_el_anio_0():
+    series = pd.DataFrame({
+        "Escenario": ["a"] * 4 + ["b"] * 3,
+        "Año": [0, 1, 2, 3, 0, 1, 2],
+        "TasaContinuidad": [0.0, 0.9, 0.0, 0.6, 0.0, 0.8, 0.8],
+        "AlumnosTotales": [10, 11, 12, 13, 20, 21, 22],
+    })
+    kpis = export.calcular_kpis(series).set_index("Escenario")
+    # el 0 del año 2 de "a" es una caída real de la continuidad
+    assert kpis.loc["a", "ContinuidadPromedio"] == pytest.approx(0.5)
+    assert kpis.loc["b", "ContinuidadPromedio"] == pytest.approx(0.8)
+    assert kpis.loc["a", "AlumnosFinales"] == 13
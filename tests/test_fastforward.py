@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import dynamics, fastforward
+from model.simulate import Params, armar_dataframe
+
+
+@pytest.mark.parametrize("par", [
+    Params(),
+    Params(years=60),
+    Params(years=40, cuota_mensual=60000.0),
+    Params(years=30, prop_mkt=0.0),
+    Params(years=200),
+    Params(years=200, tasa_descenso_demanda=0.0),
+])
+def test_igual_al_avance_anio_a_anio(par):
+    series, stats = fastforward.correr_fast_forward(par)
+    referencia = dynamics.correr(par)
+    assert set(series) == set(referencia)
+    for nombre, v in referencia.items():
+        np.testing.assert_allclose(series[nombre], v, rtol=1e-8, atol=1e-6, err_msg=nombre)
+    # cada año se avanza paso a paso o se salta, nunca las dos cosas
+    assert stats["pasos"] + stats["anios_saltados"] == par.years + 1
+
+
+def test_horizonte_largo_con_calidad_saturada_salta_casi_todo():
+    # Demanda estable: la calidad queda en 1 y el mapa es afín todo el horizonte
+    _, stats = fastforward.correr_fast_forward(Params(years=200, tasa_descenso_demanda=0.0))
+    assert stats["pasos"] <= 10
+    assert stats["anios_saltados"] >= 190
+
+
+def test_calidad_interior_avanza_paso_a_paso():
+    # En declive la calidad deja de estar saturada y el mapa deja de ser afín
+    par = Params(years=200)
+    series, stats = fastforward.correr_fast_forward(par)
+    interior = (series["calidad"] > 0) & (series["calidad"] < 1)
+    assert interior[60:].all()
+    assert stats["pasos"] >= interior.sum()
+
+
+def test_dataframe_igual_al_avance_anio_a_anio():
+    par = Params(years=25)
+    df, meta = fastforward.simulate_fast_forward(par)
+    esperado = armar_dataframe(par, dynamics.correr(par))
+    pd.testing.assert_index_equal(df.columns, esperado.columns)
+    np.testing.assert_allclose(df.to_numpy(dtype=float), esperado.to_numpy(dtype=float), rtol=1e-8, atol=1e-6)
+    assert meta["fast_forward"]["pasos"] <= par.years + 1
@@ -0,0 +1,87 @@
+import io
+import json
+
+from model import jsonl
+
+
+def _correr(lineas, **kw):
+    salida = io.StringIO()
+    proc = jsonl.procesar(lineas, salida, **kw)
+    respuestas = [json.loads(l) for l in salida.getvalue().splitlines()]
+    return proc, respuestas
+
+
+def test_pedido_invalido_no_arrastra_al_lote():
+    lineas = [
+        json.dumps({"id": 1, "params": {"years": 5}}),
+        json.dumps({"id": 2, "params": {"years": 5, "cuota_mensual": "abc"}}),
+        json.dumps({"id": 3, "params": {"years": 5, "cuota_mensual": 95000}}),
+    ]
+    proc, respuestas = _correr(lineas)
+    por_id = {r["id"]: r for r in respuestas}
+    assert set(por_id) == {1, 2, 3}
+    assert "cuota_mensual" in por_id[2]["error"]
+    assert len(por_id[1]["salidas"]["alumnos"]) == 6
+    assert len(por_id[3]["salidas"]["alumnos"]) == 6
+    assert (proc.procesados, proc.errores) == (2, 1)
+
+
+def test_fallo_al_correr_se_aisla_por_pedido(monkeypatch):
+    # Falla al correr (no al leer) dentro de un grupo compartido: el lote se
+    # reintenta uno por uno y sólo el culpable recibe el error
+    original = jsonl.batch.correr_lote
+
+    def correr_lote(params):
+        if any(p.cuota_mensual == 66666 for p in params):
+            raise ValueError("pedido envenenado")
+        return original(params)
+
+    monkeypatch.setattr(jsonl.batch, "correr_lote", correr_lote)
+    lineas = [json.dumps({"id": i, "params": {"years": 4, "cuota_mensual": c}, "salidas": ["alumnos"]})
+              for i, c in (("a", 80000), ("b", 85000))]
+    lineas.insert(1, json.dumps({"id": "c", "params": {"years": 4, "cuota_mensual": 66666},
+                                 "salidas": ["alumnos"]}))
+    proc, respuestas = _correr(lineas)
+    por_id = {r["id"]: r for r in respuestas}
+    assert "salidas" in por_id["a"] and "salidas" in por_id["b"]
+    assert por_id["c"]["error"] == "ValueError: pedido envenenado"
+    assert (proc.procesados, proc.errores) == (2, 1)
+
+
+def test_salidas_y_horizonte_invalidos_son_errores_por_linea():
+    malos = [
+        {"salidas": [["alumnos"]]},
+        {"salidas": "Caja"},
+        {"salidas": ["no_existe"]},
+        {"modelo": "v2", "salidas": ["Gk"]},
+        {"params": {"years": 100000000}},
+        {"params": {"years": -1}},
+        {"modelo": "v2", "params": {"anios": 0}},
+        {"modelo": ["v1"]},
+    ]
+    lineas = [json.dumps({"id": i, **m}) for i, m in enumerate(malos)]
+    lineas.append(json.dumps({"id": "ok", "params": {"years": 3}, "salidas": ["Caja", "alumnos"]}))
+    proc, respuestas = _correr(lineas)
+    por_id = {r["id"]: r for r in respuestas}
+    assert all("error" in por_id[i] for i in range(len(malos)))
+    assert "horizonte" in por_id[4]["error"] and "horizonte" in por_id[5]["error"]
+    assert set(por_id["ok"]["salidas"]) == {"Caja", "alumnos"}
+    assert (proc.procesados, proc.errores) == (1, len(malos))
+
+
+def test_lineas_que_no_son_objetos():
+    lineas = ["[1, 2]", '"x"', "3", "{no es json", json.dumps({"id": 9, "params": {"years": 3}})]
+    proc, respuestas = _correr(lineas)
+    errores = [r for r in respuestas if "error" in r]
+    assert len(errores) == 4
+    assert all(r["id"] is None for r in errores)
+    assert errores[0]["error"] == "se esperaba un objeto JSON"
+    assert [r["id"] for r in respuestas if "salidas" in r] == [9]
+
+
+def test_lote_igual_a_pedidos_sueltos():
+    lineas = [json.dumps({"id": i, "params": {"years": 6, "cuota_mensual": 80000 + 5000 * i}})
+              for i in range(5)]
+    _, juntos = _correr(lineas, tam_lote=256)
+    _, sueltos = _correr(lineas, tam_lote=1)
+    assert sorted(juntos, key=lambda r: r["id"]) == sorted(sueltos, key=lambda r: r["id"])
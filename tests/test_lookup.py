@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from model import lookup, surrogate
+from model.core import Params
+
+BASE = Params(years=5)
+EJES = {
+    "nivel_comunicacion": [0.0, 0.5, 1.0],
+    "cuota_mensual": [60000.0, 90000.0, 120000.0],
+    "tasa_continuidad_jardin_primaria": [0.3, 0.8],
+}
+SALIDAS = ("alumnos", "Caja", "resultado_neto")
+
+
+@pytest.fixture(scope="module")
+def directorio(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("tabla"))
+
+
+@pytest.fixture(scope="module")
+def tabla(directorio):
+    return lookup.construir_tabla(directorio, BASE, EJES, SALIDAS, bloque=5)
+
+
+def _campo_medio(X):
+    return surrogate.correr_muestras(BASE, list(EJES), np.atleast_2d(X), SALIDAS)
+
+
+def test_nodos_iguales_al_campo_medio(tabla, directorio):
+    nodos = np.array(list(itertools.product(*EJES.values())))
+    res, reales = tabla.consultar_array(nodos), _campo_medio(nodos)
+    for s in SALIDAS:
+        # La tabla se guarda en float32
+        np.testing.assert_allclose(res[s], reales[s], rtol=1e-6, atol=1e-3, err_msg=s)
+    # Reabierta desde disco da lo mismo
+    otra = lookup.TablaDecision.abrir(directorio)
+    np.testing.assert_array_equal(otra.consultar_array(nodos)["Caja"], res["Caja"])
+
+
+def test_entre_nodos_acotado_por_los_vecinos(tabla):
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        x = np.array([rng.uniform(v[0], v[-1]) for v in EJES.values()])
+        celda = []
+        for v, xi in zip(EJES.values(), x):
+            i = min(np.searchsorted(v, xi, side="right") - 1, len(v) - 2)
+            celda.append((v[i], v[i + 1]))
+        vecinos = _campo_medio(np.array(list(itertools.product(*celda))))
+        res = tabla.consultar_array(x)
+        for s in SALIDAS:
+            lo, hi = vecinos[s].min(axis=0), vecinos[s].max(axis=0)
+            margen = 1e-6 * np.maximum(np.abs(hi), 1.0)
+            assert ((res[s][0] >= lo - margen) & (res[s][0] <= hi + margen)).all(), s
+
+
+def test_interpolacion_lineal_en_un_eje(tabla):
+    a = tabla.consultar({"nivel_comunicacion": 0.0, "cuota_mensual": 60000.0,
+                         "tasa_continuidad_jardin_primaria": 0.3})
+    b = tabla.consultar({"nivel_comunicacion": 0.5, "cuota_mensual": 60000.0,
+                         "tasa_continuidad_jardin_primaria": 0.3})
+    medio = tabla.consultar({"nivel_comunicacion": 0.125, "cuota_mensual": 60000.0,
+                             "tasa_continuidad_jardin_primaria": 0.3})
+    np.testing.assert_allclose(medio["Caja"], 0.75 * a["Caja"] + 0.25 * b["Caja"], rtol=1e-6)
+
+
+def test_fuera_de_la_grilla_satura_al_borde(tabla):
+    borde = tabla.consultar_array([[1.0, 120000.0, 0.8]])
+    fuera = tabla.consultar_array([[1.5, 200000.0, 0.95]])
+    for s in SALIDAS:
+        np.testing.assert_array_equal(fuera[s], borde[s])
+    # Las variables que faltan toman el valor de la base
+    np.testing.assert_allclose(
+        tabla.consultar({"nivel_comunicacion": 0.5})["Caja"],
+        tabla.consultar_array([[0.5, BASE.cuota_mensual, BASE.tasa_continuidad_jardin_primaria]])["Caja"][0])
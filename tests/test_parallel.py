@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from model import parallel
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+
+
+@pytest.mark.parametrize("params_list", [
+    [Params(years=6, cuota_mensual=80000 + 4000 * i) for i in range(5)],
+    [ParamsV2(anios=6, cuota_mensual=80000 + 4000 * i) for i in range(5)],
+])
+def test_memoria_compartida_igual_a_simular_df(params_list):
+    dfs = parallel.simular_concurrente(params_list)
+    for par, df in zip(params_list, dfs):
+        pd.testing.assert_frame_equal(df, parallel.simular_df(par))
+
+
+def test_columnas_sin_pandas():
+    codigo = ("import sys; from model import parallel; from model.core import Params; "
+              "parallel.simular_columnas(Params(years=3)); print('pandas' in sys.modules)")
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+    assert salida.stdout.strip() == "False"
+
+
+def test_workers_no_importan_el_main_del_padre(tmp_path):
+    # Como bajo Streamlit: __main__ es el script de la app, que no se puede
+    # volver a ejecutar en los workers
+    app = tmp_path / "app.py"
+    marca = tmp_path / "importado"
+    app.write_text(f"open({str(marca)!r}, 'w').close()\nraise RuntimeError('el worker ejecutó la app')\n")
+    codigo = (
+        "import sys, types\n"
+        f"principal = types.ModuleType('__main__'); principal.__file__ = {str(app)!r}\n"
+        "sys.modules['__main__'] = principal\n"
+        "from model import parallel\n"
+        "from model.core import Params\n"
+        "print(len(parallel.mapear(parallel.simular_arrays, [Params(years=3)] * 4)))\n"
+    )
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, timeout=300)
+    assert salida.returncode == 0, salida.stderr
+    assert salida.stdout.strip() == "4"
+    assert not marca.exists()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+from model.params_array import ParamsArray, params_validados
+
+
+def _pa(n=6):
+    return ParamsArray.desde_base(Params(years=5), n, cuota_mensual=np.linspace(80000, 100000, n),
+                                  g_inicial=np.arange(20, 20 + n))
+
+
+@pytest.mark.parametrize("columnas, mensaje", [
+    ({"cuota_mensual": ["a", "b"]}, "numéricos"),
+    ({"cuota_mensual": [1.0, np.nan]}, "no finitos"),
+    ({"cuota_mensual": [1.0, np.inf]}, "no finitos"),
+    ({"years": [3, 4.5]}, "enteros"),
+    ({"cuota_mensual": np.ones((2, 2))}, "escalar o una columna"),
+    ({"no_existe": 1.0}, "desconocidos"),
+    ({"cuota_mensual": [1.0, 2.0], "g_inicial": [1, 2, 3]}, "distinto largo"),
+])
+def test_columnas_invalidas(columnas, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        ParamsArray(Params, columnas)
+
+
+def test_params_validados():
+    par = params_validados(Params, {"years": 4.0, "cuota_mensual": 90000})
+    assert par == Params(years=4, cuota_mensual=90000.0)
+    assert isinstance(par.years, int)
+    with pytest.raises(ValueError, match="objeto"):
+        params_validados(Params, [1])
+
+
+def test_desde_params_vacio_falla():
+    with pytest.raises(ValueError, match="al menos un escenario"):
+        ParamsArray.desde_params([])
+    with pytest.raises(ValueError, match="misma clase"):
+        ParamsArray.desde_params([Params(), ParamsV2()])
+
+
+def test_constantes_no_ocupan_filas():
+    pa = _pa()
+    assert pa.variables == ["g_inicial", "cuota_mensual"]
+    assert pa.es_constante("years") and pa.columna("years").shape == (6,)
+    assert ParamsArray.desde_params([Params(years=3)] * 4).variables == []
+
+
+def test_indexado_y_cortes():
+    pa = _pa()
+    lista = pa.a_lista()
+    assert pa[2] == lista[2] and pa[-1] == lista[-1]
+    with pytest.raises(IndexError):
+        pa[6]
+    assert pa[1:4].a_lista() == lista[1:4]
+    mascara = pa.columna("g_inicial") % 2 == 0
+    assert pa[mascara].a_lista() == [p for p, m in zip(lista, mascara) if m]
+    assert pa[np.array([5, 0])].a_lista() == [lista[5], lista[0]]
+    assert [len(b) for b in pa.lotes(4)] == [4, 2]
+    # Un corte con un solo valor vuelve a guardar la columna como constante
+    assert pa[3:4].variables == []
+
+
+def test_concatenar():
+    a, b = _pa(4), ParamsArray.desde_params([Params(years=5, cuota_mensual=70000.0)] * 2)
+    juntos = ParamsArray.concatenar([a, b])
+    assert juntos.a_lista() == a.a_lista() + b.a_lista()
+    assert juntos.es_constante("years")
+    with pytest.raises(ValueError, match="misma clase"):
+        ParamsArray.concatenar([a, ParamsArray.desde_params([ParamsV2()])])
+
+
+def test_grilla_ultimo_eje_varia_mas_rapido():
+    pa = ParamsArray.grilla(Params(years=3), cuota_mensual=[80000.0, 90000.0], g_inicial=[20, 25, 30])
+    assert len(pa) == 6
+    np.testing.assert_array_equal(pa.columna("g_inicial"), [20, 25, 30, 20, 25, 30])
+    np.testing.assert_array_equal(pa.columna("cuota_mensual"), [80000.0] * 3 + [90000.0] * 3)
+    assert pa[4] == Params(years=3, cuota_mensual=90000.0, g_inicial=25)
+
+
+def test_csv_ida_y_vuelta(tmp_path):
+    pa = _pa().reemplazar(tasa_bajas_imprevistas=np.linspace(0.01, 0.07, 6) / 3)
+    path = str(tmp_path / "p.csv")
+    pa.guardar_csv(path)
+    leido = ParamsArray.leer_csv(path)
+    assert leido.a_lista() == pa.a_lista()
+    assert leido.huella() == pa.huella()
+    # Sólo las columnas variables, sobre una base
+    pa.guardar_csv(path, todas=False)
+    assert ParamsArray.leer_csv(path, base=Params(years=5)).a_lista() == pa.a_lista()
+
+
+def test_desde_dataframe_rechaza_columnas_desconocidas():
+    df = pd.DataFrame({"nombre": ["a", "b"], "cuota_mensual": [80000.0, 90000.0]})
+    assert ParamsArray.desde_dataframe(df).variables == ["cuota_mensual"]
+    with pytest.raises(ValueError, match="cuota_mesual"):
+        ParamsArray.desde_dataframe(df.rename(columns={"cuota_mensual": "cuota_mesual"}))
+    # Un campo de v1 no es parámetro de v2
+    with pytest.raises(ValueError, match="years"):
+        ParamsArray.desde_dataframe(pd.DataFrame({"years": [3]}), ParamsV2)
@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import scenarios
+from model.core import Params
+from model.simulate import simulate
+
+# Escenarios tal como los definía la app antes del registro (cargar_escenario
+# y la pestaña de comparación), por etiqueta
+APP_ORIGINAL = {
+    "Situación Actual": Params(
+        tasa_continuidad_jardin_primaria=0.56, nivel_articulacion=0.3, nivel_comunicacion=0.2,
+        nivel_diferenciacion=0.4, cuota_mensual=85000.0, prop_mkt=0.08),
+    "Escenario A\n(Comunicación)": Params(
+        tasa_continuidad_jardin_primaria=0.56, nivel_articulacion=0.85, nivel_comunicacion=0.80,
+        nivel_diferenciacion=0.45, cuota_mensual=87000.0, prop_mkt=0.10, inversion_calidad_por_alumno=10000.0),
+    "Escenario B\n(Bilingüe)": Params(
+        tasa_continuidad_jardin_primaria=0.56, nivel_articulacion=0.50, nivel_comunicacion=0.60,
+        nivel_diferenciacion=0.90, cuota_mensual=105000.0, prop_mkt=0.12, inversion_calidad_por_alumno=15000.0,
+        costo_docente_por_aula=1_500_000.0),
+    "Escenario C\n(Económico)": Params(
+        tasa_continuidad_jardin_primaria=0.56, nivel_articulacion=0.60, nivel_comunicacion=0.65,
+        nivel_diferenciacion=0.35, cuota_mensual=80000.0, prop_mkt=0.07, inversion_calidad_por_alumno=6000.0),
+    "Escenario D\n(Integral)": Params(
+        tasa_continuidad_jardin_primaria=0.56, nivel_articulacion=0.90, nivel_comunicacion=0.85,
+        nivel_diferenciacion=0.70, cuota_mensual=95000.0, prop_mkt=0.11, inversion_calidad_por_alumno=12000.0,
+        costo_docente_por_aula=1_350_000.0),
+}
+
+
+def test_registro_igual_a_la_app_original():
+    reg = scenarios.cargar_registro()
+    assert reg.defecto == "Situación Actual (2024)" == reg.nombres()[0]
+    etiquetas = {reg.escenarios[n].etiqueta: reg.params(n) for n in reg.nombres()}
+    assert etiquetas == APP_ORIGINAL
+    assert list(etiquetas) == list(APP_ORIGINAL)
+
+
+@pytest.mark.parametrize("cambio, mensaje", [
+    ({"params": {"no_existe": 1}}, "desconocidos"),
+    ({"nombre": "Situación Actual (2024)"}, "duplicado"),
+])
+def test_registro_invalido(tmp_path, cambio, mensaje):
+    with open(scenarios.REGISTRO_DEFECTO, encoding="utf-8") as f:
+        datos = json.load(f)
+    datos["escenarios"][1].update(cambio)
+    path = tmp_path / "r.json"
+    path.write_text(json.dumps(datos), encoding="utf-8")
+    with pytest.raises(ValueError, match=mensaje):
+        scenarios.cargar_registro(str(path))
+
+
+def test_artefacto_igual_a_simulate(tmp_path):
+    reg = scenarios.cargar_registro()
+    art = scenarios.artefacto(reg, str(tmp_path), en_paralelo=False)
+    for nombre in reg.nombres():
+        pd.testing.assert_frame_equal(art.df(nombre), simulate(reg.params(nombre))[0])
+    # Con el pool da lo mismo, y el guardado se vuelve a usar
+    np.testing.assert_array_equal(scenarios.precalcular(reg).datos, art.datos)
+    assert scenarios.artefacto(reg, str(tmp_path), recalcular=False) is not None
+
+
+def test_artefacto_vencido_se_recalcula(tmp_path):
+    reg = scenarios.cargar_registro()
+    scenarios.artefacto(reg, str(tmp_path), en_paralelo=False)
+    reg.escenarios[reg.defecto].params["cuota_mensual"] = 90000.0
+    assert scenarios.artefacto(reg, str(tmp_path), recalcular=False) is None
+    art = scenarios.artefacto(reg, str(tmp_path), en_paralelo=False)
+    assert art.vigente(reg)
+    pd.testing.assert_frame_equal(art.df(reg.defecto), simulate(reg.params(reg.defecto))[0])
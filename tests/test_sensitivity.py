@@ -0,0 +1,52 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from model import batch, sensitivity
+from model.simulate import Params
+from model.simulate_v2 import Params as ParamsV2
+
+# Fuera de los quiebres: con cuota == ref_precio la derivada es un
+# subgradiente y no coincide con la diferencia centrada
+PAR_V1 = Params(years=10, cuota_mensual=1.1 * Params().ref_precio)
+PAR_V2 = ParamsV2(anios=10, cuota_mensual=1.15 * ParamsV2().ref_precio)
+
+
+def _centrada(par, nombre, serie):
+    v = getattr(par, nombre)
+    h = 1e-6 * max(1.0, abs(v))
+    s = batch.correr_lote([replace(par, **{nombre: v + h}), replace(par, **{nombre: v - h})])
+    y = s["Gk"].sum(axis=-1) if serie == "alumnos" else s[serie]
+    return (y[0, -1] - y[1, -1]) / (2 * h)
+
+
+def _continuos(par):
+    return [n for n in sensitivity.parametros_derivables(par) if isinstance(getattr(par, n), float)]
+
+
+@pytest.mark.parametrize("par, series, sens", [
+    (PAR_V1, ("Caja", "alumnos"), sensitivity.sensibilidades_v1),
+    (PAR_V2, ("alumnos_totales", "calidad", "Demanda"), sensitivity.sensibilidades_v2),
+])
+def test_derivadas_igual_a_diferencias_finitas(par, series, sens):
+    resultado = sens(par)
+    for nombre in _continuos(par):
+        j = resultado.parametros.index(nombre)
+        for serie in series:
+            escala = max(1.0, abs(float(resultado.valores[serie][-1])))
+            assert resultado.gradiente(serie)[j] == pytest.approx(
+                _centrada(par, nombre, serie), rel=1e-4, abs=1e-6 * escala), (nombre, serie)
+
+
+def test_valores_iguales_al_lote():
+    resultado = sensitivity.sensibilidades_v1(PAR_V1, ["cuota_mensual", "prop_mkt"])
+    s = batch.correr_lote([PAR_V1])
+    np.testing.assert_allclose(resultado.valores["Caja"], s["Caja"][0], rtol=1e-12)
+    assert resultado.derivadas["Gk"].shape == s["Gk"][0].shape + (2,)
+
+
+def test_tabla_ordenada_por_elasticidad():
+    tabla = sensitivity.sensibilidades_v1(PAR_V1).tabla("Caja")
+    e = np.abs(np.nan_to_num(tabla["elasticidad"].to_numpy()))
+    assert (np.diff(e) <= 0).all()
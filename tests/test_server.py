@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from model import parallel
+from model.cache import CacheResultados
+from model.core import Params
+from model.server import Servicio
+
+
+@pytest.mark.parametrize("cuerpo", [
+    b"[1, 2]",
+    b'"x"',
+    b'{"params": {"cuota_mensual": "abc"}}',
+    b'{"params": {"years": 2.5}}',
+    b'{"params": {"no_existe": 1}}',
+    b'{"params": [1]}',
+    b'{"modelo": "v3"}',
+    b'{"modelo": ["v1"]}',
+    b'{"params": {"years": -1}}',
+    b'{"columnas": "Caja"}',
+    b'{"columnas": [["Caja"]]}',
+    b'{"columnas": ["no_existe"]}',
+])
+def test_pedidos_invalidos_son_400(cuerpo):
+    servicio = Servicio(cache_simulate=CacheResultados(None), cache_lote=CacheResultados(None))
+    estado, respuesta = asyncio.run(servicio._despachar("POST", "/simular", cuerpo))
+    assert estado == 400, respuesta
+    assert "error" in respuesta
+    json.dumps(respuesta)
+
+
+def test_coalescido_cache_y_micro_lote():
+    # 100 pedidos concurrentes de 10 escenarios: un cálculo por escenario, en
+    # un solo lote; el resto espera ese cálculo. Después, todo sale de la caché
+    servicio = Servicio(ventana_ms=200.0, cache_simulate=CacheResultados(None),
+                        cache_lote=CacheResultados(None))
+    pedidos = [{"params": {"years": 5, "cuota_mensual": 80000 + 1000 * (i % 10)}, "columnas": ["Caja"]}
+               for i in range(100)]
+
+    async def correr():
+        primera = await asyncio.gather(*(servicio.simular(p) for p in pedidos))
+        while servicio.en_vuelo:  # hasta que los resultados queden en la caché
+            await asyncio.sleep(0.01)
+        segunda = await asyncio.gather(*(servicio.simular(p) for p in pedidos[:10]))
+        return primera, segunda, await servicio._despachar("GET", "/metricas", b"")
+
+    primera, segunda, (estado, metricas) = asyncio.run(correr())
+    assert [r["origen"] for r in primera].count("calculo") == 10
+    assert all(r["origen"] in ("calculo", "coalescido") for r in primera)
+    assert all(r["origen"] == "cache" for r in segunda)
+    esperado = parallel.simular_lote_df([Params(years=5, cuota_mensual=80000 + 1000 * i) for i in range(10)])
+    for i, r in enumerate(primera):
+        np.testing.assert_allclose(r["columnas"]["Caja"], esperado[i % 10]["Caja"].to_numpy())
+    assert estado == 200
+    assert metricas["por_origen"] == {"cache": 10, "coalescido": 90, "calculo": 10}
+    assert (metricas["lotes"], metricas["escenarios_por_lote"]) == (1, 10.0)
+    assert metricas["pedidos"] == 110 and metricas["errores"] == 0
+    assert metricas["latencia_ms"]["muestras"] == 110
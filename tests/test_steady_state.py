@@ -0,0 +1,66 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from model import dynamics, dynamics_v2, steady_state
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+
+V2_DEMANDA_FINITA = ParamsV2(anios=30, trigger_auto_aula=False, divisiones_iniciales=2, cac_base=20.0)
+
+
+@pytest.mark.parametrize("par", [
+    Params(years=30),
+    Params(years=30, tasa_descenso_demanda=0.0),
+    Params(years=30, tasa_descenso_demanda=0.0, cuota_mensual=60000.0),
+])
+def test_v1_igual_a_corrida_larga(par):
+    eq = steady_state.equilibrio_v1(par)
+    assert eq.convergido and eq.estable
+    assert abs(eq.autovalor_dominante) < 1
+    largo = dynamics.correr(replace(par, years=3000))
+    np.testing.assert_allclose(eq.grados, largo["Gk"][-1], rtol=1e-6, atol=1e-6)
+    assert eq.calidad == pytest.approx(largo["calidad"][-1], abs=1e-9)
+    assert eq.resultado_operativo == pytest.approx(largo["resultado_operativo"][-1], rel=1e-6, abs=1e-3)
+
+
+def test_v2_demanda_finita_igual_a_corrida_larga():
+    eq = steady_state.equilibrio_v2(V2_DEMANDA_FINITA)
+    assert eq.convergido and eq.estable and not eq.flujos["demanda_infinita"]
+    assert abs(eq.autovalor_dominante) < 1
+    largo = dynamics_v2.correr(replace(V2_DEMANDA_FINITA, anios=5000))
+    np.testing.assert_allclose(eq.grados, largo["G"][-1], rtol=1e-9)
+    assert eq.calidad == pytest.approx(largo["calidad"][-1], abs=1e-9)
+    assert eq.estado[13] == pytest.approx(largo["Demanda"][-1], rel=1e-9)
+
+
+def test_v2_demanda_infinita_es_el_limite_de_la_corrida_larga():
+    # La demanda crece sin cota y la corrida se acerca al límite como 1/t
+    par = ParamsV2(anios=30)
+    eq = steady_state.equilibrio_v2(par)
+    assert eq.convergido and eq.estable and eq.flujos["demanda_infinita"]
+    assert np.isinf(eq.estado[13])
+    largo = dynamics_v2.correr(replace(par, anios=4000))
+    error = [np.abs(largo["G"][t] / eq.grados - 1).max() for t in (1999, 3999)]
+    assert error[1] < 2e-3
+    assert error[1] == pytest.approx(error[0] / 2, rel=0.05)
+    assert eq.calidad == pytest.approx(largo["calidad"][-1], abs=1e-3)
+
+
+@pytest.mark.parametrize("resolver, par", [
+    (steady_state.equilibrio_v1, Params(years=30, tasa_descenso_demanda=0.0)),
+    (steady_state.equilibrio_v2, V2_DEMANDA_FINITA),
+])
+def test_anderson_igual_a_newton(resolver, par):
+    newton = resolver(par, metodo="newton")
+    anderson = resolver(par, metodo="anderson")
+    assert anderson.convergido
+    np.testing.assert_allclose(anderson.grados, newton.grados, rtol=1e-7, atol=1e-7)
+
+
+def test_sin_iteraciones_no_converge():
+    eq = steady_state.equilibrio_v2(V2_DEMANDA_FINITA, max_iter=0)
+    assert not eq.convergido
+    with pytest.raises(ValueError, match="metodo"):
+        steady_state.equilibrio_v1(Params(years=3), metodo="biseccion")
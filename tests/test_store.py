@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from model import batch, store
+from model.core import Params
+from model.core_v2 import Params as ParamsV2
+from model.params_array import ParamsArray
+from model.store import AlmacenResultados, nombre_bloque
+
+
+def _pa():
+    return ParamsArray.grilla(Params(years=6), cuota_mensual=np.linspace(60000, 120000, 6),
+                              g_inicial=[18, 22, 26, 30])
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    return store.barrer(_pa(), AlmacenResultados(str(tmp_path)), tam_bloque=5, series=["Caja", "calidad", "Gk"])
+
+
+@pytest.mark.parametrize("rango, op, valor, esperado", [
+    ((1, 3), ">", 3, False), ((1, 3), ">", 2.9, True), ((1, 3), ">=", 3, True),
+    ((1, 3), "<", 1, False), ((1, 3), "<=", 1, True), ((1, 3), "<", 1.1, True),
+    ((1, 3), "==", 2, True), ((1, 3), "==", 3, True), ((1, 3), "==", 4, False), ((1, 3), "==", 0.5, False),
+    ((2, 2), "!=", 2, False), ((2, 2), "!=", 3, True), ((1, 3), "!=", 1, True), ((1, 3), "!=", 2, True),
+])
+def test_puede_cumplir(rango, op, valor, esperado):
+    assert store._puede_cumplir(rango, op, valor) is esperado
+    # Nunca descarta un bloque que tiene filas que cumplen
+    if not esperado:
+        assert not any(store.OPERADORES[op](x, valor) for x in np.linspace(*rango, 101))
+
+
+def test_parsear():
+    assert store.parsear("min:Caja > 0 and final:calidad>=0.7") == [("min:Caja", ">", 0.0),
+                                                                     ("final:calidad", ">=", 0.7)]
+    with pytest.raises(ValueError, match="inválida"):
+        store.parsear("Caja >> 0")
+
+
+@pytest.mark.parametrize("condicion", [
+    None,
+    "min:Caja > 0",
+    "final:calidad >= 0.9 and cuota_mensual <= 96000",
+    "g_inicial == 22",
+    "g_inicial != 22 and max:Gk < 400",
+    "cuota_mensual == 61000",
+])
+def test_consultar_igual_a_fuerza_bruta(almacen, condicion):
+    pa = _pa()
+    s = batch.correr_lote(pa)
+    columnas = {
+        "cuota_mensual": pa.columna("cuota_mensual"), "g_inicial": pa.columna("g_inicial"),
+        "min:Caja": s["Caja"].min(axis=1), "final:calidad": s["calidad"][:, -1],
+        "max:Gk": s["Gk"].sum(axis=-1).max(axis=1),
+    }
+    mascara = np.ones(len(pa), dtype=bool)
+    for c, op, v in store.parsear(condicion) if condicion else []:
+        mascara &= store.OPERADORES[op](columnas[c], v)
+    res = almacen.consultar(condicion, columnas=["cuota_mensual", "min:Caja", "Gk"])
+    np.testing.assert_array_equal(res["fila"], np.flatnonzero(mascara))
+    np.testing.assert_array_equal(res["cuota_mensual"], columnas["cuota_mensual"][mascara])
+    np.testing.assert_array_equal(res["min:Caja"], columnas["min:Caja"][mascara])
+    np.testing.assert_array_equal(res["Gk"], s["Gk"][mascara])
+    assert almacen.contar(condicion) == mascara.sum()
+
+
+def test_poda_no_abre_bloques_que_no_pueden_cumplir(almacen, monkeypatch):
+    leidos = []
+    leer = almacen.leer
+    monkeypatch.setattr(almacen, "leer", lambda b, c: leidos.append(b) or leer(b, c))
+    # La grilla varía g_inicial más rápido: la cuota más alta son las filas
+    # 20-23, todas en el último bloque de 5
+    res = almacen.consultar("cuota_mensual >= 120000", columnas=["g_inicial"])
+    assert set(leidos) == {nombre_bloque(4)}
+    np.testing.assert_array_equal(res["g_inicial"], [18, 22, 26, 30])
+    leidos.clear()
+    assert almacen.contar("g_inicial != 22 and cuota_mensual > 1e6") == 0
+    assert leidos == []
+
+
+def test_bloque_con_el_mismo_nombre_se_reemplaza(tmp_path):
+    alm = AlmacenResultados(str(tmp_path))
+    pa = _pa()
+    a, b = pa[:4], pa[4:8]
+    alm.agregar(a, batch.correr_lote(a), bloque="x")
+    alm.agregar(b, batch.correr_lote(b))
+    alm.agregar(b, batch.correr_lote(b), bloque="x")
+    assert alm.bloques == ["x", nombre_bloque(1)] and len(alm) == 8
+    reabierto = AlmacenResultados(str(tmp_path))
+    assert reabierto.bloques == alm.bloques
+    np.testing.assert_array_equal(reabierto.leer("x", "cuota_mensual"), b.columna("cuota_mensual"))
+    # Un nombre automático no pisa un bloque existente
+    alm.agregar(a, batch.correr_lote(a), bloque=nombre_bloque(2))
+    assert alm.agregar(a, batch.correr_lote(a)) == nombre_bloque(3)
+
+
+def test_esquema_distinto_falla(almacen):
+    pa = _pa()[:3]
+    s = batch.correr_lote(pa)
+    with pytest.raises(ValueError, match="esquema"):
+        almacen.agregar(pa, {"Caja": s["Caja"]})
+    with pytest.raises(ValueError, match="esquema"):
+        almacen.agregar(pa, {k: s[k] for k in ("Caja", "calidad", "Gk", "Deuda")})
+    with pytest.raises(ValueError, match="esquema"):
+        v2 = ParamsArray.desde_params([ParamsV2(anios=6)] * 3)
+        almacen.agregar(v2, {"Caja": s["Caja"], "calidad": s["calidad"], "Gk": s["Gk"]})
+    with pytest.raises(ValueError, match="una fila por escenario"):
+        almacen.agregar(pa, {k: s[k][:2] for k in ("Caja", "calidad", "Gk")})
+    with pytest.raises(KeyError, match="no_existe"):
+        almacen.consultar("min:no_existe > 0")
+    assert len(almacen) == len(_pa())
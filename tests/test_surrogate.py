@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from model import surrogate
+from model.core import Params
+
+VARIABLES = {"nivel_comunicacion": (0.0, 1.0), "cuota_mensual": (60000.0, 120000.0), "prop_mkt": (0.0, 0.2)}
+SALIDAS = ("alumnos", "calidad", "Caja")
+
+
+@pytest.fixture(scope="module")
+def emu():
+    return surrogate.entrenar(Params(years=6), VARIABLES, SALIDAS, n_muestras=300, n_validacion=200)
+
+
+def test_hipercubo_latino_un_punto_por_estrato():
+    U = surrogate.hipercubo_latino(50, 3, np.random.default_rng(0))
+    assert U.shape == (50, 3) and ((U >= 0) & (U < 1)).all()
+    for j in range(3):
+        np.testing.assert_array_equal(np.sort((U[:, j] * 50).astype(int)), np.arange(50))
+
+
+def test_reproduce_los_puntos_de_entrenamiento(emu):
+    X = emu.lo + emu.centros * (emu.hi - emu.lo)
+    reales = surrogate.correr_muestras(Params(years=6), emu.variables, X, SALIDAS)
+    pred = emu.predecir_array(X)
+    for s in SALIDAS:
+        escala = np.ptp(reales[s]) or 1.0
+        np.testing.assert_allclose(pred[s], reales[s], atol=1e-6 * escala, err_msg=s)
+
+
+def test_error_de_validacion_informado_es_creible(emu):
+    err = emu.errores.set_index("serie")
+    assert list(err.index) == list(SALIDAS)
+    assert np.isfinite(err.to_numpy()).all()
+    assert (err["rmse"] <= err["error_abs_max"]).all()
+    assert (err["rmse_rel_rango"] < 0.1).all()
+    # Sobre otros puntos fuera de la muestra el error es del mismo orden
+    rng = np.random.default_rng(99)
+    X = emu.lo + rng.random((200, len(emu.variables))) * (emu.hi - emu.lo)
+    otro = surrogate.validar(emu, X, surrogate.correr_muestras(Params(years=6), emu.variables, X, SALIDAS))
+    np.testing.assert_allclose(otro["rmse_rel_rango"], err["rmse_rel_rango"], rtol=1.0)
+
+
+def test_guardar_y_cargar(emu, tmp_path):
+    path = str(tmp_path / "emu.npz")
+    emu.guardar(path)
+    cargado = surrogate.Emulador.cargar(path)
+    punto = {"cuota_mensual": 95000.0, "prop_mkt": 0.1}
+    for s, v in emu.predecir(punto).items():
+        np.testing.assert_array_equal(cargado.predecir(punto)[s], v)
+    assert cargado.errores.equals(emu.errores)
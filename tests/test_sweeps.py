@@ -0,0 +1,84 @@
+import math
+import threading
+
+import numpy as np
+import pytest
+
+from model import sweeps
+from model.core import Params
+from model.params_array import ParamsArray
+from model.precision import COMPACTA
+from model.store import AlmacenResultados
+
+SERIES = ["Caja", "calidad", "Gk"]
+
+
+def _pa(n=11, cuota=70000.0):
+    return ParamsArray.desde_base(Params(years=5), n, cuota_mensual=np.linspace(cuota, cuota + 40000, n))
+
+
+def _iguales(a: AlmacenResultados, b: AlmacenResultados):
+    assert a.bloques == b.bloques
+    for bloque in a.bloques:
+        for col in ["cuota_mensual"] + SERIES + a.columnas:
+            np.testing.assert_array_equal(a.leer(bloque, col), b.leer(bloque, col))
+
+
+def test_cancelar_y_reanudar_igual_a_corrida_entera(tmp_path):
+    entero = sweeps.correr_barrido(_pa(), str(tmp_path / "a"), tam_bloque=3, series=SERIES)
+
+    cancelar = threading.Event()
+    avances = []
+
+    def al_progreso(p):
+        avances.append(p)
+        if p.bloques_hechos == 2:
+            cancelar.set()
+
+    with pytest.raises(sweeps.BarridoCancelado, match="6/11"):
+        sweeps.correr_barrido(_pa(), str(tmp_path / "b"), tam_bloque=3, series=SERIES,
+                              al_progreso=al_progreso, cancelar=cancelar)
+    assert len(AlmacenResultados(str(tmp_path / "b")).bloques) == 2
+
+    avances.clear()
+    reanudado = sweeps.correr_barrido(_pa(), str(tmp_path / "b"), tam_bloque=3, series=SERIES,
+                                      al_progreso=avances.append)
+    # Retoma desde lo guardado: sólo corre los dos bloques que faltaban
+    assert [(p.hechos, p.bloques_hechos) for p in avances] == [(6, 2), (9, 3), (11, 4)]
+    _iguales(reanudado, entero)
+
+
+def test_campos_de_progreso(tmp_path):
+    avances = []
+    sweeps.correr_barrido(_pa(), str(tmp_path), tam_bloque=4, al_progreso=avances.append)
+    primero, ultimo = avances[0], avances[-1]
+    assert (primero.hechos, primero.bloques_hechos, primero.total, primero.bloques_total) == (0, 0, 11, 3)
+    assert math.isinf(primero.eta_s) and primero.por_segundo == 0.0 and primero.fraccion == 0.0
+    assert [p.hechos for p in avances] == [0, 4, 8, 11]
+    assert (ultimo.bloques_hechos, ultimo.fraccion, ultimo.eta_s) == (3, 1.0, 0.0)
+    assert all(p.por_segundo > 0 and p.eta_s >= 0 for p in avances[1:])
+    assert [p.transcurrido_s for p in avances] == sorted(p.transcurrido_s for p in avances)
+    # Un barrido ya completo informa una sola vez, terminado
+    avances.clear()
+    sweeps.correr_barrido(_pa(), str(tmp_path), tam_bloque=4, al_progreso=avances.append)
+    assert [(p.hechos, p.eta_s) for p in avances] == [(11, 0.0)]
+
+
+@pytest.mark.parametrize("cambio", [
+    {"pa": _pa(cuota=75000.0)},
+    {"pa": _pa(n=12)},
+    {"tam_bloque": 4},
+    {"motor": "simulate"},
+    {"series": ["Caja"]},
+    {"tipos": COMPACTA},
+])
+def test_otro_barrido_en_el_mismo_directorio_falla(tmp_path, cambio):
+    kw = {"pa": _pa(), "tam_bloque": 3, "series": SERIES}
+    sweeps.correr_barrido(directorio=str(tmp_path), **kw)
+    with pytest.raises(ValueError, match="otro barrido"):
+        sweeps.correr_barrido(directorio=str(tmp_path), **{**kw, **cambio})
+
+
+def test_motor_desconocido(tmp_path):
+    with pytest.raises(ValueError, match="motor desconocido"):
+        sweeps.correr_barrido(_pa(), str(tmp_path), motor="gpu")
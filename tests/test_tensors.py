@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from model import tensors
+from model.core import Params
+from model.params_array import ParamsArray
+from model.precision import COMPACTA
+
+
+def _pa(n=6, cuota=80000.0):
+    return ParamsArray.desde_base(Params(years=4), n, cuota_mensual=np.linspace(cuota, cuota + 20000, n))
+
+
+def test_reanudar_completa_lo_que_falta(tmp_path):
+    pa = _pa()
+    entero = tensors.llenar(pa, str(tmp_path / "a"), n_reps=2, tam_bloque=2, tipos=COMPACTA)
+    cortado = tensors.llenar(pa, str(tmp_path / "b"), n_reps=2, tam_bloque=2, tipos=COMPACTA)
+    for s in cortado.series:  # simula un corte tras el primer bloque
+        m = cortado.abrir(s, "r+")
+        m[2:] = 0
+        m.flush()
+    cortado.marcar_completos(2)
+    reanudado = tensors.llenar(pa, str(tmp_path / "b"), n_reps=2, tam_bloque=2, tipos=COMPACTA)
+    assert reanudado.completos == entero.completos == len(pa)
+    for s in reanudado.series:
+        np.testing.assert_array_equal(reanudado.abrir(s), entero.abrir(s))
+
+
+def test_reanudar_con_otros_tipos_falla(tmp_path):
+    pa = _pa()
+    tensors.llenar(pa[:2], str(tmp_path), n_reps=1, mean_field=True)
+    with pytest.raises(ValueError, match="otros tipos"):
+        tensors.llenar(pa[:2], str(tmp_path), n_reps=1, mean_field=True, tipos=COMPACTA)
+    # Sin reanudar se recrea con la política nueva
+    t = tensors.llenar(pa[:2], str(tmp_path), mean_field=True, tipos=COMPACTA, reanudar=False)
+    assert t.abrir("Gk").dtype == np.dtype(COMPACTA.personas)
+
+
+@pytest.mark.parametrize("cambio", [
+    {"pa": _pa(cuota=90000.0)},
+    {"seed": 1},
+    {"tam_bloque": 3},
+])
+def test_reanudar_otro_barrido_falla(tmp_path, cambio):
+    kw = {"pa": _pa(), "n_reps": 2, "tam_bloque": 2, "seed": 0}
+    tensors.llenar(**kw, directorio=str(tmp_path))
+    with pytest.raises(ValueError, match="otro barrido"):
+        tensors.llenar(**{**kw, **cambio}, directorio=str(tmp_path))
+    # El mismo barrido sí se retoma (y no recalcula nada)
+    assert tensors.llenar(**kw, directorio=str(tmp_path)).completos == 6
+
+
+def test_reanudar_en_campo_medio_otro_barrido_falla(tmp_path):
+    tensors.llenar(_pa(), str(tmp_path), n_reps=1)
+    with pytest.raises(ValueError, match="otro barrido"):
+        tensors.llenar(_pa(), str(tmp_path), mean_field=True)